@@ -5,12 +5,12 @@ Database configuration for the application.
 # app/config/database.py
 from app.config.settings import settings
 from app.config.logger import logger
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 import os
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 # Create Base class for models
 Base = declarative_base()
@@ -18,6 +18,32 @@ Base = declarative_base()
 # Database URL from Environment settings
 DATABASE_URL = settings.DATABASE_URL
 
+# Async drivers for the optional async engine
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+IS_MEMORY_SQLITE = DATABASE_URL.startswith("sqlite") and ":memory:" in DATABASE_URL
+
+# Pool sizing (not applicable to the single shared in-memory SQLite connection)
+POOL_OPTIONS = {} if IS_MEMORY_SQLITE else {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+}
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers (other workers) proceed while a batch is being written
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
 # Create SQLAlchemy engine
 if DATABASE_URL.startswith("sqlite"):
     
@@ -28,9 +54,13 @@ if DATABASE_URL.startswith("sqlite"):
     engine = create_engine(
         DATABASE_URL,
         connect_args={"check_same_thread": False},  # Needed for SQLite
-        poolclass=StaticPool,  # Use static pool for SQLite
-        echo=True  # Set to False in production
+        # Static pool only for in-memory databases; file databases get a
+        # connection per thread so background writers don't share one handle
+        poolclass=StaticPool if IS_MEMORY_SQLITE else None,
+        echo=settings.DB_ECHO,
+        **POOL_OPTIONS,
     )
+    event.listen(engine, "connect", _set_sqlite_pragmas)
 else:
     
     # Logging the use of PostgreSQL or MySQL
@@ -40,8 +70,9 @@ else:
     engine = create_engine(
         DATABASE_URL,
         pool_pre_ping=True,  # Verify connections before use
-        pool_recycle=300,    # Recycle connections every 5 minutes
-        echo=True  # Set to False in production
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        echo=settings.DB_ECHO,
+        **POOL_OPTIONS,
     )
 
 # Create SessionLocal class
@@ -60,4 +91,54 @@ def get_db() -> Generator:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def async_database_url(url: str) -> str:
+    """
+    Same database through its async driver (aiosqlite / asyncpg).
+    """
+    scheme, sep, rest = url.partition("://")
+    if "+" in scheme:
+        return url
+    if scheme not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database scheme: {scheme}")
+    return f"{ASYNC_DRIVERS[scheme]}{sep}{rest}"
+
+
+# Optional async engine (drivers: aiosqlite / asyncpg, declared in requirements.txt)
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DB_ASYNC_ENABLED:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    ASYNC_DATABASE_URL = async_database_url(DATABASE_URL)
+    try:
+        async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            pool_pre_ping=not DATABASE_URL.startswith("sqlite"),
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            poolclass=StaticPool if IS_MEMORY_SQLITE else None,
+            echo=settings.DB_ECHO,
+            **POOL_OPTIONS,
+        )
+    except ModuleNotFoundError as e:
+        raise RuntimeError(f"DB_ASYNC_ENABLED needs the async driver for {ASYNC_DATABASE_URL.split('://')[0]}: {e}") from e
+
+    if DATABASE_URL.startswith("sqlite"):
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    logger.info(f"Async database engine enabled: {async_engine.url.drivername}")
+
+
+# Dependency to get an async database session
+async def get_async_db() -> AsyncGenerator:
+    """
+    Async database session dependency for FastAPI (requires DB_ASYNC_ENABLED).
+    """
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database engine is disabled; set DB_ASYNC_ENABLED=true.")
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
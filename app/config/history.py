@@ -1,63 +1,179 @@
-from collections import defaultdict
 from typing import Any, Dict, Optional
+from sqlalchemy import delete, select
+from app.config.database import SessionLocal
+from app.config.settings import settings
+from app.config.logger import logger
+from app.db.models import ChatMessage, SessionMemory
+from app.services.findings_index import findings_indexes
+
+import asyncio
 import json
+import queue
+import threading
+import time
+
+DIGEST_KEY = "memory_digest"
+
+
+def _severity_counts(findings: list) -> Dict[str, int]:
+    counts = {"total": len(findings), "high": 0, "medium": 0, "low": 0}
+    for finding in findings:
+        severity = str(finding.get("severity", "")).lower()
+        if severity in counts:
+            counts[severity] += 1
+    return counts
+
+
+def digest_entry(key: str, value: Any) -> Any:
+    """
+    One-line-per-item summary of a memory value for the router prompt.
+    """
+    if key == "last_analyze" and isinstance(value, dict):
+        findings = (value.get("result") or {}).get("findings", []) or []
+        return {
+            "file_path": value.get("file_path"),
+            "counts": _severity_counts(findings),
+            "findings": [
+                f"{i}. [{str(f.get('severity', '?')).upper()}] {f.get('title', 'Untitled')}"
+                + (f" (line {f['line']})" if f.get("line") else "")
+                for i, f in enumerate(findings, start=1)
+            ],
+        }
+
+    if key == "last_scan" and isinstance(value, dict):
+        files = value.get("files") or {}
+        findings = [
+            f for result in files.values() if isinstance(result, dict)
+            for f in (result.get("result") or {}).get("findings", []) or []
+        ]
+        return {
+            "directory": value.get("directory"),
+            "files": len(files),
+            "failed": sum(1 for r in files.values() if isinstance(r, dict) and r.get("status") == "error"),
+            "counts": _severity_counts(findings),
+        }
+
+    text = json.dumps(value)
+    return value if len(text) <= 200 else f"<{type(value).__name__}, {len(text)} bytes>"
 
 
 class HistoryManager:
-    def __init__(self, max_length: int = 20):
+    def __init__(self, max_length: int = 20, cache_ttl: float = 2.0, flush_interval: float = 0.05,
+                 batch_size: int = 200, max_cached_sessions: int = 10000):
         """
-        In-memory chat history manager with structured memory support.
+        Chat history manager with structured memory support.
+
+        Sessions are persisted in the `chat_messages` and `session_memory` tables so any
+        worker can serve any session. Reads go through an in-process cache that is
+        refreshed from the database after `cache_ttl` seconds, by `refresh` at the
+        start of a request or by the background thread; writes update the cache
+        immediately and are flushed to the database in batches by that thread.
         """
-        self.histories = defaultdict(list)
         self.max_length = max_length
-        self.memory: dict[str, dict[str, Any]] = defaultdict(dict)
+        self.cache_ttl = cache_ttl
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_cached_sessions = max_cached_sessions
+
+        # session_id -> {"history": [...], "memory": {...}, "loaded_at": float, "version": int}
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._cache_lock = threading.RLock()
+        # Stale sessions read outside `refresh`, reloaded by the writer thread
+        self._stale: set = set()
+
+        self._pending: queue.Queue = queue.Queue()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._writer = threading.Thread(target=self._run_writer, name="history-writer", daemon=True)
+        self._writer.start()
 
     def add(self, session_id: str, role: str, message: str):
         """
         Add a message to the chat history for a given session.
         """
-        self.histories[session_id].append({"role": role, "message": message})
-        if len(self.histories[session_id]) > self.max_length:
-            self.histories[session_id] = self.histories[session_id][-self.max_length:]
+        text = message if isinstance(message, str) else json.dumps(message)
+        with self._cache_lock:
+            entry = self._session(session_id)
+            entry["version"] += 1
+            history = entry["history"]
+            history.append({"role": role, "message": text})
+            if len(history) > self.max_length:
+                del history[:-self.max_length]
+            self._pending.put(("add", session_id, role, text))
 
     def get(self, session_id: str, n: int = 5):
         """
         Get the last n messages from the chat history for a given session.
         """
-        return [h["message"] for h in self.histories[session_id][-n:]]
+        with self._cache_lock:
+            return [h["message"] for h in self._session(session_id)["history"][-n:]]
 
     def clear(self, session_id: str):
         """
         Clear the chat history for a given session.
         """
-        self.histories[session_id] = []
+        with self._cache_lock:
+            entry = self._session(session_id)
+            entry["version"] += 1
+            entry["history"] = []
+            self._pending.put(("clear", session_id))
 
     # ---------- Structured memory (artifacts) ----------
     def set_memory(self, session_id: str, key: str, value: Any) -> None:
         """
         Store any JSON-serializable object under a key for this session.
+        The session's compact digest is updated alongside it.
         """
-        self.memory[session_id][key] = value
+        with self._cache_lock:
+            entry = self._session(session_id)
+            entry["version"] += 1
+            memory = entry["memory"]
+            memory[key] = value
+            self._pending.put(("memory", session_id, key, json.dumps(value)))
+
+            if key != DIGEST_KEY:
+                digest = dict(memory.get(DIGEST_KEY) or {})
+                digest[key] = digest_entry(key, value)
+                memory[DIGEST_KEY] = digest
+                self._pending.put(("memory", session_id, DIGEST_KEY, json.dumps(digest)))
 
     def get_memory(self, session_id: str, key: Optional[str] = None) -> Any:
         """
-        Get a single key or the entire memory dict for a session.
+        Get a single key or a copy of the entire memory dict for a session.
+        Values are shared with the cache: replace them through `set_memory`
+        instead of mutating them.
         """
-        if key is None:
-            return self.memory.get(session_id, {})
-        return self.memory.get(session_id, {}).get(key)
+        with self._cache_lock:
+            memory = self._session(session_id)["memory"]
+            if key is None:
+                return dict(memory)
+            return memory.get(key)
 
     def has_memory(self, session_id: str, key: str) -> bool:
         """
         Check if a key exists in the session's memory.
         """
-        return key in self.memory.get(session_id, {})
+        return key in self.get_memory(session_id)
 
-    def set_last_analyze(self, session_id: str, payload: Dict[str, Any]) -> None:
+    def get_digest(self, session_id: str) -> Dict[str, Any]:
+        """
+        Compact summary of the session's memory, small enough for the router prompt.
+        """
+        memory = self.get_memory(session_id)
+        if DIGEST_KEY in memory:
+            return memory[DIGEST_KEY]
+        # Sessions stored before digests existed
+        return {key: digest_entry(key, value) for key, value in memory.items()}
+
+    def set_last_analyze(self, session_id: str, payload: Dict[str, Any], file_path: Optional[str] = None) -> None:
         """
         Store the last analysis result for the session.
         """
+        if file_path:
+            payload = {**payload, "file_path": file_path}
         self.set_memory(session_id, "last_analyze", payload)
+        # Report requests filter this payload; index it now rather than on first use
+        findings_indexes.update(session_id, payload)
 
     def get_last_analyze(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -65,6 +181,142 @@ class HistoryManager:
         """
         return self.get_memory(session_id, "last_analyze")
 
+    # ---------- Persistence ----------
+    def flush(self) -> None:
+        """
+        Write all pending changes to the database, `batch_size` operations per transaction.
+        """
+        with self._flush_lock:
+            while True:
+                ops = []
+                while len(ops) < self.batch_size:
+                    try:
+                        ops.append(self._pending.get_nowait())
+                    except queue.Empty:
+                        break
+                if not ops:
+                    return
+                self._write(ops)
+
+    def _write(self, ops: list) -> None:
+        """
+        Apply a batch of buffered operations in order, in one transaction.
+        """
+        try:
+            with SessionLocal() as db:
+                for op in ops:
+                    if op[0] == "add":
+                        db.add(ChatMessage(session_id=op[1], role=op[2], message=op[3]))
+                    elif op[0] == "clear":
+                        db.flush()
+                        db.execute(delete(ChatMessage).where(ChatMessage.session_id == op[1]))
+                    elif op[0] == "memory":
+                        db.merge(SessionMemory(session_id=op[1], key=op[2], value=op[3]))
+                db.commit()
+        except Exception:
+            logger.exception(f"[History] Failed to persist {len(ops)} session writes")
+
+    def close(self) -> None:
+        """
+        Stop the background writer after flushing what is left.
+        """
+        self._stop.set()
+        self._writer.join(timeout=5)
+        self.flush()
+
+    def _run_writer(self) -> None:
+        while not self._stop.is_set():
+            self._stop.wait(self.flush_interval)
+            self.flush()
+            with self._cache_lock:
+                stale, self._stale = self._stale, set()
+            for session_id in stale:
+                self._refresh(session_id)
+
+    async def refresh(self, session_id: str) -> None:
+        """
+        Reload the session from the database if the cached copy is missing or stale.
+        Runs in a thread; call it before reading a session on the event loop.
+        """
+        await asyncio.to_thread(self._refresh, session_id)
+
+    def _is_fresh(self, entry: Optional[Dict[str, Any]]) -> bool:
+        return entry is not None and time.monotonic() - entry["loaded_at"] < self.cache_ttl
+
+    def _refresh(self, session_id: str) -> None:
+        with self._cache_lock:
+            entry = self._cache.get(session_id)
+            if self._is_fresh(entry):
+                return
+            version = entry["version"] if entry else None
+
+        # Make our own buffered writes visible before reading back
+        self.flush()
+        try:
+            loaded = self._load(session_id)
+        except Exception:
+            logger.exception(f"[History] Failed to load session {session_id}; using cached state")
+            return
+
+        with self._cache_lock:
+            current = self._cache.get(session_id)
+            # A write that landed during the load is newer than what was read; retry later
+            if (current["version"] if current else None) != version:
+                return
+            self._store(session_id, loaded)
+
+    def _store(self, session_id: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Must be called with `_cache_lock` held.
+        """
+        entry["loaded_at"] = time.monotonic()
+        entry["version"] = 0
+        self._cache.pop(session_id, None)
+        self._cache[session_id] = entry
+        while len(self._cache) > self.max_cached_sessions:
+            self._cache.pop(next(iter(self._cache)))
+        return entry
+
+    def _session(self, session_id: str) -> Dict[str, Any]:
+        """
+        Cached session state. A stale entry is served as is and queued for a reload
+        by the writer thread; only a session never seen before is read inline.
+        Must be called with `_cache_lock` held.
+        """
+        entry = self._cache.get(session_id)
+        if entry is not None:
+            if not self._is_fresh(entry):
+                self._stale.add(session_id)
+            return entry
+
+        try:
+            loaded = self._load(session_id)
+        except Exception:
+            logger.exception(f"[History] Failed to load session {session_id}; starting empty")
+            loaded = {"history": [], "memory": {}}
+        return self._store(session_id, loaded)
+
+    def _load(self, session_id: str) -> Dict[str, Any]:
+        with SessionLocal() as db:
+            rows = db.execute(
+                select(ChatMessage.role, ChatMessage.message)
+                .where(ChatMessage.session_id == session_id)
+                .order_by(ChatMessage.id.desc())
+                .limit(self.max_length)
+            ).all()
+            memory_rows = db.execute(
+                select(SessionMemory.key, SessionMemory.value)
+                .where(SessionMemory.session_id == session_id)
+            ).all()
+
+        return {
+            "history": [{"role": role, "message": message} for role, message in reversed(rows)],
+            "memory": {key: json.loads(value) for key, value in memory_rows},
+        }
+
 
 # Global Instance
-history_manager = HistoryManager()
\ No newline at end of file
+history_manager = HistoryManager(
+    cache_ttl=settings.SESSION_CACHE_TTL_SECONDS,
+    flush_interval=settings.SESSION_FLUSH_INTERVAL_SECONDS,
+)
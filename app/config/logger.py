@@ -2,34 +2,171 @@
 Logger configuration for the application.
 """
 
+import atexit
+import copy
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import random
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from app.config.settings import settings
+
+# Request-scoped identifiers attached to every record
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+session_id_var: ContextVar[str | None] = ContextVar("session_id", default=None)
+
+_listener: QueueListener | None = None
+
+
+def bind_session(session_id: str | None) -> None:
+    """
+    Tag log records emitted while handling this request with `session_id`.
+    """
+    session_id_var.set(session_id)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Adds request/session IDs, truncates oversized messages and samples DEBUG records.
+    Runs in the calling thread, before the record is queued.
+    """
+
+    def __init__(self, max_chars: int = 2000, debug_sample_rate: float = 1.0):
+        super().__init__()
+        self.max_chars = max_chars
+        self.debug_sample_rate = debug_sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno <= logging.DEBUG and self.debug_sample_rate < 1.0 and random.random() >= self.debug_sample_rate:
+            return False
+
+        record.request_id = request_id_var.get()
+        record.session_id = session_id_var.get()
+
+        message = record.getMessage()
+        if self.max_chars and len(message) > self.max_chars:
+            message = f"{message[:self.max_chars]}... [truncated {len(message) - self.max_chars} chars]"
+        record.msg, record.args = message, None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "session_id": getattr(record, "session_id", None),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Keep the traceback separate from the message so the formatter can place it
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware that gives every HTTP request an ID (from `X-Request-ID` or a
+    new one), binds it to the logging context and echoes it in the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        incoming = dict(scope.get("headers") or []).get(b"x-request-id", b"").decode("latin-1")
+        request_id = incoming[:64] or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", []).append((b"x-request-id", request_id.encode("latin-1")))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
+
+
+def stop_logging() -> None:
+    """
+    Flush queued records and stop the background writer.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 
 # Define Logger & Logging Strat
 def get_logger():
-    
+
     """
-    This function returns the logger for the application. It sets a handler that logs to a file, 
-    and sets the logging level to INFO. If the logger already has a handler, it does not add another one.
+    This function returns the logger for the application. Records are put on an
+    in-memory queue by the calling thread and written to a rotating file by a
+    background listener, so disk I/O stays off the request path. If the logger
+    already has a handler, it does not add another one.
 
     Returns:
         logger: The logger for the application
     """
-    
+    global _listener
+
     logger = logging.getLogger('uvicorn.info')
-    logger.setLevel(logging.INFO)
-    
-    # Setting a handler for logging to a file
-    handler = RotatingFileHandler("app.log", maxBytes=2000, backupCount=5)
-    handler.setFormatter(logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    ))
+    logger.setLevel(getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO))
 
     if not logger.hasHandlers():
-        logger.addHandler(handler)
+        # Setting a handler for logging to a file, driven by a background listener
+        file_handler = RotatingFileHandler(
+            settings.LOG_FILE,
+            maxBytes=settings.LOG_MAX_BYTES,
+            backupCount=settings.LOG_BACKUP_COUNT,
+            encoding="utf-8",
+        )
+        if settings.LOG_FORMAT == "json":
+            file_handler.setFormatter(JsonFormatter())
+        else:
+            file_handler.setFormatter(logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s %(session_id)s] %(message)s'
+            ))
+
+        log_queue: queue.Queue = queue.Queue(-1)
+        queue_handler = _QueueHandler(log_queue)
+        queue_handler.addFilter(ContextFilter(settings.LOG_MAX_MESSAGE_CHARS, settings.LOG_DEBUG_SAMPLE_RATE))
+        logger.addHandler(queue_handler)
+
+        _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
 
     return logger
 
 # Global logger instance
-logger = get_logger()
\ No newline at end of file
+logger = get_logger()
@@ -19,14 +19,118 @@ class Settings(BaseSettings):
     
     # Database settings
     DATABASE_URL: str
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 300
+    DB_ASYNC_ENABLED: bool = False
+
+    # Health monitor settings (background dependency checks, cached results)
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 15.0
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 5.0
+    HEALTH_CHECK_LLM: bool = True
     
     # API settings
     GROQ_API_KEY: str
     ROUTER_LLM_ID: str
     WORKER_LLM_ID: str
+    GROQ_BASE_URL: str | None = None
+
+    # LLM transport settings (shared keep-alive pool, timeouts, retries, circuit breaker)
+    GROQ_MAX_CONNECTIONS: int = 100
+    GROQ_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    GROQ_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    GROQ_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    GROQ_READ_TIMEOUT_SECONDS: float = 60.0
+    GROQ_ROUTER_READ_TIMEOUT_SECONDS: float = 15.0
+    GROQ_MAX_RETRIES: int = 3
+    GROQ_BACKOFF_BASE_SECONDS: float = 0.5
+    GROQ_BACKOFF_MAX_SECONDS: float = 20.0
+    GROQ_BREAKER_FAILURE_THRESHOLD: int = 5
+    GROQ_BREAKER_RESET_SECONDS: float = 30.0
+
+    # Outbound rate limits per model (0 = unlimited); calls queue instead of hitting 429s
+    LLM_SCHEDULER_ENABLED: bool = True
+    ROUTER_LLM_RPM: int = 30
+    ROUTER_LLM_TPM: int = 6000
+    WORKER_LLM_RPM: int = 30
+    WORKER_LLM_TPM: int = 12000
     
+    # Logging settings (queued background writer; LOG_FORMAT is "json" or "text")
+    LOG_FILE: str = "app.log"
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    LOG_BACKUP_COUNT: int = 5
+    LOG_MAX_MESSAGE_CHARS: int = 2000
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0
+
     # Prompt library path
     PROMPT_LIBRARY_PATH: str
+    PROMPT_BYTECODE_CACHE_DIR: str | None = None
+
+    # Session store settings (read-through cache TTL, background write-behind interval)
+    SESSION_CACHE_TTL_SECONDS: float = 2.0
+    SESSION_FLUSH_INTERVAL_SECONDS: float = 0.05
+
+    # Analysis cache settings
+    ANALYSIS_CACHE_ENABLED: bool = True
+    ANALYSIS_CACHE_MEMORY_ENTRIES: int = 256
+    ANALYSIS_CACHE_DB_MAX_BYTES: int = 50 * 1024 * 1024
+
+    # Chunked analysis settings (files longer than ANALYZE_CHUNK_LINES are split)
+    ANALYZE_CHUNK_LINES: int = 200
+    ANALYZE_CHUNK_CONCURRENCY: int = 8
+    ANALYZE_PRESCAN_ENABLED: bool = True
+
+    # Tiered analysis: a cheap triage model screens code and only units scoring at
+    # least TRIAGE_THRESHOLD (0-1 risk) reach the worker model. TRIAGE_LLM_ID
+    # defaults to the router model; its RPM/TPM apply when it names another model
+    # (roles sharing a model get the tighter of their limits).
+    ANALYZE_CASCADE_ENABLED: bool = False
+    TRIAGE_LLM_ID: str | None = None
+    TRIAGE_LLM_RPM: int = 30
+    TRIAGE_LLM_TPM: int = 6000
+    TRIAGE_THRESHOLD: float = 0.3
+
+    # Patch-based partial fixes (window around the target instead of the whole file)
+    FIX_WINDOW_CONTEXT_LINES: int = 8
+    FIX_WINDOW_MAX_LINES: int = 120
+
+    # Re-analyze only the changed regions of a file after a fix (updates last_analyze)
+    FIX_REANALYZE_ENABLED: bool = True
+
+    # Fast-path intent classifier (router LLM is used below the threshold)
+    INTENT_FAST_PATH_ENABLED: bool = True
+    INTENT_FAST_PATH_THRESHOLD: float = 0.85
+
+    # Source file access (size limit checked before reading; mmap above the threshold)
+    FILE_MAX_BYTES: int = 2 * 1024 * 1024
+    FILE_MMAP_THRESHOLD_BYTES: int = 256 * 1024
+    FILE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    FILE_RESOLVE_TTL_SECONDS: float = 5.0
+
+    # Background jobs for /agent/chat requests with async_job=true (in-process queue)
+    JOB_WORKERS: int = 4
+    JOB_MAX_QUEUED: int = 100
+    JOB_KEEP_FINISHED: int = 500
+
+    # Speculative file prefetch while the router classifies the message
+    PREFETCH_ENABLED: bool = True
+    PREFETCH_MAX_PATHS: int = 2
+
+    # Report requests answered from an in-memory findings index (LLM only for prose summaries)
+    REPORT_LOCAL_ENABLED: bool = True
+    REPORT_INDEX_MAX_SESSIONS: int = 1000
+
+    # Batch scan settings
+    SCAN_MAX_CONCURRENCY: int = 4
+    SCAN_MAX_FILES: int = 2000
+    # Incremental scans shell out to git; each command is bounded by this timeout
+    SCAN_GIT_TIMEOUT_SECONDS: float = 30.0
+    # Partial results are copied into session memory at most this often while a scan runs
+    SCAN_MEMORY_INTERVAL_SECONDS: float = 5.0
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,102 @@
+"""
+SQLAlchemy models for the application.
+"""
+
+from datetime import datetime, timezone
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, Text
+from app.config.database import Base
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class AnalysisCacheEntry(Base):
+    """
+    Persistent tier of the analysis cache.
+    One row per (source hash, prompt hash, model) combination.
+    """
+    __tablename__ = "analysis_cache"
+
+    key = Column(String(64), primary_key=True)
+    source_hash = Column(String(64), nullable=False, index=True)
+    prompt_hash = Column(String(64), nullable=False)
+    model = Column(String(128), nullable=False)
+    payload = Column(Text, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
+    last_accessed_at = Column(DateTime(timezone=True), default=utcnow, nullable=False, index=True)
+
+
+class ChatMessage(Base):
+    """
+    One chat turn message, newest rows have the highest id.
+    """
+    __tablename__ = "chat_messages"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    session_id = Column(String(255), nullable=False)
+    role = Column(String(32), nullable=False)
+    message = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_chat_messages_session_id_id", "session_id", "id"),
+    )
+
+
+class SessionMemory(Base):
+    """
+    Structured session memory (artifacts), one JSON value per (session, key).
+    """
+    __tablename__ = "session_memory"
+
+    session_id = Column(String(255), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    value = Column(Text, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow, nullable=False)
+
+
+class ScanState(Base):
+    """
+    Last completed git-aware scan of a directory and the commit it covered.
+    """
+    __tablename__ = "scan_state"
+
+    directory = Column(String(1024), primary_key=True)
+    commit = Column(String(64), nullable=False)
+    scanned_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow, nullable=False)
+
+
+class ScanFileResult(Base):
+    """
+    Stored analysis of one file from a git-aware scan, reused while the file is unchanged.
+    `dirty` rows came from uncommitted working-tree content and are never reused.
+    """
+    __tablename__ = "scan_files"
+
+    directory = Column(String(1024), primary_key=True)
+    path = Column(String(1024), primary_key=True)
+    commit = Column(String(64), nullable=False)
+    dirty = Column(Boolean, default=False, nullable=False)
+    payload = Column(Text, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow, nullable=False)
+
+
+class JobRecord(Base):
+    """
+    Status of one background chat job, shared by every worker process.
+    `result` is the ChatResponse JSON once the job has completed.
+    """
+    __tablename__ = "jobs"
+
+    job_id = Column(String(32), primary_key=True)
+    session_id = Column(String(255), nullable=False, index=True)
+    intent = Column(String(32), nullable=False)
+    file_path = Column(String(1024), nullable=True)
+    status = Column(String(16), nullable=False)
+    error = Column(Text, nullable=True)
+    result = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=utcnow, nullable=False, index=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
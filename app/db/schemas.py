@@ -1,15 +1,173 @@
-from pydantic import BaseModel
-from typing import Any, Dict
+from pydantic import BaseModel, ConfigDict, TypeAdapter, with_config
+from typing import Any, Dict, List
+from typing_extensions import TypedDict
+
+SEVERITIES = ("high", "medium", "low")
+
+
+def _line_number(value: Any) -> int | None:
+    # Models sometimes answer "12" or "12-14"; keep the first number
+    if isinstance(value, int) or value is None:
+        return value
+    digits = str(value).strip().split("-")[0].strip()
+    return int(digits) if digits.isdigit() else None
+
+
+# ---------- Findings ----------
+# TypedDicts validate into plain dicts: no per-finding objects to build or dump
+@with_config(ConfigDict(extra="allow"))
+class Finding(TypedDict, total=False):
+    id: str | int | None
+    title: str | None
+    category: str | None
+    severity: str | None
+    line: int | str | None
+    end_line: int | str | None
+    code_snippet: str | None
+    description: str | None
+
+
+@with_config(ConfigDict(extra="allow"))
+class FindingsBlock(TypedDict, total=False):
+    summary: Dict[str, Any]
+    findings: List[Finding]
+
+
+@with_config(ConfigDict(extra="allow"))
+class AnalysisPayload(TypedDict, total=False):
+    version: str | None
+    task: str | None
+    status: str | None
+    result: FindingsBlock
+
+
+class AnalysisResult:
+    """
+    Analyze/report payload, validated once when the worker's answer arrives.
+    Line numbers are normalized and the severity histogram and by-number index
+    are computed in the same pass.
+    """
+    _adapter = TypeAdapter(AnalysisPayload)
+
+    def __init__(self, payload: AnalysisPayload):
+        self.payload = payload
+        findings = self.findings
+        counts = {"total": len(findings), **{severity: 0 for severity in SEVERITIES}}
+        for finding in findings:
+            for key in ("line", "end_line"):
+                if key in finding and not isinstance(finding[key], int):
+                    finding[key] = _line_number(finding[key])
+            severity = (finding.get("severity") or "").lower()
+            if severity in counts:
+                counts[severity] += 1
+        self.severity_counts: Dict[str, int] = counts
+        self._by_number = {number: finding for number, finding in enumerate(findings, start=1)}
+
+    @classmethod
+    def parse(cls, data: Any) -> "AnalysisResult":
+        """
+        Validate a worker payload. Raises pydantic.ValidationError.
+        """
+        return cls(cls._adapter.validate_python(data))
+
+    @property
+    def findings(self) -> List[Finding]:
+        return (self.payload.get("result") or {}).get("findings") or []
+
+    def finding(self, number: int) -> Finding | None:
+        """
+        Finding by its 1-based position, as users refer to it ("issue #2").
+        """
+        return self._by_number.get(number)
+
+    def to_payload(self) -> Dict[str, Any]:
+        """
+        The validated payload as a plain dict (session memory, response bodies).
+        """
+        return self.payload
+
 
 # ---------- Request/Response Models ----------
 class ChatRequest(BaseModel):
     session_id: str
     message: str
+    # Run analyze/fix/report as a background job and answer 202 with its ID
+    async_job: bool = False
 
 class ChatResponse(BaseModel):
     message: str
-    response: Dict[str, Any]
+    response: AnalysisPayload | Dict[str, Any]
     intent: str
     file_path: str | None = None
     target: dict | None = None
 
+    @classmethod
+    def from_result(cls, response: Any, classification: dict) -> "ChatResponse":
+        """
+        Wrap a dispatch result: structured payloads go in `response`, text in `message`.
+        """
+        if isinstance(response, AnalysisResult):
+            # Validated when parsed; skip validating the findings a second time
+            return cls.model_construct(
+                message="Response generated successfully.",
+                response=response.payload,
+                intent=classification["intent"],
+                file_path=classification["file_path"],
+                target=classification.get("target"),
+            )
+        return cls(
+            message="Response generated successfully." if isinstance(response, dict) else response,
+            response=response if isinstance(response, dict) else {},
+            intent=classification["intent"],
+            file_path=classification["file_path"],
+            target=classification.get("target"),
+        )
+
+    def to_content(self) -> Dict[str, Any]:
+        """
+        Response body as plain data, for a JSON response class to encode directly.
+        """
+        return {name: getattr(self, name) for name in type(self).model_fields}
+
+
+class ScanRequest(BaseModel):
+    session_id: str
+    directory: str
+    include: List[str] = ["**/*.py"]
+    exclude: List[str] = []
+    concurrency: int | None = None
+    # Analyze only files git reports as changed since `base_ref` (default: the
+    # directory's last incremental scan) up to `head_ref` (default: working tree)
+    incremental: bool = False
+    base_ref: str | None = None
+    head_ref: str | None = None
+
+class ScanStatus(BaseModel):
+    scan_id: str
+    session_id: str
+    directory: str
+    mode: str = "full"
+    base_commit: str | None = None
+    head_commit: str | None = None
+    status: str
+    total: int
+    done: int
+    in_flight: int
+    failed: int
+    reused: int = 0
+    started_at: str
+    finished_at: str | None = None
+    error: str | None = None
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    session_id: str
+    intent: str
+    file_path: str | None = None
+    status: str
+    created_at: str
+    started_at: str | None = None
+    finished_at: str | None = None
+    error: str | None = None
+    result: ChatResponse | None = None
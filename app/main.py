@@ -1,22 +1,49 @@
 # app/main.py - Updated with health routes
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse
 from app.config.database import engine, Base
+from app.db import models  # noqa: F401  (register tables)
 from app.config.settings import settings
+from app.config.history import history_manager
+from app.config.logger import RequestIdMiddleware, stop_logging
+from app.services.llm_transport import llm_transport
+from app.services.health_monitor import health_monitor
+from app.services.job_queue import job_queue
 from app.routes.health import router as health_router
 from app.routes.chat import router as chat_router
+from app.routes.scan import router as scan_router
+from app.routes.jobs import router as jobs_router
+from app.routes.metrics import router as metrics_router
 from fastapi.middleware.cors import CORSMiddleware
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await health_monitor.start()
+    job_queue.start()
+    yield
+    await job_queue.stop()
+    await health_monitor.stop()
+    # Persist buffered session writes before the worker exits
+    history_manager.close()
+    await llm_transport.aclose()
+    stop_logging()
+
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.VERSION,
     debug=settings.DEBUG,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+# Tag every request's log records with a request ID
+app.add_middleware(RequestIdMiddleware)
+
 # Set up CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -28,7 +55,10 @@ app.add_middleware(
 
 # Include routes
 app.include_router(health_router, tags=["Health"], prefix="/health")
+app.include_router(metrics_router, tags=["Health"])
 app.include_router(chat_router, tags=["Agent"], prefix="/agent")
+app.include_router(scan_router, tags=["Agent"], prefix="/agent")
+app.include_router(jobs_router, tags=["Agent"], prefix="/agent")
 
 # Example route using database
 @app.get("/")
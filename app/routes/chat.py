@@ -1,18 +1,22 @@
 # app/routes/chat.py
 from fastapi import APIRouter, HTTPException
-from app.db.schemas import ChatRequest, ChatResponse
+from fastapi.responses import ORJSONResponse
+from app.db.schemas import ChatRequest, ChatResponse, JobStatus
 from app.services.groq_service import groq_service
 from app.services.executor import executor_service
+from app.services.job_queue import JOB_INTENTS, JobQueueFull, job_queue
+from app.services.prefetch import prefetcher
 from app.config.history import history_manager
-from app.config.logger import logger
-import json
-from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
+from app.config.logger import bind_session, logger
+from app.services.metrics import current_intent, metrics, set_intent
+import time
+from starlette.status import HTTP_202_ACCEPTED, HTTP_500_INTERNAL_SERVER_ERROR, HTTP_503_SERVICE_UNAVAILABLE
 
 # Router Instance
 router = APIRouter()
 
 # ---------- Route ----------
-@router.post("/chat", response_model=ChatResponse)
+@router.post("/chat", response_model=ChatResponse, responses={HTTP_202_ACCEPTED: {"model": JobStatus}})
 async def chat_endpoint(req: ChatRequest):
     """
     Main chat endpoint. Handles all queries:
@@ -20,78 +24,76 @@ async def chat_endpoint(req: ChatRequest):
     - fix_all
     - fix_partial
     - general
+
+    With `async_job`, analyze/fix/report turns are queued and answered with
+    202 and a job to poll at /agent/jobs/{job_id}.
     """
 
+    start = time.perf_counter()
+    bind_session(req.session_id)
+    set_intent("unclassified")
+    prefetch = None
     try:
-        # Load history (last 5 user/assistant messages)
-        history = history_manager.get(req.session_id)
-        
-        # Get Memory
-        memory = history_manager.get_memory(req.session_id)
+        with metrics.stage("history_load"):
+            # Reload a stale session from the database without blocking the event loop
+            await history_manager.refresh(req.session_id)
+
+            # Load history (last 5 user/assistant messages)
+            history = history_manager.get(req.session_id)
+
+            # Get Memory (full for workers, compact digest for the router)
+            memory = history_manager.get_memory(req.session_id)
+            digest = history_manager.get_digest(req.session_id)
         logger.info(f"Memory for session {req.session_id}: {memory is not None}")
 
+        # Fixes refresh last_analyze in place; compared after dispatch to persist it
+        last_analyze = memory.get("last_analyze") if memory else None
+
+        # Read and prepare the likely file while the router decides
+        prefetch = prefetcher.start(req.message, history, memory)
+
         # Classify intent
-        classification = groq_service.classify_intent(history, memory, req.message)
+        classification = await groq_service.classify_intent(history, digest, req.message)
+        set_intent(classification["intent"])
+        await prefetcher.settle(prefetch, classification)
+
+        if req.async_job and classification["intent"] in JOB_INTENTS:
+            try:
+                job = await job_queue.submit(req.session_id, req.message, classification, history)
+            except JobQueueFull as e:
+                raise HTTPException(status_code=HTTP_503_SERVICE_UNAVAILABLE, detail=f"Job queue is full ({e})")
+            metrics.chat_seconds.observe(time.perf_counter() - start, intent=classification["intent"], status="queued")
+            return ORJSONResponse(status_code=HTTP_202_ACCEPTED, content=JobStatus(**job.progress()).model_dump())
 
         # Execute action based on intent
-        response = executor_service.dispatch(
+        response = await executor_service.dispatch(
             intent=classification["intent"],
             file_path=classification["file_path"],
             target=classification.get("target"),
             query=req.message,
             history=history,
-            memory=memory
+            memory=memory,
+            session_id=req.session_id
         )
 
         logger.info(f"Response Type: {type(response)}")
+
+        # History and memory updates are timed as the write-back stage
+        write_start = time.perf_counter()
+        executor_service.record_turn(req.session_id, req.message, classification, response, memory, last_analyze)
+
+        now = time.perf_counter()
+        metrics.stage_seconds.observe(now - write_start, stage="write_back", intent=classification["intent"])
+        metrics.chat_seconds.observe(now - start, intent=classification["intent"], status="ok")
         
-        if isinstance(response, dict) and (classification["intent"] == "analyze" or classification["intent"] == "report"):
-            
-            # Save user message into history
-            logger.info(f'History update for analyze: {req.session_id}')
-            history_manager.add(req.session_id, "user", req.message)
-            
-            # count findings based on severity from response
-            assistant_message = f"""
-            {classification['intent'].capitalize()} complete. Found {len(response['result'].get('findings', []))} issues:
-            high: {sum(1 for f in response['result'].get('findings', []) if f['severity'].lower() == 'high')} ,
-            medium: {sum(1 for f in response['result'].get('findings', []) if f['severity'].lower() == 'medium')} ,
-            low severity: {sum(1 for f in response['result'].get('findings', []) if f['severity'].lower() == 'low')} .
-            """
-            logger.info(f'Assistant message: {assistant_message}')            
-            history_manager.add(req.session_id, "assistant", assistant_message)
-            
-            if classification["intent"] == "analyze":
-                # Save analysis result into structured memory
-                logger.info(f'Saving analysis result to memory for session: {req.session_id}')
-                history_manager.set_last_analyze(req.session_id, response)
-            
-        else:
-            
-            # Save messages into history
-            logger.info(f'History update for analyze: {req.session_id}')
-            history_manager.add(req.session_id, "user", req.message)
-            history_manager.add(req.session_id, "assistant", response)
-        
-        if isinstance(response, dict):
-        
-            return ChatResponse(
-                message="Response generated successfully.",
-                response=response,
-                intent=classification["intent"],
-                file_path=classification["file_path"],
-                target=classification.get("target"),
-            )
-            
-        else:
-            return ChatResponse(
-                message=response,
-                response={},
-                intent=classification["intent"],
-                file_path=classification["file_path"],
-                target=classification.get("target"),
-            )
+        # Already typed: serialize directly instead of re-validating against response_model
+        return ORJSONResponse(ChatResponse.from_result(response, classification).to_content())
 
+    except HTTPException:
+        raise
     except Exception as e:
+        if prefetch is not None:
+            prefetch.cancel()
         logger.exception("Error in /chat endpoint")
+        metrics.chat_seconds.observe(time.perf_counter() - start, intent=current_intent(), status="error")
         raise HTTPException(status_code=HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -1,10 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from fastapi import APIRouter, HTTPException
 from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
 from datetime import datetime, timezone
-from app.config.database import get_db
 from app.config.settings import settings
+from app.services.health_monitor import health_monitor
+from app.services.analysis_cache import analysis_cache
+from app.services.file_source import file_source
+from app.services.intent_rules import fast_intent_classifier
+from app.services.sql_prescan import sql_prescanner
+from app.services.prompt_loader import prompt_loader
+from app.services.llm_transport import llm_transport
+from app.services.singleflight import singleflight
+from app.services.job_queue import job_queue
+from app.services.prefetch import prefetcher
+from app.services.findings_index import findings_indexes
+from app.services.triage import triage_cascade
 import time
 
 router = APIRouter()
@@ -22,41 +31,40 @@ def basic_health_check():
     }
 
 @router.get("/detailed")
-def detailed_health_check(db: Session = Depends(get_db)):
+async def detailed_health_check():
     """
-    Detailed health check - includes database connectivity
+    Detailed health check - cached dependency checks (database, LLM, prompts)
+    plus cache and pipeline statistics
     """
-    start_time = time.time()
-    
-    # Check database connectivity
-    try:
-        # Simple query to test database connection
-        db.execute(text("SELECT 1"))
-        db_status = "healthy"
-        db_response_time = round((time.time() - start_time) * 1000, 2)  # ms
-    except Exception as e:
-        db_status = "unhealthy"
-        db_response_time = None
-        # In production, you might want to log this error
-        print(f"Database health check failed: {e}")
-    
-    total_response_time = round((time.time() - start_time) * 1000, 2)
-    
+    start_time = time.perf_counter()
+    health = await health_monitor.snapshot()
+
     health_data = {
-        "status": "healthy" if db_status == "healthy" else "unhealthy",
+        "status": health["status"],
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "service": settings.APP_NAME,
         "version": settings.VERSION,
+        "checked_at": health["checked_at"],
         "checks": {
-            "database": {
-                "status": db_status,
-                "response_time_ms": db_response_time
-            }
+            **health["checks"],
+            "llm_transport": llm_transport.stats()
+        },
+        "caches": {
+            "analysis": analysis_cache.stats(),
+            "files": file_source.stats()
         },
-        "response_time_ms": total_response_time
+        "classifier": fast_intent_classifier.stats(),
+        "prescan": sql_prescanner.stats(),
+        "cascade": triage_cascade.stats(),
+        "prompts": prompt_loader.report(),
+        "coalescing": singleflight.stats(),
+        "jobs": job_queue.stats(),
+        "prefetch": prefetcher.stats(),
+        "reports": findings_indexes.stats(),
+        "response_time_ms": round((time.perf_counter() - start_time) * 1000, 2)
     }
     
-    # Return 503 if any service is unhealthy
+    # Return 503 if any critical dependency is unhealthy
     if health_data["status"] == "unhealthy":
         raise HTTPException(
             status_code=HTTP_503_SERVICE_UNAVAILABLE, 
@@ -66,30 +74,27 @@ def detailed_health_check(db: Session = Depends(get_db)):
     return health_data
 
 @router.get("/ready")
-def readiness_check(db: Session = Depends(get_db)):
+async def readiness_check():
     """
     Readiness probe - checks if service is ready to handle requests
-    Used by Kubernetes/Docker orchestration
+    Used by Kubernetes/Docker orchestration. Served from the health monitor's
+    cached results, so the probe itself does no I/O.
     """
-    try:
-        # Test database connection
-        db.execute(text("SELECT 1"))
-        
-        # Add other readiness checks here:
-        # - Check external API connectivity
-        # - Verify required environment variables
-        # - Test cache connectivity (Redis, etc.)
-        
+    health = await health_monitor.snapshot()
+    if health["ready"]:
         return {
             "status": "ready",
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "checked_at": health["checked_at"],
+            "llm_circuit": llm_transport.breaker.state
         }
-    except Exception as e:
-        raise HTTPException(
-            status_code=HTTP_503_SERVICE_UNAVAILABLE, 
-            detail={
-                "status": "not ready",
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "error": str(e)
-            }
-        )
+
+    raise HTTPException(
+        status_code=HTTP_503_SERVICE_UNAVAILABLE, 
+        detail={
+            "status": "not ready",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "checked_at": health["checked_at"],
+            "checks": {name: check["status"] for name, check in health["checks"].items()},
+        }
+    )
@@ -0,0 +1,37 @@
+# app/routes/jobs.py
+from typing import List
+from fastapi import APIRouter, HTTPException
+from app.db.schemas import JobStatus
+from app.services.job_queue import job_queue
+from starlette.status import HTTP_404_NOT_FOUND
+
+# Router Instance
+router = APIRouter()
+
+# ---------- Routes ----------
+@router.get("/jobs", response_model=List[JobStatus])
+async def list_jobs(session_id: str | None = None):
+    """
+    Background jobs, newest first, optionally for one session.
+    """
+    return [JobStatus(**job) for job in await job_queue.list(session_id)]
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def job_status(job_id: str):
+    """
+    Status of a job; `result` holds the chat response once it has completed.
+    """
+    job = await job_queue.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail=f"Job not found: {job_id}")
+    return JobStatus(**job)
+
+@router.delete("/jobs/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job. Finished jobs are returned unchanged.
+    """
+    job = await job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail=f"Job not found: {job_id}")
+    return JobStatus(**job)
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.services.metrics import metrics
+
+router = APIRouter()
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """
+    Per-stage latency histograms and LLM token counters for Prometheus to scrape
+    """
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,46 @@
+# app/routes/scan.py
+from fastapi import APIRouter, HTTPException
+from app.db.schemas import ScanRequest, ScanStatus
+from app.services.scanner import scanner_service
+from app.config.logger import bind_session, logger
+from starlette.status import HTTP_202_ACCEPTED, HTTP_404_NOT_FOUND
+
+# Router Instance
+router = APIRouter()
+
+# ---------- Routes ----------
+@router.post("/scan", response_model=ScanStatus, status_code=HTTP_202_ACCEPTED)
+async def start_scan(req: ScanRequest):
+    """
+    Start a background scan of every matching file in a directory.
+    Per-file results are stored in the session's `last_scan` memory.
+    Incremental scans analyze only files changed in git and reuse stored results.
+    """
+    # Records from the background scan inherit the session ID
+    bind_session(req.session_id)
+    try:
+        job = scanner_service.start(
+            session_id=req.session_id,
+            directory=req.directory,
+            include=req.include,
+            exclude=req.exclude,
+            concurrency=req.concurrency,
+            incremental=req.incremental,
+            base_ref=req.base_ref,
+            head_ref=req.head_ref,
+        )
+    except FileNotFoundError as e:
+        logger.error(f"Scan request rejected: {e}")
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail=str(e))
+
+    return ScanStatus(**job.progress())
+
+@router.get("/scan/{scan_id}", response_model=ScanStatus)
+async def scan_progress(scan_id: str):
+    """
+    Progress of a scan: files done, in flight and failed.
+    """
+    job = scanner_service.get(scan_id)
+    if job is None:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail=f"Scan not found: {scan_id}")
+    return ScanStatus(**job.progress())
@@ -0,0 +1,199 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from sqlalchemy import func, select
+from app.config.database import SessionLocal
+from app.config.settings import settings
+from app.config.logger import logger
+from app.db.models import AnalysisCacheEntry, utcnow
+
+import asyncio
+import copy
+import hashlib
+import json
+import threading
+
+
+def sha256_text(text: str) -> str:
+    """
+    Hex SHA-256 digest of a UTF-8 string.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    def __init__(self, memory_entries: int = 256, db_max_bytes: int = 50 * 1024 * 1024, enabled: bool = True):
+        """
+        Content-addressed cache for analysis results.
+
+        Entries are keyed on (SHA-256 of the source, SHA-256 of the rendered prompt, model ID).
+        Lookups hit an in-process LRU first, then the `analysis_cache` table.
+        The table is trimmed to `db_max_bytes` of payload, least recently used first.
+        """
+        self.enabled = enabled
+        self.memory_entries = memory_entries
+        self.db_max_bytes = db_max_bytes
+        self._memory: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # -------------------------
+    # KEYS
+    # -------------------------
+    @staticmethod
+    def make_key(source: str, prompt: str, model: str, source_hash: str | None = None) -> tuple[str, str, str]:
+        """
+        Build the cache key for a source/prompt/model combination.
+        Pass `source_hash` when the digest of `source` is already known.
+        Returns (key, source_hash, prompt_hash).
+        """
+        source_hash = source_hash or sha256_text(source)
+        prompt_hash = sha256_text(prompt)
+        key = sha256_text(f"{source_hash}:{prompt_hash}:{model}")
+        return key, source_hash, prompt_hash
+
+    # -------------------------
+    # LOOKUP
+    # -------------------------
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached payload for `key`, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return copy.deepcopy(self._memory[key])
+
+        try:
+            payload = await asyncio.to_thread(self._db_get, key)
+        except Exception as e:
+            logger.warning(f"[AnalysisCache] Database lookup failed: {e}")
+            payload = None
+
+        if payload is None:
+            self.misses += 1
+            return None
+
+        self.db_hits += 1
+        self._remember(key, copy.deepcopy(payload))
+        return payload
+
+    async def warm(self, key: str) -> bool:
+        """
+        Pull a stored payload into the memory tier ahead of a lookup, without
+        counting a hit or miss. Returns whether the key is cached.
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            if key in self._memory:
+                return True
+        try:
+            payload = await asyncio.to_thread(self._db_get, key)
+        except Exception as e:
+            logger.warning(f"[AnalysisCache] Database lookup failed: {e}")
+            return False
+        if payload is None:
+            return False
+        self._remember(key, payload)
+        return True
+
+    async def set(self, key: str, payload: Dict[str, Any], source_hash: str, prompt_hash: str, model: str) -> None:
+        """
+        Store a payload in both tiers.
+        """
+        if not self.enabled:
+            return
+
+        self._remember(key, copy.deepcopy(payload))
+        try:
+            await asyncio.to_thread(self._db_set, key, payload, source_hash, prompt_hash, model)
+        except Exception as e:
+            logger.warning(f"[AnalysisCache] Database write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit/miss counters for both tiers.
+        """
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.memory_hits + self.db_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+    # -------------------------
+    # MEMORY TIER
+    # -------------------------
+    def _remember(self, key: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = payload
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    # -------------------------
+    # DATABASE TIER
+    # -------------------------
+    def _db_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with SessionLocal() as db:
+            entry = db.get(AnalysisCacheEntry, key)
+            if entry is None:
+                return None
+            entry.last_accessed_at = utcnow()
+            db.commit()
+            return json.loads(entry.payload)
+
+    def _db_set(self, key: str, payload: Dict[str, Any], source_hash: str, prompt_hash: str, model: str) -> None:
+        data = json.dumps(payload)
+        with SessionLocal() as db:
+            db.merge(AnalysisCacheEntry(
+                key=key,
+                source_hash=source_hash,
+                prompt_hash=prompt_hash,
+                model=model,
+                payload=data,
+                size_bytes=len(data),
+                last_accessed_at=utcnow(),
+            ))
+            db.commit()
+            self._db_evict(db)
+
+    def _db_evict(self, db) -> None:
+        """
+        Drop least recently used rows until the table fits in `db_max_bytes`.
+        """
+        total = db.scalar(select(func.coalesce(func.sum(AnalysisCacheEntry.size_bytes), 0)))
+        if total <= self.db_max_bytes:
+            return
+
+        rows = db.execute(
+            select(AnalysisCacheEntry.key, AnalysisCacheEntry.size_bytes)
+            .order_by(AnalysisCacheEntry.last_accessed_at)
+        ).all()
+        for key, size in rows:
+            if total <= self.db_max_bytes:
+                break
+            db.query(AnalysisCacheEntry).filter(AnalysisCacheEntry.key == key).delete()
+            total -= size
+            self.evictions += 1
+        db.commit()
+
+
+# Global Instance
+analysis_cache = AnalysisCache(
+    memory_entries=settings.ANALYSIS_CACHE_MEMORY_ENTRIES,
+    db_max_bytes=settings.ANALYSIS_CACHE_DB_MAX_BYTES,
+    enabled=settings.ANALYSIS_CACHE_ENABLED,
+)
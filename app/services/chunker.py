@@ -0,0 +1,204 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+from app.config.settings import settings
+
+import ast
+
+
+@dataclass
+class SourceChunk:
+    """
+    A slice of a source file prepared for the LLM.
+
+    `line_map[i]` is the absolute (1-based) line number of line `i + 1` of `text`,
+    or None for synthetic separator lines.
+    """
+    text: str
+    line_map: List[Optional[int]] = field(default_factory=list)
+
+    @property
+    def start_line(self) -> int:
+        return min(n for n in self.line_map if n is not None)
+
+    @property
+    def end_line(self) -> int:
+        return max(n for n in self.line_map if n is not None)
+
+    @property
+    def size(self) -> int:
+        return len(self.line_map)
+
+    def to_absolute(self, line: Any) -> Optional[int]:
+        """
+        Map a line number relative to `text` back to the original file.
+        """
+        if not isinstance(line, int) or line < 1 or line > len(self.line_map):
+            return None
+        return self.line_map[line - 1]
+
+
+@dataclass
+class _Unit:
+    start: int
+    end: int
+    context: tuple = ()
+
+
+SEPARATOR = "# ..."
+
+
+class PythonChunker:
+    def __init__(self, max_lines: int = 200):
+        """
+        Split Python modules at AST boundaries.
+
+        Top-level functions and classes become units; consecutive module-level
+        statements are grouped. Classes larger than `max_lines` are split into
+        their members with the class header kept as context. Units are packed
+        greedily into chunks of at most `max_lines`, and every chunk is prefixed
+        with the module's imports.
+        """
+        self.max_lines = max_lines
+
+    def split(self, source: str, only_lines: Optional[Iterable[int]] = None) -> List[SourceChunk]:
+        """
+        Split `source` into chunks. Raises SyntaxError if it is not valid Python.
+
+        If `only_lines` is given, units that contain none of those lines are skipped.
+        """
+        tree = ast.parse(source)
+        lines = source.splitlines()
+
+        import_lines = self._import_lines(tree)
+        units = self._units(tree.body)
+
+        if only_lines is not None:
+            wanted = set(only_lines)
+            units = [u for u in units if any(u.start <= n <= u.end for n in wanted)]
+
+        chunks: List[SourceChunk] = []
+        batch: List[_Unit] = []
+        batch_size = 0
+        for unit in units:
+            size = unit.end - unit.start + 1
+            if batch and batch_size + size > self.max_lines:
+                chunks.append(self._build(lines, import_lines, batch))
+                batch, batch_size = [], 0
+            batch.append(unit)
+            batch_size += size
+        if batch:
+            chunks.append(self._build(lines, import_lines, batch))
+
+        return chunks
+
+    # -------------------------
+    # HELPERS
+    # -------------------------
+    @staticmethod
+    def _start(node: ast.AST) -> int:
+        decorators = getattr(node, "decorator_list", None) or []
+        return min([node.lineno] + [d.lineno for d in decorators])
+
+    @staticmethod
+    def _import_lines(tree: ast.Module) -> List[int]:
+        numbers: List[int] = []
+        for node in tree.body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                numbers.extend(range(node.lineno, node.end_lineno + 1))
+        return numbers
+
+    def _units(self, body: List[ast.stmt], context: tuple = ()) -> List[_Unit]:
+        units: List[_Unit] = []
+        loose: Optional[_Unit] = None
+
+        for node in body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)) and not context:
+                continue
+
+            start, end = self._start(node), node.end_lineno
+            is_block = isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+
+            if not is_block:
+                if loose is not None:
+                    loose.end = end
+                else:
+                    loose = _Unit(start, end, context)
+                    units.append(loose)
+                continue
+
+            loose = None
+            if isinstance(node, ast.ClassDef) and end - start + 1 > self.max_lines and node.body:
+                header = tuple(range(start, node.body[0].lineno))
+                units.extend(self._units(node.body, context + header))
+            else:
+                units.append(_Unit(start, end, context))
+
+        return units
+
+    @staticmethod
+    def _build(lines: List[str], import_lines: List[int], units: List[_Unit]) -> SourceChunk:
+        text_lines: List[str] = []
+        line_map: List[Optional[int]] = []
+
+        def emit(number: Optional[int]):
+            text_lines.append(lines[number - 1] if number is not None else SEPARATOR)
+            line_map.append(number)
+
+        for number in import_lines:
+            emit(number)
+
+        emitted_context: tuple = ()
+        for unit in units:
+            if line_map:
+                emit(None)
+            if unit.context != emitted_context:
+                for number in unit.context:
+                    emit(number)
+                emitted_context = unit.context
+            for number in range(unit.start, unit.end + 1):
+                emit(number)
+
+        return SourceChunk(text="\n".join(text_lines), line_map=line_map)
+
+
+def merge_findings(results: List[Dict[str, Any]], chunks: List[SourceChunk]) -> List[Dict[str, Any]]:
+    """
+    Shift chunk-relative line numbers back to absolute positions, drop duplicates
+    reported by more than one chunk and renumber ids in file order.
+    """
+    merged: Dict[tuple, Dict[str, Any]] = {}
+
+    for result, chunk in zip(results, chunks):
+        for finding in (result.get("result") or {}).get("findings", []) or []:
+            finding = dict(finding)
+            finding["line"] = chunk.to_absolute(finding.get("line"))
+            finding["end_line"] = chunk.to_absolute(finding.get("end_line")) or finding["line"]
+
+            key = (
+                finding["line"],
+                finding["end_line"],
+                str(finding.get("category", "")).lower(),
+                str(finding.get("title", "")).strip().lower(),
+            )
+            merged.setdefault(key, finding)
+
+    findings = sorted(merged.values(), key=lambda f: (f["line"] is None, f["line"] or 0))
+    for i, finding in enumerate(findings, start=1):
+        finding["id"] = f"F{i}"
+    return findings
+
+
+def summarize_findings(findings: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Recompute the `summary` block from a findings list.
+    """
+    summary = {"total_findings": len(findings), "high": 0, "medium": 0, "low": 0}
+    for finding in findings:
+        severity = str(finding.get("severity", "")).lower()
+        if severity in summary:
+            summary[severity] += 1
+    return summary
+
+
+# Global Instance
+python_chunker = PythonChunker(max_lines=settings.ANALYZE_CHUNK_LINES)
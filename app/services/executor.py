@@ -1,34 +1,93 @@
+from pydantic import ValidationError
 from app.services.groq_service import groq_service
+from app.services.findings_index import findings_indexes
+from app.config.history import history_manager
 from app.config.logger import logger
+from app.db.schemas import AnalysisResult
 
 class Executor:
-    def dispatch(self, intent: str, 
+    async def dispatch(self, intent: str, 
                  file_path: str | None, 
                  target: dict | None, 
                  query: str, 
                  history: list[str],
-                 memory: dict
+                 memory: dict,
+                 session_id: str | None = None
                  ) -> str:
         
         logger.info(f"Executor dispatching intent={intent}, file_path={file_path}, target={target}, memory_flag={bool(memory)}")
 
         if intent == "analyze":
-            return groq_service.analyze_file(file_path)
+            return self._parse(await groq_service.analyze_file(file_path))
 
         if intent == "report":
-            return groq_service.report_findings(query, target, memory)
+            index = findings_indexes.get(session_id, memory.get("last_analyze")) if memory else None
+            return self._parse(await groq_service.report_findings(query, target, memory, index=index))
         
         elif intent == "fix_all":
-            return groq_service.fix_file(file_path, target=None)
+            return await groq_service.fix_file(file_path, target=None, memory=memory)
 
         elif intent == "fix_partial":
-            return groq_service.fix_file(file_path, target=target)
+            return await groq_service.fix_file(file_path, target=target, memory=memory)
 
         elif intent == "general":
-            return groq_service.answer_general(history, query, file_path)
+            return await groq_service.answer_general(history, query, file_path)
 
         else:
             return "I'm not sure how to handle that request."
 
+    @staticmethod
+    def _parse(result):
+        """
+        Turn a worker's analysis/report dict into an AnalysisResult; text passes through.
+        """
+        if not isinstance(result, dict):
+            return result
+        try:
+            return AnalysisResult.parse(result)
+        except ValidationError as e:
+            logger.error(f"Worker returned malformed findings: {e}")
+            return "The analysis returned malformed findings. Please try again."
+
+    def record_turn(self, session_id: str, query: str, classification: dict, response, memory: dict,
+                    last_analyze: dict | None = None) -> None:
+        """
+        Save a finished turn into history and structured memory. Shared by the chat
+        route and background jobs. `last_analyze` is the session's analysis before
+        dispatch; a fix that refreshed it in place is persisted.
+        """
+        intent = classification["intent"]
+        if isinstance(response, AnalysisResult) and (intent == "analyze" or intent == "report"):
+
+            # Save user message into history
+            logger.info(f'History update for analyze: {session_id}')
+            history_manager.add(session_id, "user", query)
+
+            # Severity counts were computed when the result was parsed
+            counts = response.severity_counts
+            assistant_message = f"""
+            {intent.capitalize()} complete. Found {counts['total']} issues:
+            high: {counts['high']} ,
+            medium: {counts['medium']} ,
+            low severity: {counts['low']} .
+            """
+            logger.info(f'Assistant message: {assistant_message}')
+            history_manager.add(session_id, "assistant", assistant_message)
+
+            if intent == "analyze":
+                # Save analysis result into structured memory
+                logger.info(f'Saving analysis result to memory for session: {session_id}')
+                history_manager.set_last_analyze(session_id, response.to_payload(), file_path=classification["file_path"])
+
+        else:
+
+            # Save messages into history
+            logger.info(f'History update for analyze: {session_id}')
+            history_manager.add(session_id, "user", query)
+            history_manager.add(session_id, "assistant", response)
+
+            if memory and memory.get("last_analyze") is not last_analyze:
+                history_manager.set_last_analyze(session_id, memory["last_analyze"])
+
 # Global instance
 executor_service = Executor()
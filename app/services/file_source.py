@@ -0,0 +1,176 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Tuple
+from app.config.settings import settings
+
+import asyncio
+import hashlib
+import mmap
+import os
+import threading
+import time
+
+
+class FileTooLargeError(Exception):
+    """
+    Raised when a file exceeds the configured size limit. Nothing is read.
+    """
+
+
+@dataclass
+class SourceFile:
+    path: str
+    text: str
+    sha256: str
+    size: int
+    mtime_ns: int
+
+
+class FileSource:
+    def __init__(self, host_root: str = "/host", max_bytes: int = 2 * 1024 * 1024,
+                 mmap_threshold: int = 256 * 1024, cache_max_bytes: int = 64 * 1024 * 1024,
+                 resolve_ttl: float = 5.0):
+        """
+        Shared access to source files on the container or the /host bind mount.
+
+        Path resolution is cached for `resolve_ttl` seconds. Contents are cached
+        and revalidated with one stat per read against (inode, mtime, size), so an
+        atomic write-back or an edit on the host is picked up. Files larger than
+        `max_bytes` are rejected from their stat, files from `mmap_threshold` up are
+        read through mmap, and the SHA-256 of the contents comes with every read.
+        """
+        self.host_root = Path(host_root)
+        self.max_bytes = max_bytes
+        self.mmap_threshold = mmap_threshold
+        self.cache_max_bytes = cache_max_bytes
+        self.resolve_ttl = resolve_ttl
+
+        self._resolved: Dict[str, Tuple[str, float]] = {}
+        self._files: OrderedDict[str, Tuple[Tuple[int, int, int], SourceFile]] = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.mmap_reads = 0
+        self.rejected = 0
+
+    # -------------------------
+    # PATH RESOLUTION
+    # -------------------------
+    def resolve(self, file_path: str) -> str | None:
+        """
+        Container-accessible path for `file_path`: as-is if it exists, else mapped
+        under the host root (returned even if missing, so callers report the path).
+        """
+        if not file_path:
+            return None
+
+        now = time.monotonic()
+        cached = self._resolved.get(file_path)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        path = Path(file_path)
+        if path.exists():
+            resolved = str(path)
+        else:
+            try:
+                resolved = str(self.host_root / path.relative_to("/"))
+            except ValueError:
+                resolved = str(path)
+
+        if len(self._resolved) >= 4096:
+            self._resolved.clear()
+        self._resolved[file_path] = (resolved, now + self.resolve_ttl)
+        return resolved
+
+    # -------------------------
+    # READS
+    # -------------------------
+    def read(self, file_path: str) -> SourceFile:
+        """
+        Read a UTF-8 text file (universal newlines, like Path.read_text).
+        Raises FileNotFoundError, FileTooLargeError or UnicodeDecodeError.
+        """
+        st = os.stat(file_path)
+        if st.st_size > self.max_bytes:
+            self.rejected += 1
+            raise FileTooLargeError(f"{file_path} is {st.st_size} bytes (limit {self.max_bytes})")
+
+        stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._files.get(file_path)
+            if entry is not None and entry[0] == stamp:
+                self._files.move_to_end(file_path)
+                self.hits += 1
+                return entry[1]
+
+        source = self._load(file_path, st)
+        with self._lock:
+            self.misses += 1
+            self._store(file_path, stamp, source)
+        return source
+
+    async def load(self, file_path: str) -> SourceFile:
+        return await asyncio.to_thread(self.read, file_path)
+
+    def invalidate(self, file_path: str) -> None:
+        with self._lock:
+            entry = self._files.pop(file_path, None)
+            if entry is not None:
+                self._cached_bytes -= entry[1].size
+
+    def _load(self, file_path: str, st: os.stat_result) -> SourceFile:
+        with open(file_path, "rb") as handle:
+            if st.st_size >= self.mmap_threshold:
+                self.mmap_reads += 1
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    digest = hashlib.sha256(mapped).hexdigest()
+                    text = str(mapped, "utf-8")
+            else:
+                data = handle.read()
+                digest = hashlib.sha256(data).hexdigest()
+                text = data.decode("utf-8")
+
+        # Match read_text's newline translation; the digest is then over the text
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+            digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+        return SourceFile(file_path, text, digest, st.st_size, st.st_mtime_ns)
+
+    def _store(self, file_path: str, stamp: Tuple[int, int, int], source: SourceFile) -> None:
+        previous = self._files.pop(file_path, None)
+        if previous is not None:
+            self._cached_bytes -= previous[1].size
+        if source.size > self.cache_max_bytes:
+            return
+
+        self._files[file_path] = (stamp, source)
+        self._cached_bytes += source.size
+        while self._cached_bytes > self.cache_max_bytes and self._files:
+            _, (_, evicted) = self._files.popitem(last=False)
+            self._cached_bytes -= evicted.size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "mmap_reads": self.mmap_reads,
+                "rejected_too_large": self.rejected,
+                "cached_files": len(self._files),
+                "cached_bytes": self._cached_bytes,
+                "resolved_paths": len(self._resolved),
+            }
+
+
+# Global Instance
+file_source = FileSource(
+    max_bytes=settings.FILE_MAX_BYTES,
+    mmap_threshold=settings.FILE_MMAP_THRESHOLD_BYTES,
+    cache_max_bytes=settings.FILE_CACHE_MAX_BYTES,
+    resolve_ttl=settings.FILE_RESOLVE_TTL_SECONDS,
+)
@@ -0,0 +1,273 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.config.settings import settings
+from app.services.intent_rules import DESCRIPTION_PATTERNS, fast_intent_classifier
+
+import hashlib
+import json
+import re
+import threading
+
+SEVERITY_PATTERN = re.compile(r"\b(critical|high|medium|moderate|low)\b", re.I)
+SEVERITY_ALIASES = {"critical": "HIGH", "moderate": "MEDIUM"}
+
+# Requests for prose rather than a filtered list; these go to the worker model
+PROSE_PATTERN = re.compile(
+    r"\b(?:summar(?:y|ize|ise)|explain|describe|overview|elaborate|walk me through|tell me (?:about|more)|why)\b", re.I
+)
+# Unfiltered listings ("show all findings", "list the issues")
+LIST_ALL_PATTERN = re.compile(
+    r"\b(?:all|every(?:thing)?|each)\b"
+    r"|^\W*(?:show|list|display|report|give me)(?:\s+(?:me|the|my))*\s+"
+    r"(?:findings|issues|vulnerabilities|vulns|problems|results)\W*$", re.I
+)
+TOKEN_PATTERN = re.compile(r"[\w-]+")
+
+
+def _line(value: Any) -> int | None:
+    if isinstance(value, int):
+        return value
+    digits = str(value or "").strip().split("-")[0].strip()
+    return int(digits) if digits.isdigit() else None
+
+
+def _phrase(value: Any) -> str:
+    return re.sub(r"[_\s-]+", " ", str(value or "")).strip().lower()
+
+
+@dataclass
+class ReportQuery:
+    """
+    Criteria read from a report request. `numbers` are 1-based positions
+    (-1 is the last finding); `lines` is an inclusive (from, to) range.
+    """
+    query: str
+    severity: List[str] = field(default_factory=list)
+    numbers: List[int] = field(default_factory=list)
+    ids: List[str] = field(default_factory=list)
+    lines: Optional[Tuple[int, int]] = None
+    types: List[str] = field(default_factory=list)
+    categories: List[str] = field(default_factory=list)
+    listing: bool = False
+    prose: bool = False
+
+    @property
+    def filtered(self) -> bool:
+        return bool(self.severity or self.numbers or self.ids or self.lines or self.types or self.categories)
+
+    @property
+    def structured(self) -> bool:
+        """
+        True when the index can select the findings without the worker model.
+        """
+        return self.filtered or self.listing
+
+
+def payload_key(payload: Dict[str, Any]) -> str:
+    """
+    Content hash of an analysis payload's file and findings. Stable across the
+    JSON round trip through session storage, unlike the payload's identity.
+    """
+    findings = ((payload or {}).get("result") or {}).get("findings") or []
+    text = json.dumps([(payload or {}).get("file_path"), findings], sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class FindingsIndex:
+    def __init__(self, payload: Dict[str, Any], key: str | None = None):
+        """
+        Lookup tables over one analysis payload: by severity, 1-based number, id,
+        category, issue type (the fast classifier's description labels) and line.
+        Selections return positions in the original findings order.
+        """
+        self.payload = payload
+        self.key = key or payload_key(payload)
+        self.findings: List[Dict[str, Any]] = ((payload or {}).get("result") or {}).get("findings") or []
+
+        self.by_severity: Dict[str, Set[int]] = {}
+        self.by_id: Dict[str, int] = {}
+        self.by_category: Dict[str, Set[int]] = {}
+        self.by_type: Dict[str, Set[int]] = {}
+        spans: List[Tuple[int, int, int]] = []
+
+        for pos, finding in enumerate(self.findings):
+            severity = str(finding.get("severity") or "").upper()
+            self.by_severity.setdefault(severity, set()).add(pos)
+            if finding.get("id") not in (None, ""):
+                self.by_id[str(finding["id"]).lower()] = pos
+            category = _phrase(finding.get("category"))
+            if category:
+                self.by_category.setdefault(category, set()).add(pos)
+
+            text = " ".join(str(finding.get(key) or "") for key in ("title", "category", "description", "code_snippet"))
+            for pattern, label in DESCRIPTION_PATTERNS:
+                if pattern.search(text):
+                    self.by_type.setdefault(label, set()).add(pos)
+
+            start = _line(finding.get("line"))
+            if start is not None:
+                end = _line(finding.get("end_line"))
+                spans.append((start, max(start, end or start), pos))
+
+        spans.sort()
+        self._starts = [start for start, _, _ in spans]
+        self._spans = spans
+        self._max_span = max((end - start for start, end, _ in spans), default=0)
+
+    # -------------------------
+    # LOOKUPS
+    # -------------------------
+    def at_lines(self, first: int, last: int) -> Set[int]:
+        """
+        Findings whose [line, end_line] overlaps the inclusive range.
+        """
+        lo = bisect_right(self._starts, first - self._max_span - 1)
+        hi = bisect_right(self._starts, last)
+        return {pos for start, end, pos in self._spans[lo:hi] if end >= first}
+
+    def at_numbers(self, numbers: List[int]) -> Set[int]:
+        count = len(self.findings)
+        positions = (count - 1 if n == -1 else n - 1 for n in numbers)
+        return {pos for pos in positions if 0 <= pos < count}
+
+    def parse(self, query: str, target: dict | None = None) -> ReportQuery:
+        """
+        Read structured criteria from the user's message and the router's target.
+        """
+        target = target or {}
+        text = query or ""
+        request = ReportQuery(query=text)
+
+        for match in SEVERITY_PATTERN.findall(text):
+            severity = SEVERITY_ALIASES.get(match.lower(), match.upper())
+            if severity not in request.severity:
+                request.severity.append(severity)
+
+        index = target.get("index") if isinstance(target.get("index"), int) else fast_intent_classifier.extract_index(text)
+        if index:
+            request.numbers.append(index)
+
+        lines = target.get("lines") or fast_intent_classifier.extract_lines(text)
+        if lines:
+            request.lines = (min(lines), max(lines))
+
+        request.ids = [token for token in TOKEN_PATTERN.findall(text.lower())
+                       if token in self.by_id and not token.isdigit()]
+
+        description = target.get("description") or fast_intent_classifier.extract_description(text)
+        if description:
+            request.types.append(description)
+
+        phrase = _phrase(text)
+        request.categories = [category for category in self.by_category if re.search(rf"\b{re.escape(category)}\b", phrase)]
+
+        request.listing = bool(LIST_ALL_PATTERN.search(text))
+        request.prose = bool(PROSE_PATTERN.search(text))
+        return request
+
+    def select(self, request: ReportQuery) -> List[Dict[str, Any]]:
+        """
+        Findings matching every given criterion, in their original order.
+        """
+        selected: Set[int] = set(range(len(self.findings)))
+        if request.severity:
+            selected &= set().union(*(self.by_severity.get(s, set()) for s in request.severity))
+        if request.numbers or request.ids:
+            selected &= self.at_numbers(request.numbers) | {self.by_id[i] for i in request.ids}
+        if request.lines:
+            selected &= self.at_lines(*request.lines)
+        if request.types:
+            selected &= set().union(*(self.by_type.get(t, set()) for t in request.types))
+        if request.categories:
+            selected &= set().union(*(self.by_category[c] for c in request.categories))
+        return [self.findings[pos] for pos in sorted(selected)]
+
+    def report(self, request: ReportQuery) -> Dict[str, Any]:
+        """
+        The selection in the report_findings.j2 output schema.
+        """
+        findings = self.select(request)
+        summary = {"total_selected": len(findings), "high": 0, "medium": 0, "low": 0}
+        for finding in findings:
+            severity = str(finding.get("severity") or "").lower()
+            if severity in summary:
+                summary[severity] += 1
+
+        contains = request.types + request.categories
+        return {
+            "version": "1.0",
+            "task": "report",
+            "status": "success",
+            "result": {
+                "query": request.query,
+                "criteria": {
+                    "severity": request.severity,
+                    "ids": [str(f.get("id")) for f in findings] if request.numbers or request.ids else [],
+                    "contains": contains,
+                    "lines": {"from": request.lines[0], "to": request.lines[1]} if request.lines
+                             else {"from": None, "to": None},
+                },
+                "summary": summary,
+                "findings": findings,
+            },
+            "errors": [],
+        }
+
+
+class FindingsIndexStore:
+    def __init__(self, max_sessions: int = 1000):
+        """
+        One FindingsIndex per session, built when the session's analysis is
+        stored and rebuilt on demand when the cached one was built from other
+        content (a fix that refreshed it, another worker's analysis). Payloads
+        are compared by content hash, so a reload from the database reuses it.
+        """
+        self.max_sessions = max_sessions
+        self._indexes: OrderedDict[str, FindingsIndex] = OrderedDict()
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.local = 0
+        self.summarized = 0
+        self.fallback = 0
+
+    def update(self, session_id: str, payload: Dict[str, Any], key: str | None = None) -> FindingsIndex:
+        index = FindingsIndex(payload, key)
+        with self._lock:
+            self.builds += 1
+            self._indexes.pop(session_id, None)
+            self._indexes[session_id] = index
+            while len(self._indexes) > self.max_sessions:
+                self._indexes.popitem(last=False)
+        return index
+
+    def get(self, session_id: str | None, payload: Dict[str, Any] | None) -> FindingsIndex | None:
+        if not session_id or not isinstance(payload, dict):
+            return None
+        with self._lock:
+            index = self._indexes.get(session_id)
+        key = None
+        if index is not None:
+            key = None if index.payload is payload else payload_key(payload)
+            if key is None or key == index.key:
+                with self._lock:
+                    # Same content: later lookups with this object skip the hash
+                    index.payload = payload
+                    if session_id in self._indexes:
+                        self._indexes.move_to_end(session_id)
+                return index
+        return self.update(session_id, payload, key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._indexes),
+            "builds": self.builds,
+            "local": self.local,
+            "summarized": self.summarized,
+            "fallback": self.fallback,
+        }
+
+
+# Global Instance
+findings_indexes = FindingsIndexStore(max_sessions=settings.REPORT_INDEX_MAX_SESSIONS)
@@ -0,0 +1,85 @@
+from typing import List, Set, Tuple
+from app.config.logger import logger
+
+import asyncio
+
+
+class GitError(Exception):
+    """
+    Raised when a git command fails, times out or git is not installed.
+    """
+
+
+class GitRepo:
+    def __init__(self, directory: str, timeout: float = 30.0):
+        """
+        Read-only view of the git repository containing `directory`. Paths are
+        relative to `directory` and limited to it, as `git -C directory` reports
+        them with `--relative`.
+        """
+        self.directory = directory
+        self.timeout = timeout
+
+    async def _git(self, *args: str) -> str:
+        # Host mounts are usually owned by another user; git refuses those by default
+        command = ["git", "-c", "safe.directory=*", "-C", self.directory, *args]
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError as e:
+            raise GitError("git is not installed") from e
+
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=self.timeout)
+        except asyncio.TimeoutError as e:
+            process.kill()
+            await process.wait()
+            raise GitError(f"git {args[0]} timed out after {self.timeout}s") from e
+
+        if process.returncode != 0:
+            raise GitError(stderr.decode("utf-8", errors="replace").strip() or f"git {args[0]} failed")
+        return stdout.decode("utf-8", errors="replace")
+
+    @staticmethod
+    def _split(output: str) -> List[str]:
+        return [item for item in output.split("\0") if item]
+
+    async def commit(self, ref: str = "HEAD") -> str:
+        """
+        Full commit hash for a ref. Raises GitError outside a repository or for an unknown ref.
+        """
+        return (await self._git("rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}")).strip()
+
+    async def changed_files(self, base: str, head: str | None = None) -> Tuple[Set[str], Set[str]]:
+        """
+        (changed, deleted) between `base` and `head`, or the working tree when
+        `head` is None (untracked files count as changed). Renames show up as
+        a deletion plus an addition.
+        """
+        args = ["diff", "--name-status", "--no-renames", "--relative", "-z", base]
+        if head:
+            args.append(head)
+        items = self._split(await self._git(*args, "--"))
+
+        changed: Set[str] = set()
+        deleted: Set[str] = set()
+        for status, path in zip(items[::2], items[1::2]):
+            (deleted if status.startswith("D") else changed).add(path)
+
+        if head is None:
+            changed.update(self._split(await self._git("ls-files", "--others", "--exclude-standard", "-z")))
+        logger.debug(f"[Git] {base}..{head or 'worktree'} in {self.directory}: {len(changed)} changed, {len(deleted)} deleted")
+        return changed, deleted
+
+    async def list_files(self, ref: str) -> List[str]:
+        """
+        Files tracked at `ref` under the directory.
+        """
+        return self._split(await self._git("ls-tree", "-r", "--name-only", "-z", ref, "--", "."))
+
+    async def read(self, ref: str, path: str) -> str:
+        """
+        Text of a file at `ref` (paths relative to the directory).
+        """
+        return await self._git("show", f"{ref}:./{path}")
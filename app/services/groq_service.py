@@ -1,12 +1,34 @@
-from groq import Groq
 from app.config.settings import settings
 from app.config.logger import logger
 from app.services.prompt_loader import prompt_loader
+from app.services.llm_transport import llm_transport
+from app.services.llm_scheduler import PRIORITY_ROUTER
+from app.services.analysis_cache import analysis_cache, sha256_text
+from app.services.singleflight import singleflight
+from app.services.file_source import FileTooLargeError, SourceFile, file_source
+from app.services.metrics import current_intent, metrics
+from app.services.intent_rules import fast_intent_classifier
+from app.services.sql_prescan import PrescanUndecided, sql_prescanner
+from app.services.patcher import PatchError, apply_hunks, atomic_write_text, fix_window, number_lines
+from app.services.chunker import SourceChunk, merge_findings, python_chunker, summarize_findings
+from app.services.incremental import diff_lines, remap_findings
+from app.services.findings_index import FindingsIndex, findings_indexes, payload_key
+from app.services.triage import TriageVerdict, numbered, parse_verdict, triage_cascade
 
+import asyncio
 import json
 import re
+import time
+from collections import OrderedDict
 from pathlib import Path
 
+
+class FixTargetError(Exception):
+    """
+    Raised when a fix names a finding that cannot be fixed (unknown index, no line number).
+    """
+
+
 class GroqService:
     def __init__(self):
         
@@ -24,13 +46,19 @@ class GroqService:
             self.router_model = settings.ROUTER_LLM_ID
             self.worker_model = settings.WORKER_LLM_ID
         
-        self.client = Groq(api_key=self.api_key)
+        # Pooled keep-alive client with retries and a circuit breaker
+        self.transport = llm_transport
         logger.info(f"GrowqService initialized Successfully.")
         logger.info(f"Using Router Model ID: {settings.ROUTER_LLM_ID}")
         logger.info(f"Using Worker Model ID: {settings.WORKER_LLM_ID}")
         
         self.prompts = prompt_loader
         logger.info(f"Prompt Loader initialized.")
+
+        # Analysis plans and rendered prompts per file content (filled early by prefetch)
+        self._plans: OrderedDict = OrderedDict()
+        self._prepared: OrderedDict = OrderedDict()
+        self._triaged: OrderedDict = OrderedDict()
         
     # -------------------------
     # PATH NORMALIZATION
@@ -40,32 +68,17 @@ class GroqService:
         Convert host paths returned by LLM to container-accessible paths.
         Maps / -> /host/ if necessary.
         """
-        if not file_path:
-            return None
-        
-        path = Path(file_path)
-
-        # If path exists as-is in container, return
-        if path.exists():
-            return str(path)
-
-        # Map host path to /host
-        try:
-            host_path = Path("/host") / path.relative_to("/")
-            if host_path.exists():
-                return str(host_path)
-            else:
-                # Return mapped path anyway (may fail later)
-                return str(host_path)
-        except Exception:
-            return str(path)
+        # Resolution is cached by the shared file source
+        return file_source.resolve(file_path)
 
     # -------------------------
     # ROUTER: classify intent
     # -------------------------
-    def classify_intent(self, history: list[str], memory: dict, query: str) -> dict:
+    async def classify_intent(self, history: list[str], memory: dict, query: str) -> dict:
         """
         Use the router LLM to classify what the user wants.
+        `memory` is the session's compact digest (see HistoryManager.get_digest),
+        not the full analysis payloads.
         Returns a dict with keys:
         {
             "intent": str,
@@ -78,12 +91,23 @@ class GroqService:
             }
         }
         """
+        # Try the deterministic fast path before paying for a router call
+        if settings.INTENT_FAST_PATH_ENABLED:
+            parsed, confidence = fast_intent_classifier.classify(history, memory, query)
+            if confidence >= fast_intent_classifier.threshold:
+                fast_intent_classifier.record(hit=True, intent=parsed["intent"])
+                parsed["file_path"] = self.normalize_path(parsed.get("file_path"))
+                logger.info(f"[Router] Fast-path classified intent ({confidence:.2f}): {parsed}")
+                return parsed
+            fast_intent_classifier.record(hit=False)
+
         # Format last 5 messages for context
         history_text = "\n".join([f"{i+1}. {msg}" for i, msg in enumerate(history[-5:])])
 
         # Load prompt template
-        prompt = self.prompts.render(
+        messages = self.prompts.render_messages(
             "classify_intent.j2",
+            system="You are a strict classifier. Reply ONLY with JSON.",
             history=history_text,
             memory=json.dumps(memory),
             query=query
@@ -91,17 +115,18 @@ class GroqService:
         logger.info(f"Classifying intent with prompt")
 
         try:
-            response = self.client.chat.completions.create(
+            response = await self.transport.complete(
                 model=self.router_model,
-                messages=[
-                    {"role": "system", "content": "You are a strict classifier. Reply ONLY with JSON."},
-                    {"role": "user", "content": prompt},
-                ],
+                messages=messages,
                 temperature=0.1,
                 max_completion_tokens=1000,
+                read_timeout=settings.GROQ_ROUTER_READ_TIMEOUT_SECONDS,
+                priority=PRIORITY_ROUTER,
+                stage="router_call",
             )
             
         except Exception as e:
+            # Also reached without a network call while the circuit breaker is open
             logger.error(f"Error during ROUTER LLM call: {e}")
             logger.error(f"Defaulting to standard parsed structure.")
             return {
@@ -118,6 +143,7 @@ class GroqService:
         raw_output = response.choices[0].message.content.strip()
 
         # Try parsing JSON
+        parse_start = time.perf_counter()
         try:
             parsed = json.loads(raw_output)
         except json.JSONDecodeError:
@@ -140,6 +166,7 @@ class GroqService:
                         "lines": None
                     }
                 }
+        metrics.stage_seconds.observe(time.perf_counter() - parse_start, stage="json_parse", intent=current_intent())
 
         # Normalize schema (make sure all fields exist)
         parsed.setdefault("intent", "general")
@@ -158,7 +185,7 @@ class GroqService:
     # -------------------------
     # WORKER: general answer
     # -------------------------
-    def answer_general(self, history: list[str], query: str, file_path: str | None = None) -> str:
+    async def answer_general(self, history: list[str], query: str, file_path: str | None = None) -> str:
         """
         Answer general questions with history + optional file context.
         """
@@ -168,75 +195,349 @@ class GroqService:
         if file_path:
             file_path = self.normalize_path(file_path)
             try:
-                path = Path(file_path)
-                if path.exists():
-                    file_code = path.read_text(encoding="utf-8")
+                with metrics.stage("file_read"):
+                    file_code = (await file_source.load(file_path)).text
+            except FileNotFoundError:
+                pass
             except Exception as e:
                 logger.warning(f"Could not read file {file_path}: {e}")
 
-        prompt = self.prompts.render(
+        messages = self.prompts.render_messages(
             "general_answer.j2",
+            system="You are a helpful assistant. Use history + code to answer precisely.",
             history=history_text,
             query=query,
             code=file_code or "",
         )
 
         try:
-            response = self.client.chat.completions.create(
+            response = await self.transport.complete(
                 model=self.worker_model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant. Use history + code to answer precisely."},
-                    {"role": "user", "content": prompt},
-                ],
+                messages=messages,
                 temperature=0.7,
                 max_completion_tokens=1500,
             )
             answer = response.choices[0].message.content.strip()
             logger.info("[Worker-General] Answer generated successfully.")
             return answer
-        except Exception as e:
+        except Exception:
             logger.exception("General answer LLM call failed")
             return "Failed to generate general answer. Please try again."
 
     # -------------------------
     # WORKER: analyze file
     # -------------------------
-    def analyze_file(self, file_path: str) -> str:
+    async def analyze_file(self, file_path: str) -> str:
         file_path = self.normalize_path(file_path)
-        path = Path(file_path)
-        if not path.exists():
+        try:
+            with metrics.stage("file_read"):
+                source = await file_source.load(file_path)
+        except FileNotFoundError:
             logger.error(f"File not found: {file_path}")
             return f"File not found: {file_path}"
-
-        try:
-            source_code = path.read_text(encoding="utf-8")
+        except FileTooLargeError as e:
+            logger.error(f"Refusing to read {file_path}: {e}")
+            return f"File too large: {file_path} ({e})"
         except Exception as e:
             logger.exception(f"Failed to read file: {file_path}")
             return f"Failed to read file: {file_path} ({e})"
 
-        prompt = self.prompts.render("analyze_file.j2", code=source_code)
+        # Concurrent requests for the same file contents share one analysis
+        source_code = source.text
+        key = ("analyze", file_path, source.sha256, None)
+        return await singleflight.do(key, lambda: self._analyze_loaded(source_code, file_path, source.sha256))
+
+    async def analyze_text(self, source_code: str, file_path: str) -> dict | str:
+        """
+        Analyze source that was not read from disk, e.g. a file at a git ref.
+        """
+        source_hash = sha256_text(source_code)
+        key = ("analyze", file_path, source_hash, None)
+        return await singleflight.do(key, lambda: self._analyze_loaded(source_code, file_path, source_hash))
+
+    async def _analyze_loaded(self, source_code: str, file_path: str, source_hash: str | None = None) -> dict | str:
+        """
+        Analyze already-read source (one run per distinct file content).
+        """
+        chunks = self._analysis_plan(source_code, file_path, source_hash)
+        if chunks == []:
+            logger.info(f"[Worker-Analyze] No SQL candidates in {file_path}, skipping LLM")
+            return self._empty_analysis()
+
+        if triage_cascade.enabled:
+            chunks = await self._triage_plan(source_code, file_path, chunks, source_hash)
+            if chunks == []:
+                logger.info(f"[Worker-Analyze] Triage cleared {file_path}, skipping the worker model")
+                return self._empty_analysis()
+
+        if chunks:
+            return await self._analyze_chunks(chunks, file_path)
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.worker_model,
-                messages=[
-                    {"role": "system", "content": "You are a security analyzer. Identify vulnerabilities clearly."},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.2,
-                max_completion_tokens=2000,
-            )
-            analysis = response.choices[0].message.content.strip()
-            logger.info(f"[Worker-Analyze] Analysis completed for {file_path}")
-            return json.loads(analysis)
-        except Exception as e:
+            return await self._analyze_source(source_code, file_path, source_hash=source_hash)
+        except Exception:
             logger.exception("Analyze file LLM call failed")
             return f"Failed to analyze file {file_path}. Please try again."
-        
+
+    def _analysis_plan(self, source_code: str, file_path: str, source_hash: str | None = None) -> list[SourceChunk] | None:
+        """
+        Chunks to analyze: [] for a file the pre-scan finds clean, None to send the
+        whole file. Memoized per file content.
+        """
+        key = (file_path, source_hash or sha256_text(source_code))
+        if key in self._plans:
+            self._plans.move_to_end(key)
+            return self._plans[key]
+
+        # Local pre-pass: clean files skip the LLM, others send only suspicious regions
+        chunks = self._prescan_regions(source_code, file_path)
+
+        # Large Python files are split at AST boundaries and analyzed in parallel
+        if chunks is None:
+            chunks = self._split_for_analysis(source_code, file_path)
+
+        self._memoize(self._plans, key, chunks)
+        return chunks
+
+    def _prepare_analysis(self, code: str, fragment: bool = False, source_hash: str | None = None) -> tuple:
+        """
+        Rendered worker messages and cache key for `code`:
+        (messages, cache_key, source_hash, prompt_hash). Memoized per content.
+        """
+        source_hash = source_hash or sha256_text(code)
+        key = (source_hash, fragment)
+        if key in self._prepared:
+            self._prepared.move_to_end(key)
+            return self._prepared[key]
+
+        messages = self.prompts.render_messages(
+            "analyze_file.j2",
+            system="You are a security analyzer. Identify vulnerabilities clearly.",
+            code=code,
+            fragment=fragment,
+        )
+        prompt = "\n\n".join(m["content"] for m in messages)
+        cache_key, source_hash, prompt_hash = analysis_cache.make_key(code, prompt, self.worker_model, source_hash)
+
+        prepared = (messages, cache_key, source_hash, prompt_hash)
+        self._memoize(self._prepared, key, prepared)
+        return prepared
+
+    async def _triage_plan(self, source_code: str, file_path: str, chunks: list[SourceChunk] | None,
+                           source_hash: str | None = None) -> list[SourceChunk] | None:
+        """
+        First cascade tier: the triage model screens each unit of the plan. Returns
+        the chunks to escalate ([] when all were cleared), or None to send the
+        whole file. A flagged whole file is narrowed to the regions triage named.
+        """
+        whole = chunks is None
+        units = [SourceChunk(source_code, list(range(1, len(source_code.splitlines()) + 1)))] if whole else chunks
+        semaphore = asyncio.Semaphore(settings.ANALYZE_CHUNK_CONCURRENCY)
+
+        async def run(unit: SourceChunk) -> TriageVerdict | None:
+            async with semaphore:
+                return await self._triage_unit(unit, file_path, fragment=not whole, source_hash=source_hash if whole else None)
+
+        verdicts = await asyncio.gather(*(run(u) for u in units))
+        escalated = [(u, v) for u, v in zip(units, verdicts) if v is None or triage_cascade.escalate(v)]
+        if not whole:
+            return [u for u, _ in escalated]
+        if not escalated:
+            return []
+
+        verdict = escalated[0][1]
+        if verdict is not None and verdict.regions and file_path.endswith(".py"):
+            try:
+                narrowed = python_chunker.split(source_code, only_lines=verdict.lines)
+            except SyntaxError:
+                narrowed = []
+            if narrowed:
+                logger.info(f"[Worker-Triage] Narrowed {file_path} to {len(narrowed)} flagged region(s)")
+                return narrowed
+        return None
+
+    async def _triage_unit(self, unit: SourceChunk, file_path: str, fragment: bool,
+                           source_hash: str | None = None) -> TriageVerdict | None:
+        """
+        Triage verdict for one unit, or None to escalate without one (the worker
+        result is already cached, or the triage call failed).
+        """
+        # The worker answer would come from cache; triage could only add a call
+        _, cache_key, _, _ = self._prepare_analysis(unit.text, fragment, source_hash)
+        if await analysis_cache.get(cache_key) is not None:
+            triage_cascade.record("cached")
+            return None
+
+        key = (sha256_text(unit.text), triage_cascade.model)
+        verdict = self._triaged.get(key)
+        if verdict is None:
+            messages = self.prompts.render_messages("triage_file.j2", code=numbered(unit))
+            start = time.perf_counter()
+            try:
+                response = await self.transport.complete(
+                    model=triage_cascade.model,
+                    messages=messages,
+                    temperature=0.0,
+                    max_completion_tokens=300,
+                    stage="triage_call",
+                )
+                verdict = parse_verdict(response.choices[0].message.content)
+            except Exception as e:
+                logger.warning(f"[Worker-Triage] Triage failed for {file_path}, escalating: {e}")
+                triage_cascade.record("error")
+                return None
+            finally:
+                triage_cascade.tier_seconds.observe(time.perf_counter() - start, tier="triage")
+            self._memoize(self._triaged, key, verdict, limit=1024)
+
+        escalate = triage_cascade.escalate(verdict)
+        triage_cascade.record("escalated" if escalate else "cleared", verdict.risk)
+        logger.info(f"[Worker-Triage] {file_path}:{unit.start_line}-{unit.end_line} risk={verdict.risk:.2f} "
+                    f"-> {'worker' if escalate else 'cleared'}")
+        return verdict
+
+    @staticmethod
+    def _memoize(store: OrderedDict, key: tuple, value, limit: int = 128) -> None:
+        store[key] = value
+        store.move_to_end(key)
+        while len(store) > limit:
+            store.popitem(last=False)
+
+    async def prefetch_analysis(self, file_path: str, source: SourceFile) -> None:
+        """
+        Speculative analyze preparation for an already read file: plan the
+        analysis, render its prompts and pull cached results into memory.
+        """
+        chunks = self._analysis_plan(source.text, file_path, source.sha256)
+        if chunks == []:
+            return
+
+        if chunks:
+            prepared = [self._prepare_analysis(c.text, fragment=True) for c in chunks]
+        else:
+            prepared = [self._prepare_analysis(source.text, source_hash=source.sha256)]
+        await asyncio.gather(*(analysis_cache.warm(cache_key) for _, cache_key, _, _ in prepared))
+
+    def _split_for_analysis(self, source_code: str, file_path: str) -> list[SourceChunk] | None:
+        """
+        Return AST chunks for Python files longer than ANALYZE_CHUNK_LINES, else None.
+        """
+        if not file_path.endswith(".py") or source_code.count("\n") < settings.ANALYZE_CHUNK_LINES:
+            return None
+        try:
+            chunks = python_chunker.split(source_code)
+        except SyntaxError as e:
+            logger.warning(f"[Worker-Analyze] Cannot chunk {file_path}, analyzing as a whole: {e}")
+            return None
+        return chunks if len(chunks) > 1 else None
+
+    def _prescan_regions(self, source_code: str, file_path: str) -> list[SourceChunk] | None:
+        """
+        Chunks covering only the pre-scanner's SQL candidates.
+        Returns [] for a clean file and None when the pre-pass does not apply.
+        """
+        if not settings.ANALYZE_PRESCAN_ENABLED or not file_path.endswith(".py"):
+            return None
+        try:
+            candidates = sql_prescanner.scan(source_code)
+            lines = {n for c in candidates for n in range(c.line, c.end_line + 1)}
+            chunks = python_chunker.split(source_code, only_lines=lines) if lines else []
+        except SyntaxError as e:
+            logger.warning(f"[Worker-Analyze] Cannot pre-scan {file_path}, analyzing as a whole: {e}")
+            return None
+        except PrescanUndecided as e:
+            logger.info(f"[Worker-Analyze] Pre-scan undecided for {file_path} ({e}), analyzing as a whole")
+            return None
+
+        sql_prescanner.record(source_code.count("\n") + 1, sum(c.size for c in chunks))
+        logger.info(f"[Worker-Analyze] Pre-scan found {len(candidates)} SQL candidates in {file_path}")
+        return chunks
+
+    @staticmethod
+    def _empty_analysis() -> dict:
+        return {
+            "version": "1.0",
+            "task": "analyze",
+            "status": "success",
+            "result": {
+                "summary": summarize_findings([]),
+                "findings": [],
+            },
+        }
+
+    async def _analyze_source(self, code: str, file_path: str, fragment: bool = False,
+                              source_hash: str | None = None) -> dict:
+        """
+        Run (or serve from cache) one worker analysis over `code`.
+        Raises on LLM or JSON errors.
+        """
+        messages, cache_key, source_hash, prompt_hash = self._prepare_analysis(code, fragment, source_hash)
+
+        # Serve unchanged source + prompt + model from cache
+        cached = await analysis_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"[Worker-Analyze] Cache hit for {file_path}")
+            return cached
+
+        start = time.perf_counter()
+        response = await self.transport.complete(
+            model=self.worker_model,
+            messages=messages,
+            temperature=0.2,
+            max_completion_tokens=2000,
+        )
+        triage_cascade.tier_seconds.observe(time.perf_counter() - start, tier="worker")
+        analysis = json.loads(response.choices[0].message.content.strip())
+        logger.info(f"[Worker-Analyze] Analysis completed for {file_path}")
+
+        await analysis_cache.set(cache_key, analysis, source_hash, prompt_hash, self.worker_model)
+        return analysis
+
+    async def _analyze_chunks(self, chunks: list[SourceChunk], file_path: str) -> dict | str:
+        """
+        Analyze chunks concurrently and merge them into a single analysis payload.
+        """
+        logger.info(f"[Worker-Analyze] Splitting {file_path} into {len(chunks)} chunks "
+                    f"(largest {max(c.size for c in chunks)} lines)")
+        semaphore = asyncio.Semaphore(settings.ANALYZE_CHUNK_CONCURRENCY)
+
+        async def run(chunk: SourceChunk) -> dict:
+            async with semaphore:
+                return await self._analyze_source(chunk.text, f"{file_path}:{chunk.start_line}-{chunk.end_line}", fragment=True)
+
+        outcomes = await asyncio.gather(*(run(c) for c in chunks), return_exceptions=True)
+
+        results, analyzed, errors = [], [], []
+        for chunk, outcome in zip(chunks, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"[Worker-Analyze] Chunk {chunk.start_line}-{chunk.end_line} of {file_path} failed: {outcome}")
+                errors.append(f"Lines {chunk.start_line}-{chunk.end_line} could not be analyzed.")
+            else:
+                results.append(outcome)
+                analyzed.append(chunk)
+
+        if not results:
+            return f"Failed to analyze file {file_path}. Please try again."
+
+        findings = merge_findings(results, analyzed)
+        payload = {
+            "version": "1.0",
+            "task": "analyze",
+            "status": "partial" if errors else "success",
+            "result": {
+                "summary": summarize_findings(findings),
+                "findings": findings,
+            },
+        }
+        if errors:
+            payload["errors"] = errors
+        return payload
+
     # -------------------------
     # WORKER: Report Findings
     # -------------------------    
-    def report_findings(self, query: str, target: dict = None, memory: dict = None) -> str:
+    async def report_findings(self, query: str, target: dict = None, memory: dict = None,
+                              index: FindingsIndex | None = None) -> str:
 
         if not memory:
             logger.error("No analysis memory available for reporting.")
@@ -246,8 +547,20 @@ class GroqService:
             return "No analysis memory available. Please run an analysis first."
         
         analysis = memory["last_analyze"]
+
+        # Severity/number/line/type filters are answered from the session's index
+        if index is not None and settings.REPORT_LOCAL_ENABLED:
+            request = index.parse(query, target)
+            if request.prose:
+                return await self._summarize_report(index.report(request))
+            if request.structured:
+                findings_indexes.local += 1
+                report = index.report(request)
+                logger.info(f"[Worker-Report] Answered locally: {report['result']['summary']['total_selected']} finding(s) selected.")
+                return report
+            findings_indexes.fallback += 1
         
-        prompt = prompt_loader.render(
+        messages = self.prompts.render_messages(
             "report_findings.j2",
             query=query,
             target=target or {},
@@ -255,9 +568,9 @@ class GroqService:
         )
 
         try:
-            response = self.client.chat.completions.create(
+            response = await self.transport.complete(
                 model=settings.WORKER_LLM_ID,
-                messages=[{"role": "user", "content": prompt}],
+                messages=messages,
                 temperature=0.0,
             )
             report = response.choices[0].message.content.strip()
@@ -269,44 +582,192 @@ class GroqService:
         logger.info("[Worker-Report] Report generated successfully.")
         return json.loads(report)
 
+    async def _summarize_report(self, report: dict) -> dict:
+        """
+        Add a prose summary of the selected findings; only that subset is sent.
+        """
+        findings_indexes.summarized += 1
+        result = report["result"]
+        messages = self.prompts.render_messages(
+            "report_summary.j2",
+            query=result["query"],
+            findings=result["findings"],
+        )
+        try:
+            response = await self.transport.complete(
+                model=self.worker_model,
+                messages=messages,
+                temperature=0.2,
+                max_completion_tokens=600,
+            )
+            result["narrative"] = response.choices[0].message.content.strip()
+        except Exception:
+            logger.exception("[Worker-Report] Summary LLM call failed; returning the selection only")
+            report["errors"].append("Summary unavailable; the selected findings are listed.")
+
+        logger.info(f"[Worker-Report] Summarized {result['summary']['total_selected']} finding(s).")
+        return report
+
     # -------------------------
     # WORKER: fix file
     # -------------------------
-    def fix_file(self, file_path: str, target: dict = None) -> str:
+    async def fix_file(self, file_path: str, target: dict = None, memory: dict = None) -> str:
         file_path = self.normalize_path(file_path)
         path = Path(file_path)
-        if not path.exists():
+        try:
+            with metrics.stage("file_read"):
+                source = await file_source.load(file_path)
+        except FileNotFoundError:
             logger.error(f"File not found: {file_path}")
             return f"File not found: {file_path}"
-
-        try:
-            source_code = path.read_text(encoding="utf-8")
+        except FileTooLargeError as e:
+            logger.error(f"Refusing to read {file_path}: {e}")
+            return f"File too large: {file_path} ({e})"
         except Exception as e:
             logger.exception(f"Failed to read file: {file_path}")
             return f"Failed to read file: {file_path} ({e})"
 
+        # Identical concurrent fixes run once instead of patching the same file twice;
+        # targets like "the 2nd one" resolve against the session's findings, so they are part of the key
+        source_code = source.text
+        findings_key = payload_key((memory or {}).get("last_analyze") or {})
+        key = ("fix", file_path, source.sha256, json.dumps(target or {}, sort_keys=True), findings_key)
+        result = await singleflight.do(key, lambda: self._fix_loaded(path, source_code, target, memory))
+
+        # Bring the session's last analysis up to date with the rewritten file
+        refreshed = await self._refresh_analysis(file_path, source, memory)
+        if refreshed is not None:
+            memory["last_analyze"] = refreshed
+            total = refreshed["result"]["summary"]["total_findings"]
+            result = f"{result} Re-checked the changed regions: {total} finding(s) remain."
+        return result
+
+    async def _refresh_analysis(self, file_path: str, before: SourceFile, memory: dict | None) -> dict | None:
+        """
+        Incrementally re-analyze `file_path` if it changed since `before` was read and
+        the session's last analysis is for this file. Returns the updated analysis.
+        """
+        previous = (memory or {}).get("last_analyze")
+        if not settings.FIX_REANALYZE_ENABLED or not previous:
+            return None
+        if previous.get("file_path") and self.normalize_path(previous["file_path"]) != file_path:
+            return None
+
+        try:
+            after = await file_source.load(file_path)
+        except Exception as e:
+            logger.warning(f"[Worker-Reanalyze] Could not re-read {file_path}: {e}")
+            return None
+        if after.sha256 == before.sha256:
+            return None
+
+        if not previous.get("file_path"):
+            # No proof the stored findings belong to this file; remapping them could mix files
+            logger.info(f"[Worker-Reanalyze] Last analysis has no file path, running a full analysis of {file_path}")
+            result = await self._analyze_loaded(after.text, file_path)
+            return {**result, "file_path": file_path} if isinstance(result, dict) else None
+
+        key = ("reanalyze", file_path, before.sha256, after.sha256)
+        return await singleflight.do(key, lambda: self._reanalyze_changes(before.text, after.text, file_path, previous))
+
+    async def _reanalyze_changes(self, old_code: str, new_code: str, file_path: str, previous: dict) -> dict | None:
+        """
+        Remap surviving findings onto the new line numbers and re-analyze only the
+        top-level blocks that contain changed lines. Falls back to a full analysis
+        when the file cannot be split.
+        """
+        diff = diff_lines(old_code, new_code)
+        findings = remap_findings((previous.get("result") or {}).get("findings", []) or [], diff)
+
+        try:
+            units = python_chunker.split(new_code, only_lines=diff.changed) if file_path.endswith(".py") else None
+        except SyntaxError:
+            units = None
+        if units is None:
+            logger.info(f"[Worker-Reanalyze] Cannot localize changes in {file_path}, running a full analysis")
+            result = await self._analyze_loaded(new_code, file_path)
+            return {**result, "file_path": previous.get("file_path")} if isinstance(result, dict) else None
+
+        # Findings inside re-analyzed blocks are replaced by the fresh results
+        covered = {n for unit in units for n in unit.line_map if n is not None}
+        findings = [
+            f for f in findings
+            if not isinstance(f.get("line"), int) or not covered.intersection(range(f["line"], (f.get("end_line") or f["line"]) + 1))
+        ]
+
+        wanted = covered
+        if settings.ANALYZE_PRESCAN_ENABLED:
+            try:
+                wanted = {n for c in sql_prescanner.scan(new_code) for n in range(c.line, c.end_line + 1)} & covered
+            except PrescanUndecided as e:
+                logger.info(f"[Worker-Reanalyze] Pre-scan undecided for {file_path} ({e}), re-analyzing every changed block")
+        chunks = python_chunker.split(new_code, only_lines=wanted) if wanted else []
+
+        errors = []
+        if chunks:
+            fresh = await self._analyze_chunks(chunks, file_path)
+            if not isinstance(fresh, dict):
+                return None
+            findings.extend(fresh["result"]["findings"])
+            errors = fresh.get("errors", [])
+
+        findings.sort(key=lambda f: (not isinstance(f.get("line"), int), f.get("line") or 0))
+        for i, finding in enumerate(findings, start=1):
+            finding["id"] = f"F{i}"
+        logger.info(f"[Worker-Reanalyze] {file_path}: {len(diff.changed)} changed lines, "
+                    f"{sum(c.size for c in chunks)} lines re-analyzed, {len(findings)} findings")
+
+        refreshed = {
+            "version": "1.0",
+            "task": "analyze",
+            "status": "partial" if errors else "success",
+            "result": {
+                "summary": summarize_findings(findings),
+                "findings": findings,
+            },
+            "file_path": previous.get("file_path"),
+        }
+        if errors:
+            refreshed["errors"] = errors
+        return refreshed
+
+    async def _fix_loaded(self, path: Path, source_code: str, target: dict | None, memory: dict | None) -> str:
+        """
+        Fix already-read source (one run per distinct file content and target).
+        """
+        file_path = str(path)
+
         # Choose correct prompt
-        if target and (target.get("raw") or target.get("index") or target.get("description")):
+        if target and (target.get("raw") or target.get("index") or target.get("description") or target.get("lines")):
+            # Targeted fixes we can locate are patched locally from a small hunk
+            try:
+                span = self._locate_target(target, memory, file_path)
+            except FixTargetError as e:
+                logger.warning(f"[Worker-Fix] Rejected fix target {target} for {file_path}: {e}")
+                return f"❌ {e}"
+            if span:
+                logger.info(f"[Worker-Fix] Performing HUNK fix on {file_path} lines {span[0]}-{span[1]} with target: {target}")
+                return await self._fix_hunk(path, source_code, target, *span)
+
             prompt_template = "fix_partial_file.j2"
             logger.info(f"[Worker-Fix] Performing PARTIAL fix on {file_path} with target: {target}")
         else:
             prompt_template = "fix_file.j2"
             logger.info(f"[Worker-Fix] Performing FULL fix on {file_path}")
 
-        prompt = self.prompts.render(
+        messages = self.prompts.render_messages(
             prompt_template,
+            system="You are a code fixer. Return only corrected code.",
             code=source_code,
             target=target or {}
         )
-        logger.debug(f"[Worker-Fix] Prompt:\n{prompt}")
+        # Lazy formatting: the prompt is only interpolated when DEBUG is enabled
+        logger.debug("[Worker-Fix] Prompt:\n%s", messages[-1]['content'])
 
         try:
-            response = self.client.chat.completions.create(
+            response = await self.transport.complete(
                 model=self.worker_model,
-                messages=[
-                    {"role": "system", "content": "You are a code fixer. Return only corrected code."},
-                    {"role": "user", "content": prompt},
-                ],
+                messages=messages,
                 temperature=0.2,
                 max_completion_tokens=4000,
             )
@@ -322,17 +783,125 @@ class GroqService:
                 
             fixed_code = fixed_code.strip()
         
-        except Exception as e:
+        except Exception:
             logger.exception("Fix file LLM call failed")
             return f"❌ Failed to fix file {file_path}. Please try again."
 
+        # Never write back a file the model did not finish
+        if getattr(response.choices[0], "finish_reason", None) == "length":
+            logger.error(f"[Worker-Fix] Output truncated for {file_path}; file left unchanged.")
+            return f"❌ The fixed version of {file_path} was truncated, so the file was left unchanged."
+
         try:
-            path.write_text(fixed_code, encoding="utf-8")
+            with metrics.stage("write_back"):
+                await asyncio.to_thread(atomic_write_text, path, fixed_code)
             logger.info(f"[Worker-Fix] File {file_path} fixed successfully.")
             return f"✅ File {file_path} fixed successfully."
         except Exception as e:
             logger.exception(f"Failed to write fixed file: {file_path}")
             return f"❌ Failed to write fixed file: {file_path} ({e})"
 
+    def _locate_target(self, target: dict, memory: dict | None, file_path: str) -> tuple[int, int, dict | None] | None:
+        """
+        Resolve a fix target to (start_line, end_line, finding) using explicit
+        lines or the findings of the last analysis. None if it cannot be pinned down.
+        Raises FixTargetError when the index names no finding or one without a line.
+        """
+        analysis = (memory or {}).get("last_analyze") or {}
+        analyzed_path = analysis.get("file_path")
+        listed = []
+        if not analyzed_path or self.normalize_path(analyzed_path) == file_path:
+            listed = (analysis.get("result") or {}).get("findings", []) or []
+        # Indices refer to the findings as the user saw them, located or not
+        findings = [f for f in listed if isinstance(f.get("line"), int)]
+
+        lines = [n for n in (target.get("lines") or []) if isinstance(n, int)]
+        if lines:
+            start, end = min(lines), max(lines)
+            overlapping = [f for f in findings if f["line"] <= end and (f.get("end_line") or f["line"]) >= start]
+            return start, end, overlapping[0] if len(overlapping) == 1 else None
+
+        index = target.get("index")
+        if isinstance(index, int) and listed:
+            if index < 0:
+                # Counted from the end ("the last one" is -1), as in FindingsIndex.at_numbers
+                index = len(listed) + index + 1
+            if not 1 <= index <= len(listed):
+                raise FixTargetError(f"There is no finding #{index}; the last analysis of {file_path} "
+                                     f"has {len(listed)} finding(s).")
+            finding = listed[index - 1]
+            if not isinstance(finding.get("line"), int):
+                raise FixTargetError(f"Finding #{index} ({finding.get('title', 'Untitled')}) has no line number, "
+                                     f"so it cannot be fixed on its own. Describe the code to change instead.")
+            return finding["line"], finding.get("end_line") or finding["line"], finding
+
+        description = (target.get("description") or "").lower()
+        keywords = [w for w in re.findall(r"[\w.%-]{3,}", description) if w not in {"issue", "issues", "vulnerability", "the"}]
+        if keywords:
+            matches = [
+                f for f in findings
+                if any(k in f"{f.get('title', '')} {f.get('description', '')} {f.get('code_snippet', '')}".lower() for k in keywords)
+            ]
+            if len(matches) == 1:
+                finding = matches[0]
+                return finding["line"], finding.get("end_line") or finding["line"], finding
+
+        return None
+
+    async def _fix_hunk(self, path: Path, source_code: str, target: dict, start: int, end: int, finding: dict | None) -> str:
+        """
+        Send a numbered window around the target, get replacement hunks back and
+        apply them locally with context checks and an atomic write.
+        """
+        file_path = str(path)
+        window = fix_window(source_code, start, end, settings.FIX_WINDOW_CONTEXT_LINES, settings.FIX_WINDOW_MAX_LINES)
+        excerpt = number_lines(source_code, *window)
+
+        messages = self.prompts.render_messages(
+            "fix_hunk.j2",
+            system="You are a code fixer. Reply ONLY with JSON replacement hunks.",
+            target=target,
+            finding=finding,
+            file_name=path.name,
+            start_line=window[0],
+            end_line=window[1],
+            excerpt=excerpt,
+        )
+        logger.debug("[Worker-Fix] Hunk prompt:\n%s", messages[-1]['content'])
+
+        try:
+            response = await self.transport.complete(
+                model=self.worker_model,
+                messages=messages,
+                temperature=0.2,
+                # Output scales with the window, not the file
+                max_completion_tokens=min(4000, 256 + len(excerpt) // 2),
+            )
+            raw_output = response.choices[0].message.content.strip()
+            match = re.search(r"\{.*\}", raw_output, re.DOTALL)
+            hunks = json.loads(match.group(0) if match else raw_output).get("hunks", [])
+        except Exception:
+            logger.exception("Fix hunk LLM call failed")
+            return f"❌ Failed to fix file {file_path}. Please try again."
+
+        if not hunks:
+            logger.warning(f"[Worker-Fix] Model could not identify the target in {file_path}; no changes made.")
+            return f"⚠️ Could not confidently identify the targeted issue in {file_path}. No changes were made."
+
+        try:
+            fixed_code = apply_hunks(source_code, hunks, window)
+        except PatchError as e:
+            logger.error(f"[Worker-Fix] Hunk rejected for {file_path}: {e}")
+            return f"❌ The proposed fix for {file_path} did not match the file ({e}). No changes were made."
+
+        try:
+            with metrics.stage("write_back"):
+                await asyncio.to_thread(atomic_write_text, path, fixed_code)
+            logger.info(f"[Worker-Fix] File {file_path} patched with {len(hunks)} hunk(s).")
+            return f"✅ File {file_path} fixed successfully."
+        except Exception as e:
+            logger.exception(f"Failed to write fixed file: {file_path}")
+            return f"❌ Failed to write fixed file: {file_path} ({e})"
+
 # Global Instance
 groq_service = GroqService()
\ No newline at end of file
@@ -0,0 +1,156 @@
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+from groq import APIConnectionError, APIStatusError, APITimeoutError
+from sqlalchemy import text
+from app.config.database import SessionLocal, async_engine
+from app.config.settings import settings
+from app.config.logger import logger
+from app.services.llm_transport import llm_transport
+from app.services.prompt_loader import prompt_loader
+
+import asyncio
+import time
+
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+UNHEALTHY = "unhealthy"
+
+# A failing critical check makes the service unready; the others only degrade it
+CRITICAL_CHECKS = {"database", "prompts"}
+
+
+def _select_one() -> None:
+    with SessionLocal() as db:
+        db.execute(text("SELECT 1"))
+
+
+async def check_database() -> Dict[str, Any]:
+    if async_engine is not None:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    else:
+        await asyncio.to_thread(_select_one)
+    return {"status": HEALTHY}
+
+
+async def check_llm() -> Dict[str, Any]:
+    """
+    Provider reachability (listing models costs no tokens) plus circuit breaker state.
+    """
+    breaker = llm_transport.breaker.snapshot()
+    if not settings.HEALTH_CHECK_LLM:
+        return {"status": DEGRADED if breaker["state"] == "open" else HEALTHY, "breaker": breaker["state"]}
+
+    try:
+        await llm_transport.client.models.list(timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+        reachable = True
+    except (APIConnectionError, APITimeoutError):
+        reachable = False
+    except APIStatusError as e:
+        # Any answer below 500 means the provider is up
+        reachable = e.status_code < 500
+
+    status = HEALTHY if reachable and breaker["state"] != "open" else UNHEALTHY
+    return {"status": status, "reachable": reachable, "breaker": breaker["state"]}
+
+
+async def check_prompts() -> Dict[str, Any]:
+    exists = prompt_loader.base_path.is_dir()
+    templates = len(prompt_loader.templates)
+    return {"status": HEALTHY if exists and templates else UNHEALTHY, "templates": templates}
+
+
+class HealthMonitor:
+    def __init__(self, interval: float = 15.0, timeout: float = 5.0):
+        """
+        Runs dependency checks in the background every `interval` seconds and keeps
+        the latest results, so health and readiness probes only read a dict.
+        """
+        self.interval = interval
+        self.timeout = timeout
+        self.checks: Dict[str, Callable[[], Awaitable[Dict[str, Any]]]] = {
+            "database": check_database,
+            "llm": check_llm,
+            "prompts": check_prompts,
+        }
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.last_run: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run_check(self, name: str, check: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(check(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            result = {"status": UNHEALTHY, "error": f"timed out after {self.timeout:.0f}s"}
+        except Exception as e:
+            result = {"status": UNHEALTHY, "error": str(e)}
+
+        result["response_time_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        result["checked_at"] = datetime.now(timezone.utc).isoformat()
+
+        previous = self.results.get(name, {}).get("status")
+        if previous and previous != result["status"]:
+            logger.warning(f"[Health] {name} changed from {previous} to {result['status']}")
+        return result
+
+    async def run_checks(self) -> None:
+        names = list(self.checks)
+        results = await asyncio.gather(*(self._run_check(n, self.checks[n]) for n in names))
+        self.results = dict(zip(names, results))
+        self.last_run = datetime.now(timezone.utc)
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_checks()
+            except Exception:
+                logger.exception("[Health] Background checks failed")
+
+    async def start(self) -> None:
+        """
+        Run one round of checks, then keep refreshing them in the background.
+        """
+        await self.run_checks()
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"[Health] Monitor started (every {self.interval:.0f}s)")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """
+        Latest results and the overall status. Checks run inline only if the
+        monitor has not been started (e.g. without the app lifespan).
+        """
+        if self.last_run is None:
+            await self.run_checks()
+
+        statuses = {name: result["status"] for name, result in self.results.items()}
+        if any(statuses.get(name) != HEALTHY for name in CRITICAL_CHECKS):
+            overall = UNHEALTHY
+        elif any(status != HEALTHY for status in statuses.values()):
+            overall = DEGRADED
+        else:
+            overall = HEALTHY
+
+        return {
+            "status": overall,
+            "ready": overall != UNHEALTHY,
+            "checked_at": self.last_run.isoformat(),
+            "checks": self.results,
+        }
+
+
+# Global Instance
+health_monitor = HealthMonitor(
+    interval=settings.HEALTH_CHECK_INTERVAL_SECONDS,
+    timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,56 @@
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Set
+
+
+@dataclass
+class LineDiff:
+    """
+    Line-level difference between two versions of a file.
+
+    `mapping` sends every unchanged old line number to its new number;
+    `changed` holds the new line numbers that were inserted or rewritten,
+    plus the lines either side of a pure deletion.
+    """
+    mapping: Dict[int, int] = field(default_factory=dict)
+    changed: Set[int] = field(default_factory=set)
+
+    @property
+    def unchanged(self) -> bool:
+        return not self.changed
+
+
+def diff_lines(old: str, new: str) -> LineDiff:
+    old_lines, new_lines = old.splitlines(), new.splitlines()
+    diff = LineDiff()
+
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            for offset in range(i2 - i1):
+                diff.mapping[i1 + offset + 1] = j1 + offset + 1
+        elif tag == "delete":
+            diff.changed.update(n for n in (j1, j1 + 1) if 1 <= n <= len(new_lines))
+        else:
+            diff.changed.update(range(j1 + 1, j2 + 1))
+
+    return diff
+
+
+def remap_findings(findings: List[Dict[str, Any]], diff: LineDiff) -> List[Dict[str, Any]]:
+    """
+    Findings whose lines all survived unchanged, moved to their new line numbers.
+    Findings touching a rewritten or deleted line are dropped; findings without
+    a line number are kept as they are.
+    """
+    survivors: List[Dict[str, Any]] = []
+    for finding in findings:
+        line = finding.get("line")
+        if not isinstance(line, int):
+            survivors.append(dict(finding))
+            continue
+
+        end = finding.get("end_line") if isinstance(finding.get("end_line"), int) else line
+        if all(n in diff.mapping for n in range(line, max(line, end) + 1)):
+            survivors.append({**finding, "line": diff.mapping[line], "end_line": diff.mapping[max(line, end)]})
+    return survivors
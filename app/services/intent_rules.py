@@ -0,0 +1,226 @@
+from typing import Any, Dict, List, Optional, Tuple
+from app.config.settings import settings
+
+import re
+
+# File-like tokens: optional directories + name + a known source extension
+PATH_PATTERN = re.compile(
+    r"(?<![\w/.~-])((?:~|\.{1,2})?/?(?:[\w.-]+/)*[\w-]+\."
+    r"(?:py|pyw|js|jsx|ts|tsx|java|kt|go|rb|php|cs|c|cc|cpp|h|rs|sql|scala|swift))\b"
+)
+
+ORDINAL_WORDS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5,
+    "sixth": 6, "seventh": 7, "eighth": 8, "ninth": 9, "tenth": 10, "last": -1,
+}
+INDEX_PATTERNS = [
+    re.compile(r"\b(\d+)(?:st|nd|rd|th)\b", re.I),
+    re.compile(r"(?:#|\b(?:issue|finding|vulnerability|vuln|problem|number|no\.?)\s*(?:number|no\.?|#)?\s*)(\d+)\b", re.I),
+    re.compile(r"\b(" + "|".join(ORDINAL_WORDS) + r")\b(?:\s+(?:one|issue|finding|vulnerability|problem))", re.I),
+]
+LINES_PATTERN = re.compile(r"\blines?\s+(\d+)(?:\s*(?:-|to|through|and|,)\s*(\d+))?", re.I)
+
+# Issue types the user may name when targeting a fix
+DESCRIPTION_PATTERNS = [
+    (re.compile(r"\bf-?strings?\b", re.I), "f-string issue"),
+    (re.compile(r"\b(?:string\s+)?concat(?:enation|enated)?\b", re.I), "string concatenation"),
+    (re.compile(r"\.format\(\)|\bformat\(\)|\bstr(?:ing)?\.format\b", re.I), ".format() formatting"),
+    (re.compile(r"%[- ]?(?:formatting|operator|style)|\bpercent formatting\b", re.I), "% formatting"),
+    (re.compile(r"\braw sql\b|\bexecute\(\)", re.I), "raw SQL execution"),
+]
+
+ADVICE_PATTERN = re.compile(
+    r"\bhow\s+(?:do|can|should|would|to)\b.*\bfix|\b(?:suggest(?:ion)?s?|advice|recommend(?:ation)?s?)\b|\bshow me how\b", re.I
+)
+# "Don't fix all of them yet": a fix word that is not a fix request
+NEGATION_PATTERN = re.compile(
+    r"\b(?:don['’]?t|do not|does not|doesn['’]?t|not yet|never|no need to|hold off|without fixing)\b", re.I
+)
+# "Can you fix ...?" is a request phrased as a question, not a question
+POLITE_REQUEST_PATTERN = re.compile(r"^\s*(?:please\s+)?(?:can|could|would|will)\s+you\s+(?:please\s+)?(?!explain\b)", re.I)
+QUESTION_PATTERN = re.compile(r"^\s*(?:what|why|who|when|where|explain|tell me|describe|define|is|are|can you explain)\b", re.I)
+FIX_PATTERN = re.compile(r"\b(?:fix|patch|remediate|repair|resolve|sanitize|secure)\b", re.I)
+FIX_ALL_PATTERN = re.compile(
+    r"\b(?:all|everything|every|entire|whole|each)\b|\bfix (?:it|this|that|the file|this file|the code)\s*[.!?]*\s*$", re.I
+)
+ANALYZE_PATTERN = re.compile(r"\b(?:analy[sz]e|scan|audit|review|inspect|check)\b", re.I)
+REPORT_PATTERN = re.compile(
+    r"\b(?:show|list|report|display|summar(?:y|ize|ise)|which|give me|filter|only)\b"
+    r"|\b(?:high|medium|low)\s+(?:severity|risk|ones|issues|findings)\b", re.I
+)
+
+
+def empty_target() -> Dict[str, Any]:
+    return {"raw": None, "index": None, "description": None, "lines": None}
+
+
+class FastIntentClassifier:
+    def __init__(self, threshold: float = 0.85):
+        """
+        Deterministic rule/pattern classifier that runs ahead of the router LLM.
+        Produces the same schema as the router plus a confidence score; callers
+        fall back to the LLM when confidence is below `threshold`.
+        """
+        self.threshold = threshold
+        self.hits = 0
+        self.fallbacks = 0
+        self.hits_by_intent: Dict[str, int] = {}
+
+    # -------------------------
+    # EXTRACTION
+    # -------------------------
+    @staticmethod
+    def extract_path(text: str) -> Optional[str]:
+        match = PATH_PATTERN.search(text or "")
+        return match.group(1) if match else None
+
+    @staticmethod
+    def index_mentions(text: str) -> Tuple[set, bool]:
+        """
+        (finding numbers mentioned, whether one of them is a decimal like "issue 10.5").
+        """
+        numbers: set = set()
+        for pattern in INDEX_PATTERNS:
+            for match in pattern.finditer(text):
+                if re.match(r"[.,]\d", text[match.end(1):]):
+                    return numbers, True
+                value = match.group(1).lower()
+                numbers.add(ORDINAL_WORDS[value] if value in ORDINAL_WORDS else int(value))
+        return numbers, False
+
+    @classmethod
+    def extract_index(cls, text: str) -> Optional[int]:
+        """
+        The one finding number the text refers to; None when it names none,
+        several ("#3 and #4") or a decimal.
+        """
+        numbers, decimal = cls.index_mentions(text)
+        return numbers.pop() if len(numbers) == 1 and not decimal else None
+
+    @staticmethod
+    def is_question(text: str) -> bool:
+        if POLITE_REQUEST_PATTERN.match(text):
+            return False
+        return text.rstrip().endswith("?") or bool(QUESTION_PATTERN.search(text))
+
+    @staticmethod
+    def extract_lines(text: str) -> Optional[List[int]]:
+        match = LINES_PATTERN.search(text)
+        if not match:
+            return None
+        start = int(match.group(1))
+        if match.group(2):
+            end = int(match.group(2))
+            if re.search(r"\band\b|,", match.group(0)):
+                return [start, end]
+            return list(range(min(start, end), max(start, end) + 1))
+        return [start]
+
+    @staticmethod
+    def extract_description(text: str) -> Optional[str]:
+        for pattern, label in DESCRIPTION_PATTERNS:
+            if pattern.search(text):
+                return label
+        return None
+
+    @staticmethod
+    def extract_raw(text: str) -> str:
+        """
+        The user's phrasing of the fix target, e.g. "Can you fix the 2nd one?" -> "2nd one".
+        """
+        match = re.search(r"\bfix\b\s*(?:the\s+)?(.*)", text, re.I)
+        raw = match.group(1) if match else text
+        return raw.strip().rstrip("?.!").strip() or text.strip()
+
+    def context_path(self, history: List[str], memory: Dict[str, Any]) -> Optional[str]:
+        """
+        Most recent file path from session memory, then from history (newest first).
+        """
+        last = (memory or {}).get("last_analyze") or {}
+        if isinstance(last, dict) and last.get("file_path"):
+            return last["file_path"]
+        for message in reversed(history or []):
+            path = self.extract_path(message if isinstance(message, str) else str(message))
+            if path:
+                return path
+        return None
+
+    # -------------------------
+    # CLASSIFICATION
+    # -------------------------
+    def classify(self, history: List[str], memory: Dict[str, Any], query: str) -> Tuple[Dict[str, Any], float]:
+        """
+        Returns (classification, confidence).
+        """
+        text = query.strip()
+        has_analysis = bool((memory or {}).get("last_analyze"))
+        query_path = self.extract_path(text)
+        file_path = query_path or self.context_path(history, memory)
+        target = empty_target()
+
+        def result(intent: str, confidence: float, path: Optional[str] = file_path):
+            return {"intent": intent, "file_path": path, "target": target}, confidence
+
+        # Advice on fixing is a general question, never a write
+        if ADVICE_PATTERN.search(text):
+            return result("general", 0.9)
+
+        if FIX_PATTERN.search(text):
+            # Negated or questioning mentions of a fix must never skip the router into a write
+            if NEGATION_PATTERN.search(text) or self.is_question(text):
+                return result("general", 0.3)
+            if not file_path:
+                return result("fix_all", 0.3)
+
+            numbers, decimal = self.index_mentions(text)
+            if len(numbers) > 1 or decimal:
+                return result("fix_partial", 0.4)
+
+            index = self.extract_index(text)
+            lines = self.extract_lines(text)
+            description = self.extract_description(text)
+
+            if index is not None or lines or description:
+                target.update(raw=self.extract_raw(text), index=index, description=description, lines=lines)
+                return result("fix_partial", 0.9 if index is not None or lines else 0.85)
+
+            if FIX_ALL_PATTERN.search(text) or (query_path and len(text.split()) <= 4):
+                return result("fix_all", 0.9)
+
+            return result("fix_partial", 0.4)
+
+        if ANALYZE_PATTERN.search(text) and query_path:
+            # The router prompt prefers report/fix once an analysis exists; let it decide
+            return result("analyze", 0.5 if has_analysis else 0.95, query_path)
+
+        if REPORT_PATTERN.search(text) and has_analysis:
+            index = self.extract_index(text)
+            lines = self.extract_lines(text)
+            raw = re.sub(r"^\s*(?:please\s+)?(?:show|list|display|give)\s+(?:me\s+)?(?:the\s+)?", "", text, flags=re.I)
+            target.update(raw=raw.rstrip("?.!").strip(), index=index, lines=lines)
+            return result("report", 0.85)
+
+        if QUESTION_PATTERN.search(text) and not ANALYZE_PATTERN.search(text):
+            return result("general", 0.9, query_path or (file_path if has_analysis else None))
+
+        return result("general", 0.2)
+
+    def record(self, hit: bool, intent: str | None = None) -> None:
+        if hit:
+            self.hits += 1
+            self.hits_by_intent[intent] = self.hits_by_intent.get(intent, 0) + 1
+        else:
+            self.fallbacks += 1
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.fallbacks
+        return {
+            "fast_path_hits": self.hits,
+            "llm_fallbacks": self.fallbacks,
+            "fast_path_hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "hits_by_intent": dict(self.hits_by_intent),
+        }
+
+
+# Global Instance
+fast_intent_classifier = FastIntentClassifier(threshold=settings.INTENT_FAST_PATH_THRESHOLD)
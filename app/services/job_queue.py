@@ -0,0 +1,347 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+from sqlalchemy import delete, select, update
+from app.config.database import SessionLocal
+from app.config.history import history_manager
+from app.config.settings import settings
+from app.config.logger import bind_session, logger, request_id_var
+from app.db.models import JobRecord
+from app.db.schemas import ChatResponse
+from app.services.executor import executor_service
+from app.services.metrics import metrics, set_intent
+
+import asyncio
+import json
+import time
+import uuid
+
+# Intents that may run as background jobs; general answers stay synchronous
+JOB_INTENTS = {"analyze", "fix_all", "fix_partial", "report"}
+
+FINISHED = {"completed", "failed", "cancelled"}
+
+
+class JobQueueFull(Exception):
+    """
+    Raised when the queue already holds the maximum number of pending jobs.
+    """
+
+
+class Job:
+    def __init__(self, session_id: str, query: str, classification: dict, history: List[str], request_id: str | None):
+        """
+        One chat turn queued for background execution.
+        """
+        self.job_id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.query = query
+        self.classification = classification
+        self.history = history
+        self.request_id = request_id
+
+        self.status = "queued"
+        self.error: str | None = None
+        self.result: ChatResponse | None = None
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: datetime | None = None
+        self.finished_at: datetime | None = None
+        self.task: asyncio.Task | None = None
+
+    def progress(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "session_id": self.session_id,
+            "intent": self.classification["intent"],
+            "file_path": self.classification["file_path"],
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+            "result": self.result,
+        }
+
+    def record(self) -> JobRecord:
+        return JobRecord(
+            job_id=self.job_id,
+            session_id=self.session_id,
+            intent=self.classification["intent"],
+            file_path=self.classification["file_path"],
+            status=self.status,
+            error=self.error,
+            result=self.result.model_dump_json() if self.result is not None else None,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+        )
+
+
+def _timestamp(value: datetime | None) -> str | None:
+    if value is None:
+        return None
+    # SQLite hands back naive datetimes for timezone-aware columns
+    return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).isoformat()
+
+
+def record_progress(row: JobRecord) -> Dict[str, Any]:
+    """
+    Job.progress() for a job known only from the database (run by another worker).
+    """
+    return {
+        "job_id": row.job_id,
+        "session_id": row.session_id,
+        "intent": row.intent,
+        "file_path": row.file_path,
+        "status": row.status,
+        "created_at": _timestamp(row.created_at),
+        "started_at": _timestamp(row.started_at),
+        "finished_at": _timestamp(row.finished_at),
+        "error": row.error,
+        "result": json.loads(row.result) if row.result else None,
+    }
+
+
+class JobQueue:
+    def __init__(self, workers: int = 4, max_queued: int = 100, keep_finished: int = 500):
+        """
+        In-process queue that runs classified chat turns on `workers` background
+        tasks. Results are recorded into session history and memory exactly as a
+        synchronous /agent/chat call would.
+
+        Jobs run in the process that accepted them, but their status is kept in
+        the `jobs` table so any worker process can report or cancel them. Jobs
+        do not survive a restart.
+        """
+        self.workers = workers
+        self.max_queued = max_queued
+        self.keep_finished = keep_finished
+        self.jobs: Dict[str, Job] = {}
+        self._queue: asyncio.Queue[Job] | None = None
+        self._workers: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"[Jobs] Started {self.workers} workers")
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for job in self.jobs.values():
+            if job.status not in FINISHED:
+                if job.task is not None:
+                    job.task.cancel()
+                self._finish(job, "cancelled", error="Server shutting down")
+                await self._persist(job)
+
+    # -------------------------
+    # API
+    # -------------------------
+    async def submit(self, session_id: str, query: str, classification: dict, history: List[str]) -> Job:
+        """
+        Queue a classified turn. Raises JobQueueFull when too many jobs are waiting.
+        """
+        self.start()
+        queued = self._depth()
+        if queued >= self.max_queued:
+            raise JobQueueFull(f"{queued} jobs already queued")
+
+        job = Job(session_id, query, classification, history, request_id_var.get())
+        self._prune()
+        self.jobs[job.job_id] = job
+        await asyncio.to_thread(self._save, job, True)
+        self._queue.put_nowait(job)
+        logger.info(f"[Jobs] Queued job {job.job_id} ({classification['intent']}) for session {session_id}")
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self.jobs.get(job_id)
+
+    async def status(self, job_id: str) -> Dict[str, Any] | None:
+        """
+        Progress of a job run by this process or, failing that, by any other worker.
+        """
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job.progress()
+        row = await asyncio.to_thread(self._load, job_id)
+        return record_progress(row) if row is not None else None
+
+    async def list(self, session_id: str | None = None) -> List[Dict[str, Any]]:
+        """
+        Jobs from every worker, newest first, with this process's live state taking precedence.
+        """
+        rows = await asyncio.to_thread(self._load_all, session_id)
+        jobs = {row.job_id: record_progress(row) for row in rows}
+        jobs.update({j.job_id: j.progress() for j in self.jobs.values() if session_id is None or j.session_id == session_id})
+        return sorted(jobs.values(), key=lambda j: j["created_at"], reverse=True)
+
+    async def cancel(self, job_id: str) -> Dict[str, Any] | None:
+        """
+        Cancel a queued or running job. A fix that already reached its write-back
+        may still land, as may a job already running on another worker; it is
+        reported as cancelled either way. Finished jobs are returned unchanged.
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            row = await asyncio.to_thread(self._cancel_stored, job_id)
+            return record_progress(row) if row is not None else None
+
+        if job.status not in FINISHED:
+            if job.task is not None:
+                job.task.cancel()
+            self._finish(job, "cancelled")
+            await self._persist(job)
+            logger.info(f"[Jobs] Cancelled job {job_id}")
+        return job.progress()
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": len(self._workers), "queued": self._depth(), **counts}
+
+    # -------------------------
+    # INTERNALS
+    # -------------------------
+    def _prune(self) -> None:
+        """
+        Forget the oldest finished jobs once more than `keep_finished` are tracked.
+        """
+        finished = [j for j in self.jobs.values() if j.status in FINISHED]
+        for job in sorted(finished, key=lambda j: j.finished_at)[:max(0, len(finished) - self.keep_finished)]:
+            del self.jobs[job.job_id]
+
+    def _depth(self) -> int:
+        """
+        Jobs still waiting for a worker; cancelled entries left in the asyncio queue do not count.
+        """
+        return sum(1 for job in self.jobs.values() if job.status == "queued")
+
+    @staticmethod
+    def _finish(job: Job, status: str, error: str | None = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = datetime.now(timezone.utc)
+
+    # ----- persistence -----
+    def _save(self, job: Job, prune: bool = False) -> None:
+        """
+        Write the job's state, unless another worker cancelled it in the meantime.
+        """
+        with SessionLocal() as db:
+            stored = db.get(JobRecord, job.job_id)
+            if stored is not None and stored.status == "cancelled" and job.status != "cancelled":
+                job.status, job.error, job.finished_at = "cancelled", stored.error, stored.finished_at
+                return
+            db.merge(job.record())
+            if prune:
+                cutoff = db.execute(
+                    select(JobRecord.finished_at).where(JobRecord.status.in_(FINISHED))
+                    .order_by(JobRecord.finished_at.desc()).offset(self.keep_finished).limit(1)
+                ).scalar()
+                if cutoff is not None:
+                    db.execute(delete(JobRecord).where(JobRecord.status.in_(FINISHED), JobRecord.finished_at <= cutoff))
+            db.commit()
+
+    async def _persist(self, job: Job) -> None:
+        try:
+            await asyncio.to_thread(self._save, job)
+        except Exception:
+            logger.exception(f"[Jobs] Failed to store job {job.job_id}")
+
+    @staticmethod
+    def _load(job_id: str) -> JobRecord | None:
+        with SessionLocal() as db:
+            return db.get(JobRecord, job_id)
+
+    def _load_all(self, session_id: str | None) -> List[JobRecord]:
+        query = select(JobRecord).order_by(JobRecord.created_at.desc()).limit(self.keep_finished + self.max_queued)
+        if session_id is not None:
+            query = query.where(JobRecord.session_id == session_id)
+        with SessionLocal() as db:
+            return list(db.execute(query).scalars())
+
+    @staticmethod
+    def _cancel_stored(job_id: str) -> JobRecord | None:
+        """
+        Mark a job owned by another worker as cancelled; that worker skips it when
+        it comes up, or keeps the cancelled status if it is already running.
+        """
+        with SessionLocal() as db:
+            db.execute(
+                update(JobRecord)
+                .where(JobRecord.job_id == job_id, JobRecord.status.not_in(FINISHED))
+                .values(status="cancelled", finished_at=datetime.now(timezone.utc))
+            )
+            db.commit()
+            return db.get(JobRecord, job_id)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = await self._queue.get()
+            if job.status != "queued":
+                continue
+
+            job.status = "running"
+            job.started_at = datetime.now(timezone.utc)
+            await self._persist(job)
+            if job.status != "running":
+                logger.info(f"[Jobs] Skipping job {job.job_id}, cancelled by another worker")
+                continue
+
+            job.task = asyncio.create_task(self._execute(job))
+            try:
+                job.result = await job.task
+                self._finish(job, "completed")
+            except asyncio.CancelledError:
+                if job.status != "cancelled":
+                    raise
+            except Exception as e:
+                logger.exception(f"[Jobs] Job {job.job_id} failed")
+                self._finish(job, "failed", error=str(e))
+            finally:
+                job.task = None
+            await self._persist(job)
+
+    async def _execute(self, job: Job) -> ChatResponse:
+        # Log records and metrics carry the submitting request's context
+        request_id_var.set(job.request_id)
+        bind_session(job.session_id)
+        classification = job.classification
+        set_intent(classification["intent"])
+
+        start = time.perf_counter()
+        await history_manager.refresh(job.session_id)
+        memory = history_manager.get_memory(job.session_id)
+        last_analyze = memory.get("last_analyze") if memory else None
+        try:
+            response = await executor_service.dispatch(
+                intent=classification["intent"],
+                file_path=classification["file_path"],
+                target=classification.get("target"),
+                query=job.query,
+                history=job.history,
+                memory=memory,
+                session_id=job.session_id,
+            )
+            with metrics.stage("write_back"):
+                executor_service.record_turn(job.session_id, job.query, classification, response, memory, last_analyze)
+        except Exception:
+            metrics.chat_seconds.observe(time.perf_counter() - start, intent=classification["intent"], status="error")
+            raise
+
+        metrics.chat_seconds.observe(time.perf_counter() - start, intent=classification["intent"], status="ok")
+        return ChatResponse.from_result(response, classification)
+
+
+# Global Instance
+job_queue = JobQueue(
+    workers=settings.JOB_WORKERS,
+    max_queued=settings.JOB_MAX_QUEUED,
+    keep_finished=settings.JOB_KEEP_FINISHED,
+)
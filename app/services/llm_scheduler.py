@@ -0,0 +1,284 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from app.config.settings import settings
+from app.config.logger import logger
+
+import asyncio
+import heapq
+import itertools
+import time
+
+# Lower runs first: router calls, then chat-driven worker calls, then batch scans
+PRIORITY_ROUTER = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_BULK = 2
+
+PRIORITY_NAMES = {PRIORITY_ROUTER: "router", PRIORITY_INTERACTIVE: "interactive", PRIORITY_BULK: "bulk"}
+
+# Rough prompt-size estimate used before the provider reports real usage
+CHARS_PER_TOKEN = 4
+TOKENS_PER_MESSAGE = 4
+DEFAULT_COMPLETION_TOKENS = 1024
+
+_priority: ContextVar[int] = ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def llm_priority(level: int):
+    """
+    Run LLM calls made inside the block (and tasks it spawns) at `level`.
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        """
+        Continuously refilling bucket holding up to one minute of quota.
+        A non-positive rate means unlimited.
+        """
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """
+        Seconds until `amount` can be taken. Requests larger than the bucket wait for a full bucket.
+        """
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        """
+        Reserve `amount`; like `wait_time`, a request larger than the bucket counts as a full bucket.
+        """
+        if not self.unlimited:
+            self._refill()
+            self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """
+        Return (positive) or charge (negative) tokens once real usage is known.
+        """
+        if not self.unlimited:
+            self._refill()
+            self.level = min(self.capacity, self.level + delta)
+
+
+def _tighter(a: int, b: int) -> int:
+    # Non-positive limits mean unlimited
+    positive = [n for n in (a, b) if n > 0]
+    return min(positive) if positive else 0
+
+
+def model_limits(roles: Dict[str, tuple[Optional[str], int, int]]) -> Dict[str, tuple[int, int]]:
+    """
+    Per-model (rpm, tpm) from per-role settings (`roles` maps role -> (model, rpm, tpm)).
+    Provider quotas are per model, so roles sharing a model get the tighter of their limits.
+    """
+    limits: Dict[str, tuple[int, int]] = {}
+    owners: Dict[str, str] = {}
+    for role, (model, rpm, tpm) in roles.items():
+        if not model:
+            continue
+        if model not in limits:
+            limits[model], owners[model] = (rpm, tpm), role
+            continue
+        if limits[model] != (rpm, tpm):
+            merged = (_tighter(limits[model][0], rpm), _tighter(limits[model][1], tpm))
+            logger.warning(f"[LLM] {owners[model]} and {role} both use {model} with different limits "
+                           f"({limits[model]} vs {(rpm, tpm)}); applying rpm={merged[0]}, tpm={merged[1]} to both")
+            limits[model] = merged
+    return limits
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: int = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class _ModelQueue:
+    def __init__(self, rpm: int, tpm: int):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.heap: List[_Waiter] = []
+        self.wakeup = asyncio.Event()
+        self.dispatcher: Optional[asyncio.Task] = None
+        self.paused_until = 0.0
+
+        self.sent = 0
+        self.throttled = 0
+        self.wait_seconds_total = 0.0
+
+    def delay(self, tokens: int) -> float:
+        return max(
+            self.requests.wait_time(1),
+            self.tokens.wait_time(tokens),
+            self.paused_until - time.monotonic(),
+            0.0,
+        )
+
+
+class LLMScheduler:
+    def __init__(self, limits: Dict[str, tuple[int, int]] = None, enabled: bool = True):
+        """
+        Outbound scheduler between GroqService and the provider.
+
+        Each model gets a requests-per-minute and a tokens-per-minute bucket
+        (`limits` maps model ID -> (rpm, tpm)). Calls reserve their estimated
+        tokens up front and wait in a priority queue while the buckets are empty,
+        so router calls go ahead of interactive work and both go ahead of batch
+        scans. The reservation is corrected once the response reports its usage.
+        """
+        self.enabled = enabled
+        self.limits = dict(limits or {})
+        self._queues: Dict[str, _ModelQueue] = {}
+        self._seq = itertools.count()
+
+    @staticmethod
+    def estimate_tokens(messages: List[Dict[str, Any]], max_completion_tokens: Optional[int] = None) -> int:
+        """
+        Prompt tokens (~4 characters each) plus the completion budget.
+        """
+        prompt_chars = sum(len(str(m.get("content") or "")) for m in messages)
+        prompt_tokens = prompt_chars // CHARS_PER_TOKEN + TOKENS_PER_MESSAGE * len(messages)
+        return prompt_tokens + (max_completion_tokens or DEFAULT_COMPLETION_TOKENS)
+
+    def _queue(self, model: str) -> _ModelQueue:
+        queue = self._queues.get(model)
+        if queue is None:
+            rpm, tpm = self.limits.get(model, (0, 0))
+            queue = self._queues[model] = _ModelQueue(rpm, tpm)
+        return queue
+
+    async def acquire(self, model: str, tokens: int, priority: Optional[int] = None) -> None:
+        """
+        Wait until `model` has quota for one request of `tokens` tokens, then reserve it.
+        """
+        if not self.enabled:
+            return
+
+        queue = self._queue(model)
+        if not queue.heap and queue.delay(tokens) == 0:
+            self._grant(queue, tokens)
+            return
+
+        waiter = _Waiter(
+            priority=_priority.get() if priority is None else priority,
+            seq=next(self._seq),
+            tokens=tokens,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(queue.heap, waiter)
+        queue.throttled += 1
+        queue.wakeup.set()
+        if queue.dispatcher is None or queue.dispatcher.done():
+            queue.dispatcher = asyncio.create_task(self._dispatch(queue))
+
+        start = time.monotonic()
+        try:
+            await waiter.future
+        finally:
+            queue.wait_seconds_total += time.monotonic() - start
+
+    def _grant(self, queue: _ModelQueue, tokens: int) -> None:
+        queue.requests.take(1)
+        queue.tokens.take(tokens)
+        queue.sent += 1
+
+    async def _dispatch(self, queue: _ModelQueue) -> None:
+        """
+        Release queued calls in priority order as the buckets refill.
+        """
+        while queue.heap:
+            head = queue.heap[0]
+            if head.future.done():
+                # Caller gave up while waiting
+                heapq.heappop(queue.heap)
+                continue
+
+            delay = queue.delay(head.tokens)
+            if delay == 0:
+                heapq.heappop(queue.heap)
+                self._grant(queue, head.tokens)
+                head.future.set_result(None)
+                continue
+
+            # Sleep until quota returns, or until a higher-priority call arrives
+            queue.wakeup.clear()
+            try:
+                await asyncio.wait_for(queue.wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def settle(self, model: str, reserved: int, used: Optional[int]) -> None:
+        """
+        Replace a call's reservation with its real usage. Without a usage report
+        the reservation stands.
+        """
+        if self.enabled and used is not None and model in self._queues:
+            tokens = self._queues[model].tokens
+            # take() charged at most a full bucket, so refund against that
+            tokens.adjust(min(reserved, tokens.capacity) - used)
+
+    def pause(self, model: str, seconds: float) -> None:
+        """
+        Hold all calls for `model`, e.g. after the provider answered 429 with Retry-After.
+        """
+        if not self.enabled or seconds <= 0:
+            return
+        queue = self._queue(model)
+        queue.paused_until = max(queue.paused_until, time.monotonic() + seconds)
+        logger.info(f"[LLM] Pausing calls to {model} for {seconds:.1f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        models = {}
+        for model, queue in self._queues.items():
+            waiting = {name: 0 for name in PRIORITY_NAMES.values()}
+            for waiter in queue.heap:
+                if not waiter.future.done():
+                    waiting[PRIORITY_NAMES.get(waiter.priority, str(waiter.priority))] += 1
+            models[model] = {
+                "rpm": queue.requests.capacity,
+                "tpm": queue.tokens.capacity,
+                "requests_available": None if queue.requests.unlimited else round(queue.requests.level, 1),
+                "tokens_available": None if queue.tokens.unlimited else round(queue.tokens.level),
+                "waiting": waiting,
+                "sent": queue.sent,
+                "throttled": queue.throttled,
+                "wait_seconds_total": round(queue.wait_seconds_total, 3),
+            }
+        return {"enabled": self.enabled, "models": models}
+
+
+# Global Instance
+llm_scheduler = LLMScheduler(
+    limits=model_limits({
+        "router": (settings.ROUTER_LLM_ID, settings.ROUTER_LLM_RPM, settings.ROUTER_LLM_TPM),
+        "worker": (settings.WORKER_LLM_ID, settings.WORKER_LLM_RPM, settings.WORKER_LLM_TPM),
+        "triage": (settings.TRIAGE_LLM_ID, settings.TRIAGE_LLM_RPM, settings.TRIAGE_LLM_TPM),
+    }),
+    enabled=settings.LLM_SCHEDULER_ENABLED,
+)
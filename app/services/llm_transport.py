@@ -0,0 +1,273 @@
+from groq import APIConnectionError, APIStatusError, AsyncGroq
+from typing import Any, Dict, Optional
+from app.config.settings import settings
+from app.config.logger import logger
+from app.services.llm_scheduler import LLMScheduler, llm_scheduler
+from app.services.metrics import metrics
+
+import asyncio
+import email.utils
+import httpx
+import random
+import time
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling the provider while the circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Opens after `failure_threshold` consecutive provider failures and fails fast
+        for `reset_timeout` seconds; then lets a single probe call through
+        (half-open) and closes again if it succeeds.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+
+        self.rejected += 1
+        return False
+
+    def release(self) -> None:
+        """
+        Give back a half-open probe slot whose call ended without an outcome (cancelled).
+        """
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info("[LLM] Circuit breaker closed; provider is reachable again.")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                logger.warning(f"[LLM] Circuit breaker opened after {self.consecutive_failures} consecutive failures; "
+                               f"failing fast for {self.reset_timeout:.0f}s.")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        retry_in = None
+        if self.state == self.OPEN:
+            retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected,
+            "retry_in_seconds": retry_in,
+        }
+
+
+class LLMTransport:
+    def __init__(self, api_key: str, base_url: Optional[str] = None, max_connections: int = 100,
+                 max_keepalive_connections: int = 20, keepalive_expiry: float = 30.0,
+                 connect_timeout: float = 5.0, read_timeout: float = 60.0, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 20.0, breaker: Optional[CircuitBreaker] = None,
+                 scheduler: Optional[LLMScheduler] = None):
+        """
+        Shared, pooled keep-alive connection to the Groq API.
+
+        All completions go through `complete`, which waits for quota in the scheduler,
+        retries rate limits, 5xx responses and connection errors with jittered
+        exponential backoff (honoring Retry-After) and fails fast through the circuit
+        breaker while the provider is down.
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.scheduler = scheduler or LLMScheduler(enabled=False)
+        self.max_connections = max_connections
+
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=self.timeout(),
+        )
+        # Retries are ours, so the SDK must not retry underneath us
+        self.client = AsyncGroq(api_key=api_key, base_url=base_url, http_client=self.http_client, max_retries=0)
+
+        self.in_flight = 0
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+
+    def timeout(self, read: Optional[float] = None) -> httpx.Timeout:
+        """
+        Per-call timeout; `read` overrides the default read timeout.
+        """
+        return httpx.Timeout(read or self.read_timeout, connect=self.connect_timeout)
+
+    async def complete(self, read_timeout: Optional[float] = None, priority: Optional[int] = None,
+                       stage: str = "worker_call", **kwargs) -> Any:
+        """
+        Chat completion with retries. Raises CircuitOpenError while the breaker is open,
+        and the last provider error once retries are exhausted. The whole call,
+        including queueing and retries, is timed as `stage`.
+        """
+        with metrics.stage(stage):
+            return await self._complete(read_timeout, priority, **kwargs)
+
+    async def _complete(self, read_timeout: Optional[float], priority: Optional[int], **kwargs) -> Any:
+        model = kwargs.get("model")
+        reserved = self.scheduler.estimate_tokens(kwargs.get("messages", []), kwargs.get("max_completion_tokens"))
+
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError("LLM provider circuit is open; failing fast.")
+            try:
+                await self.scheduler.acquire(model, reserved, priority)
+            except BaseException:
+                # Cancelled while queued; a held probe slot must not block the breaker forever
+                self.breaker.release()
+                raise
+
+            self.calls += 1
+            self.in_flight += 1
+            try:
+                response = await self.client.chat.completions.create(timeout=self.timeout(read_timeout), **kwargs)
+            except Exception as e:
+                # Failed calls are not billed against the quota
+                self.scheduler.settle(model, reserved, 0)
+                retryable = self._is_retryable(e)
+                if retryable:
+                    self.breaker.record_failure()
+                else:
+                    # The provider answered; the request itself was bad
+                    self.breaker.record_success()
+
+                if not retryable or attempt >= self.max_retries or self.breaker.state == CircuitBreaker.OPEN:
+                    self.failures += 1
+                    metrics.record_completion(model, None, outcome="error")
+                    raise
+
+                delay = self._retry_delay(attempt, e)
+                if getattr(e, "status_code", None) == 429:
+                    self.scheduler.pause(model, delay)
+                attempt += 1
+                self.retries += 1
+                logger.warning(f"[LLM] {type(e).__name__} from provider; retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancellation (client disconnect, timeout) says nothing about the provider
+                self.scheduler.settle(model, reserved, 0)
+                self.breaker.release()
+                raise
+            finally:
+                self.in_flight -= 1
+
+            self.breaker.record_success()
+            usage = getattr(response, "usage", None)
+            self.scheduler.settle(model, reserved, getattr(usage, "total_tokens", None))
+            metrics.record_completion(model, usage)
+            return response
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, APIStatusError):
+            return error.status_code == 429 or error.status_code >= 500
+        return isinstance(error, (APIConnectionError, httpx.TransportError))
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """
+        Retry-After when the provider sends one, otherwise full-jitter exponential backoff.
+        """
+        response = getattr(error, "response", None)
+        header = response.headers.get("retry-after") if response is not None else None
+        if header:
+            try:
+                return min(self.backoff_max, max(0.0, float(header)))
+            except ValueError:
+                pass
+            try:
+                retry_at = email.utils.parsedate_to_datetime(header)
+                return min(self.backoff_max, max(0.0, retry_at.timestamp() - time.time()))
+            except (TypeError, ValueError):
+                logger.warning(f"[LLM] Ignoring malformed Retry-After header: {header!r}")
+
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Open and idle connections in the underlying pool, when httpcore exposes them.
+        """
+        pool = getattr(getattr(self.http_client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        return {
+            "max_connections": self.max_connections,
+            "open_connections": len(connections),
+            "idle_connections": sum(1 for c in connections if c.is_idle()),
+            "in_flight_requests": self.in_flight,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "breaker": self.breaker.snapshot(),
+            "pool": self.pool_stats(),
+            "scheduler": self.scheduler.stats(),
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+        }
+
+    async def aclose(self) -> None:
+        await self.http_client.aclose()
+
+
+# Global Instance
+llm_transport = LLMTransport(
+    api_key=settings.GROQ_API_KEY,
+    base_url=settings.GROQ_BASE_URL,
+    max_connections=settings.GROQ_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.GROQ_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=settings.GROQ_KEEPALIVE_EXPIRY_SECONDS,
+    connect_timeout=settings.GROQ_CONNECT_TIMEOUT_SECONDS,
+    read_timeout=settings.GROQ_READ_TIMEOUT_SECONDS,
+    max_retries=settings.GROQ_MAX_RETRIES,
+    backoff_base=settings.GROQ_BACKOFF_BASE_SECONDS,
+    backoff_max=settings.GROQ_BACKOFF_MAX_SECONDS,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.GROQ_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.GROQ_BREAKER_RESET_SECONDS,
+    ),
+    scheduler=llm_scheduler,
+)
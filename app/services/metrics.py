@@ -0,0 +1,144 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Tuple
+
+import threading
+import time
+
+# Seconds; spans cheap local stages (render, parse) up to slow completions
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Intent of the chat turn being served; "unclassified" until the router has answered
+_intent: ContextVar[str] = ContextVar("metrics_intent", default="unclassified")
+
+
+def set_intent(intent: str) -> None:
+    _intent.set(intent or "unclassified")
+
+
+def current_intent() -> str:
+    return _intent.get()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, description: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, description: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+
+        for key, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="%g"' % bound
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Metrics:
+    def __init__(self):
+        """
+        In-process counters and histograms rendered in the Prometheus text format.
+        Observations are a lock, a bisect and two additions, cheap enough to leave on.
+        """
+        self.stage_seconds = Histogram(
+            "cybairo_stage_seconds", "Time spent in each stage of a chat turn.", ("stage", "intent"))
+        self.chat_seconds = Histogram(
+            "cybairo_chat_seconds", "End-to-end /agent/chat latency.", ("intent", "status"))
+        self.llm_requests = Counter(
+            "cybairo_llm_requests_total", "Completions sent to the provider.", ("model", "intent", "outcome"))
+        self.prompt_tokens = Counter(
+            "cybairo_llm_prompt_tokens_total", "Prompt tokens reported by the provider.", ("model", "intent"))
+        self.completion_tokens = Counter(
+            "cybairo_llm_completion_tokens_total", "Completion tokens reported by the provider.", ("model", "intent"))
+        self._collectors = [self.stage_seconds, self.chat_seconds, self.llm_requests,
+                            self.prompt_tokens, self.completion_tokens]
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time the block as stage `name` of the current intent (also when it raises).
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds.observe(time.perf_counter() - start, stage=name, intent=_intent.get())
+
+    def record_completion(self, model: str, usage: Any, outcome: str = "ok") -> None:
+        intent = _intent.get()
+        self.llm_requests.inc(model=model, intent=intent, outcome=outcome)
+        if usage is not None:
+            self.prompt_tokens.inc(getattr(usage, "prompt_tokens", 0) or 0, model=model, intent=intent)
+            self.completion_tokens.inc(getattr(usage, "completion_tokens", 0) or 0, model=model, intent=intent)
+
+    def register(self, collector: Any) -> Any:
+        self._collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for collector in self._collectors:
+            lines.extend(collector.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global Instance
+metrics = Metrics()
@@ -0,0 +1,116 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import ast
+import os
+import shutil
+import tempfile
+
+
+class PatchError(Exception):
+    """
+    Raised when a hunk does not match the file it is applied to.
+    """
+
+
+def atomic_write_text(path: Path, text: str, encoding: str = "utf-8") -> None:
+    """
+    Write `text` to a temp file next to `path` and rename it into place,
+    so readers never see a half-written file.
+    """
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding=encoding, newline="") as handle:
+            handle.write(text)
+            handle.flush()
+            os.fsync(handle.fileno())
+        if path.exists():
+            shutil.copymode(path, tmp_name)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def fix_window(source: str, start: int, end: int, context: int = 8, max_lines: int = 120) -> Tuple[int, int]:
+    """
+    Lines to show the model around a target range: the innermost enclosing
+    function if it is small enough, otherwise `context` lines either side.
+    """
+    total = max(1, len(source.splitlines()))
+    window = (max(1, start - context), min(total, end + context))
+
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return window
+
+    best: Optional[Tuple[int, int]] = None
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            node_start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            if node_start <= start and node.end_lineno >= end:
+                if best is None or node.end_lineno - node_start < best[1] - best[0]:
+                    best = (node_start, node.end_lineno)
+
+    if best and best[1] - best[0] + 1 <= max_lines:
+        return min(best[0], window[0]), max(best[1], window[1])
+    return window
+
+
+def number_lines(source: str, start: int, end: int) -> str:
+    """
+    Render lines `start..end` with right-aligned line numbers.
+    """
+    lines = source.splitlines()
+    width = len(str(end))
+    return "\n".join(f"{n:>{width}} | {lines[n - 1]}" for n in range(start, min(end, len(lines)) + 1))
+
+
+def _same(a: List[str], b: List[str]) -> bool:
+    return [line.rstrip() for line in a] == [line.rstrip() for line in b]
+
+
+def apply_hunks(source: str, hunks: List[Dict[str, Any]], window: Tuple[int, int], slack: int = 10) -> str:
+    """
+    Apply replacement hunks (`start_line`, `end_line`, `original`, `replacement`).
+
+    Each hunk's `original` text must match the file at the stated lines. If the
+    model's line numbers are off, the original block is searched for within the
+    window (plus `slack` lines); a hunk that cannot be located raises PatchError.
+    """
+    lines = source.splitlines()
+    trailing_newline = source.endswith("\n")
+    resolved: List[Tuple[int, int, List[str]]] = []
+
+    for hunk in hunks:
+        original = str(hunk.get("original", "")).splitlines()
+        replacement = str(hunk.get("replacement", "")).splitlines()
+        if not original:
+            raise PatchError("Hunk has no original lines to anchor on.")
+
+        start = hunk.get("start_line")
+        candidates = []
+        if isinstance(start, int) and start >= 1:
+            candidates.append(start)
+        low, high = max(1, window[0] - slack), min(len(lines), window[1] + slack)
+        candidates.extend(n for n in range(low, high + 1) if n != start)
+
+        for candidate in candidates:
+            if _same(lines[candidate - 1:candidate - 1 + len(original)], original):
+                resolved.append((candidate, candidate + len(original) - 1, replacement))
+                break
+        else:
+            raise PatchError(f"Original lines for hunk at line {start} not found in the file.")
+
+    # Apply bottom-up so earlier line numbers stay valid; refuse overlapping hunks
+    resolved.sort(key=lambda h: h[0], reverse=True)
+    for (start, end, _), (next_start, _, _) in zip(resolved[1:], resolved):
+        if end >= next_start:
+            raise PatchError("Hunks overlap.")
+    for start, end, replacement in resolved:
+        lines[start - 1:end] = replacement
+
+    return "\n".join(lines) + ("\n" if trailing_newline else "")
@@ -0,0 +1,107 @@
+from typing import Any, Dict, List
+from app.config.settings import settings
+from app.config.logger import logger
+from app.services.file_source import SourceFile, file_source
+from app.services.groq_service import groq_service
+from app.services.intent_rules import fast_intent_classifier
+from app.services.metrics import metrics
+
+import asyncio
+
+# Intents whose worker reads the classified file
+FILE_INTENTS = {"analyze", "fix_all", "fix_partial", "general"}
+
+
+class Prefetch:
+    def __init__(self, paths: List[str], reads: asyncio.Task, task: asyncio.Task):
+        self.paths = paths
+        self.reads = reads
+        self.task = task
+
+    def cancel(self) -> None:
+        self.task.cancel()
+        self.reads.cancel()
+
+
+class Prefetcher:
+    def __init__(self, enabled: bool = True, max_paths: int = 2):
+        """
+        Speculative file preparation that overlaps the router call. Candidate paths
+        come from the message and the session (last analysis, then history); each
+        is resolved, read and hashed, then planned for analysis in the background.
+        Once the intent is known, analyze waits for the whole preparation, other
+        file intents only for the reads, and anything else cancels it.
+        """
+        self.enabled = enabled
+        self.max_paths = max_paths
+        self.started = 0
+        self.used = 0
+        self.discarded = 0
+
+    def candidates(self, query: str, history: List[str], memory: Dict[str, Any]) -> List[str]:
+        paths: List[str] = []
+        for raw in (fast_intent_classifier.extract_path(query), fast_intent_classifier.context_path(history, memory)):
+            path = groq_service.normalize_path(raw) if raw else None
+            if path and path not in paths:
+                paths.append(path)
+        return paths[:self.max_paths]
+
+    def start(self, query: str, history: List[str], memory: Dict[str, Any]) -> Prefetch | None:
+        """
+        Begin preparing the likely files for this turn. None if there is nothing to do.
+        """
+        if not self.enabled:
+            return None
+        paths = self.candidates(query, history, memory)
+        if not paths:
+            return None
+
+        self.started += 1
+        reads = asyncio.create_task(self._read(paths))
+        return Prefetch(paths, reads, asyncio.create_task(self._warm(paths, reads)))
+
+    async def settle(self, prefetch: Prefetch | None, classification: Dict[str, Any]) -> None:
+        """
+        Finish the prefetch if the turn will use one of its files, otherwise cancel it.
+        Only analyze uses the analysis plan; fixes and questions just need the read.
+        """
+        if prefetch is None:
+            return
+
+        intent = classification["intent"]
+        if intent in FILE_INTENTS and classification.get("file_path") in prefetch.paths:
+            self.used += 1
+            with metrics.stage("prefetch_wait"):
+                if intent == "analyze":
+                    await prefetch.task
+                else:
+                    await prefetch.reads
+                    prefetch.task.cancel()
+        else:
+            self.discarded += 1
+            prefetch.cancel()
+
+    async def _read(self, paths: List[str]) -> List[SourceFile | BaseException]:
+        return await asyncio.gather(*(file_source.load(p) for p in paths), return_exceptions=True)
+
+    async def _warm(self, paths: List[str], reads: asyncio.Task) -> None:
+        sources = await reads
+        prepared = {p: s for p, s in zip(paths, sources) if isinstance(s, SourceFile)}
+        outcomes = await asyncio.gather(*(groq_service.prefetch_analysis(p, s) for p, s in prepared.items()),
+                                        return_exceptions=True)
+        for path, outcome in (dict(zip(paths, sources)) | dict(zip(prepared, outcomes))).items():
+            # A wrong guess is normal here; the real request reports real errors
+            if isinstance(outcome, Exception):
+                logger.debug(f"[Prefetch] Skipped {path}: {outcome}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "started": self.started,
+            "used": self.used,
+            "discarded": self.discarded,
+        }
+
+
+# Global Instance
+prefetcher = Prefetcher(enabled=settings.PREFETCH_ENABLED, max_paths=settings.PREFETCH_MAX_PATHS)
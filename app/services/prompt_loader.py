@@ -1,11 +1,22 @@
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, nodes
 from pathlib import Path
+from typing import Any, Dict
 from app.config.settings import settings
 from app.config.logger import logger
+from app.services.metrics import current_intent, metrics
+
+import time
+
+# Blocks every template may define: instructions that never change, then per-request content
+STATIC_BLOCK = "static"
+DYNAMIC_BLOCK = "dynamic"
+
+# Rendered for the router model; everything else is a worker prompt
+ROUTER_TEMPLATES = {"classify_intent.j2"}
 
 
 class PromptLoader:
-    def __init__(self, base_dir: str = None):
+    def __init__(self, base_dir: str = None, bytecode_cache_dir: str | None = None):
         base_path = base_dir or settings.PROMPT_LIBRARY_PATH
         self.base_path = Path(base_path).resolve()
 
@@ -14,14 +25,124 @@ class PromptLoader:
             raise FileNotFoundError(f"Prompt directory not found: {self.base_path}")
 
         logger.info(f"Prompt directory set to: {self.base_path}")
-        self.env = Environment(loader=FileSystemLoader(str(self.base_path)))
+
+        bytecode_cache = None
+        if bytecode_cache_dir:
+            Path(bytecode_cache_dir).mkdir(parents=True, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+            logger.info(f"Prompt bytecode cache at: {bytecode_cache_dir}")
+
+        self.env = Environment(
+            loader=FileSystemLoader(str(self.base_path)),
+            bytecode_cache=bytecode_cache,
+            auto_reload=False,
+        )
+
+        self.templates: Dict[str, Template] = {}
+        self.static_prefixes: Dict[str, str] = {}
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self.compile_all()
+
+    def compile_all(self) -> None:
+        """
+        Compile every template up front and render its static prefix once.
+        Raises if a template does not compile or its static block uses variables.
+        """
+        start = time.perf_counter()
+        for name in self.env.list_templates(extensions=["j2"]):
+            self._register(name)
+        logger.info(f"Compiled {len(self.templates)} prompt templates in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def _register(self, name: str) -> Template:
+        template = self.env.get_template(name)
+        self._check_static_block(name)
+        self.templates[name] = template
+        self.static_prefixes[name] = self._render_block(template, STATIC_BLOCK, {}).strip()
+        self.stats[name] = {"renders": 0, "render_ms_total": 0.0, "prompt_chars_total": 0,
+                            "static_chars": len(self.static_prefixes[name])}
+        return template
+
+    def _check_static_block(self, name: str) -> None:
+        source, _, _ = self.env.loader.get_source(self.env, name)
+        for block in self.env.parse(source).find_all(nodes.Block):
+            if block.name != STATIC_BLOCK:
+                continue
+            variables = sorted({n.name for n in block.find_all(nodes.Name) if n.ctx == "load"})
+            if variables:
+                raise ValueError(f"Static block of prompt {name} must not use variables: {variables}")
+
+    @staticmethod
+    def _render_block(template: Template, block: str, context: Dict[str, Any]) -> str:
+        if block not in template.blocks:
+            return ""
+        return "".join(template.blocks[block](template.new_context(context)))
+
+    def _template(self, template_name: str) -> Template:
+        template = self.templates.get(template_name)
+        if template is None:
+            # Templates added after startup are compiled on first use
+            template = self._register(template_name)
+        return template
+
+    def render_parts(self, template_name: str, **kwargs) -> tuple[str, str]:
+        """
+        Render a template as (static prefix, dynamic suffix).
+        Templates without a `dynamic` block render entirely into the suffix.
+        """
+        start = time.perf_counter()
+        template = self._template(template_name)
+
+        if DYNAMIC_BLOCK in template.blocks:
+            static = self.static_prefixes[template_name]
+            dynamic = self._render_block(template, DYNAMIC_BLOCK, kwargs).strip()
+        else:
+            static, dynamic = "", template.render(**kwargs)
+
+        elapsed = time.perf_counter() - start
+        metrics.stage_seconds.observe(
+            elapsed,
+            stage="classify_render" if template_name in ROUTER_TEMPLATES else "worker_render",
+            intent=current_intent(),
+        )
+
+        stats = self.stats[template_name]
+        stats["renders"] += 1
+        stats["render_ms_total"] += elapsed * 1000
+        stats["prompt_chars_total"] += len(static) + len(dynamic)
+        return static, dynamic
 
     def render(self, template_name: str, **kwargs) -> str:
         """
         Render a Jinja2 prompt template with variables.
         """
-        template = self.env.get_template(template_name)
-        return template.render(**kwargs)
-    
+        static, dynamic = self.render_parts(template_name, **kwargs)
+        return f"{static}\n\n{dynamic}" if static else dynamic
+
+    def render_messages(self, template_name: str, system: str = "", **kwargs) -> list[dict]:
+        """
+        Render chat messages with a byte-stable system prefix (role line + static
+        instructions) followed by the per-request content, so provider-side prefix
+        caching can reuse the instructions across requests.
+        """
+        static, dynamic = self.render_parts(template_name, **kwargs)
+        system_content = "\n\n".join(part for part in (system, static) if part)
+        messages = [{"role": "system", "content": system_content}] if system_content else []
+        messages.append({"role": "user", "content": dynamic})
+        return messages
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-template render count, average render time and average prompt size.
+        """
+        return {
+            name: {
+                "renders": s["renders"],
+                "avg_render_ms": round(s["render_ms_total"] / s["renders"], 3) if s["renders"] else 0.0,
+                "avg_prompt_chars": round(s["prompt_chars_total"] / s["renders"]) if s["renders"] else 0,
+                "static_chars": s["static_chars"],
+            }
+            for name, s in self.stats.items()
+        }
+
 # Global Instance
-prompt_loader = PromptLoader(settings.PROMPT_LIBRARY_PATH)
+prompt_loader = PromptLoader(settings.PROMPT_LIBRARY_PATH, settings.PROMPT_BYTECODE_CACHE_DIR)
@@ -0,0 +1,329 @@
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+from sqlalchemy import delete, select, update
+from app.config.database import SessionLocal
+from app.config.history import history_manager
+from app.config.settings import settings
+from app.config.logger import logger
+from app.db.models import ScanFileResult, ScanState
+from app.services.git_repo import GitRepo
+from app.services.groq_service import groq_service
+from app.services.llm_scheduler import PRIORITY_BULK, llm_priority
+
+import asyncio
+import json
+import os
+import time
+import uuid
+
+# Directories that are never worth walking into
+SKIP_DIRS = {".git", ".hg", ".svn", "__pycache__", "node_modules", ".venv", "venv", ".tox", ".mypy_cache", ".pytest_cache"}
+
+
+def matches_any(relative_path: str, patterns: List[str]) -> bool:
+    """
+    Glob match against a POSIX relative path. A leading `**/` also matches files at the root.
+    """
+    for pattern in patterns:
+        if fnmatch(relative_path, pattern):
+            return True
+        if pattern.startswith("**/") and fnmatch(relative_path, pattern[3:]):
+            return True
+    return False
+
+
+class ScanJob:
+    def __init__(self, session_id: str, directory: str, include: List[str], exclude: List[str], concurrency: int,
+                 incremental: bool = False, base_ref: str | None = None, head_ref: str | None = None):
+        """
+        State and progress counters for one directory scan. Incremental scans
+        analyze only what git reports as changed and reuse stored results.
+        """
+        self.scan_id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.directory = directory
+        self.include = include
+        self.exclude = exclude
+        self.concurrency = concurrency
+
+        self.mode = "git" if incremental or base_ref or head_ref else "full"
+        self.base_ref = base_ref
+        self.head_ref = head_ref
+        self.base_commit: str | None = None
+        self.head_commit: str | None = None
+        self.state_commit: str | None = None
+        self.repo: GitRepo | None = None
+        self.reused = 0
+        self.stale: Set[str] = set()
+        self.dirty: Set[str] = set()
+        # Relative path -> successful analysis, persisted when the scan completes
+        self.analyzed: Dict[str, Dict[str, Any]] = {}
+
+        self.status = "pending"
+        self.total = 0
+        self.done = 0
+        self.in_flight = 0
+        self.failed = 0
+        self.error: str | None = None
+        self.started_at = datetime.now(timezone.utc)
+        self.finished_at: datetime | None = None
+        self.results: Dict[str, Any] = {}
+        self.remembered_at = time.monotonic()
+        self.task: asyncio.Task | None = None
+
+    def progress(self) -> Dict[str, Any]:
+        return {
+            "scan_id": self.scan_id,
+            "session_id": self.session_id,
+            "directory": self.directory,
+            "mode": self.mode,
+            "base_commit": self.base_commit,
+            "head_commit": self.head_commit,
+            "status": self.status,
+            "total": self.total,
+            "done": self.done,
+            "in_flight": self.in_flight,
+            "failed": self.failed,
+            "reused": self.reused,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+        }
+
+
+class Scanner:
+    def __init__(self, max_concurrency: int = 4, max_files: int = 2000, git_timeout: float = 30.0,
+                 memory_interval: float = 5.0):
+        """
+        Fans `analyze_file` out over a directory with a bounded pool of async workers.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_files = max_files
+        self.git_timeout = git_timeout
+        self.memory_interval = memory_interval
+        self.jobs: Dict[str, ScanJob] = {}
+
+    def start(self, session_id: str, directory: str, include: List[str], exclude: List[str],
+              concurrency: int | None = None, incremental: bool = False,
+              base_ref: str | None = None, head_ref: str | None = None) -> ScanJob:
+        """
+        Register a scan and run it in the background. Returns immediately.
+        """
+        root = groq_service.normalize_path(directory)
+        if not root or not Path(root).is_dir():
+            raise FileNotFoundError(f"Directory not found: {directory}")
+
+        limit = min(concurrency or self.max_concurrency, self.max_concurrency)
+        job = ScanJob(session_id, root, include, exclude, max(1, limit), incremental, base_ref, head_ref)
+        self._prune()
+        self.jobs[job.scan_id] = job
+        job.task = asyncio.create_task(self._run(job))
+        logger.info(f"[Scanner] Started {job.mode} scan {job.scan_id} of {root} (concurrency={job.concurrency})")
+        return job
+
+    def get(self, scan_id: str) -> ScanJob | None:
+        return self.jobs.get(scan_id)
+
+    # -------------------------
+    # INTERNALS
+    # -------------------------
+    def _prune(self, keep: int = 100) -> None:
+        """
+        Forget the oldest finished scans once more than `keep` are tracked.
+        """
+        finished = [j for j in self.jobs.values() if j.finished_at is not None]
+        for job in sorted(finished, key=lambda j: j.finished_at)[:max(0, len(self.jobs) - keep)]:
+            del self.jobs[job.scan_id]
+
+    @staticmethod
+    def _wanted(job: ScanJob, relative: str) -> bool:
+        return matches_any(relative, job.include) and not matches_any(relative, job.exclude)
+
+    def _collect(self, job: ScanJob) -> List[str]:
+        """
+        Walk the directory and return files matching include/exclude globs.
+        """
+        files: List[str] = []
+        for current, dirs, names in os.walk(job.directory):
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+            for name in names:
+                full = os.path.join(current, name)
+                relative = Path(full).relative_to(job.directory).as_posix()
+                if self._wanted(job, relative):
+                    files.append(full)
+                    if len(files) >= self.max_files:
+                        logger.warning(f"[Scanner] Scan {job.scan_id} capped at {self.max_files} files")
+                        return sorted(files)
+        return sorted(files)
+
+    async def _run(self, job: ScanJob) -> None:
+        job.status = "running"
+        try:
+            if job.mode == "git":
+                files = await self._plan_git(job)
+            else:
+                files = await asyncio.to_thread(self._collect, job)
+            job.total = len(files)
+
+            queue: asyncio.Queue[str] = asyncio.Queue()
+            for file_path in files:
+                queue.put_nowait(file_path)
+
+            workers = [asyncio.create_task(self._worker(job, queue)) for _ in range(min(job.concurrency, len(files)))]
+            await asyncio.gather(*workers)
+
+            if job.mode == "git":
+                await asyncio.to_thread(self._save_git_scan, job)
+            job.status = "completed"
+        except Exception as e:
+            logger.exception(f"[Scanner] Scan {job.scan_id} failed")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            # Final results (including reused ones) land in session memory in one write
+            self._remember(job)
+            logger.info(f"[Scanner] Scan {job.scan_id} {job.status}: {job.done}/{job.total} files, "
+                        f"{job.failed} failed, {job.reused} reused")
+
+    # -------------------------
+    # GIT-AWARE SCANS
+    # -------------------------
+    async def _plan_git(self, job: ScanJob) -> List[str]:
+        """
+        Files to analyze for an incremental scan; stored results for the other
+        files are copied into `job.results`. Without `base_ref` the base is the
+        directory's last recorded scan (everything is analyzed on the first one).
+        """
+        repo = job.repo = GitRepo(job.directory, timeout=self.git_timeout)
+        job.head_commit = await repo.commit(job.head_ref or "HEAD")
+        # None compares against the working tree
+        head = job.head_commit if job.head_ref else None
+
+        if head:
+            files = [p for p in await repo.list_files(head) if self._wanted(job, p)][:self.max_files]
+        else:
+            files = [Path(f).relative_to(job.directory).as_posix() for f in await asyncio.to_thread(self._collect, job)]
+            job.dirty, _ = await repo.changed_files(job.head_commit)
+
+        job.state_commit, stored = await asyncio.to_thread(self._load_git_scan, job.directory)
+        if job.state_commit:
+            changed, deleted = await repo.changed_files(job.state_commit, head)
+            job.stale = changed | deleted
+        valid = {path for path, (commit, dirty, _) in stored.items()
+                 if commit == job.state_commit and not dirty and path not in job.stale}
+
+        if job.base_ref:
+            job.base_commit = await repo.commit(job.base_ref)
+            changed, _ = await repo.changed_files(job.base_commit, head)
+            # Stale rows are dropped on save, so those files are re-analyzed even if base..head left them alone
+            pending = [p for p in files if p in changed or p in job.stale]
+        else:
+            job.base_commit = job.state_commit
+            pending = [p for p in files if p not in valid]
+
+        queued = set(pending)
+        for path in files:
+            if path in valid and path not in queued:
+                job.results[os.path.join(job.directory, path)] = json.loads(stored[path][2])
+                job.reused += 1
+
+        logger.info(f"[Scanner] Scan {job.scan_id}: {len(pending)} changed file(s) to analyze, {job.reused} reused "
+                    f"({job.base_commit or 'no base'}..{job.head_ref or 'worktree'})")
+        return [os.path.join(job.directory, p) for p in pending]
+
+    async def _analyze(self, job: ScanJob, file_path: str) -> Dict[str, Any] | str:
+        if job.mode != "git" or not job.head_ref:
+            return await groq_service.analyze_file(file_path)
+
+        # Scanning a ref: analyze the committed content, not the checkout
+        relative = Path(file_path).relative_to(job.directory).as_posix()
+        source = await job.repo.read(job.head_commit, relative)
+        if len(source.encode("utf-8")) > settings.FILE_MAX_BYTES:
+            return f"File too large: {file_path}"
+        return await groq_service.analyze_text(source, file_path)
+
+    @staticmethod
+    def _load_git_scan(directory: str) -> Tuple[str | None, Dict[str, Tuple[str, bool, str]]]:
+        with SessionLocal() as db:
+            state = db.get(ScanState, directory)
+            rows = db.execute(
+                select(ScanFileResult.path, ScanFileResult.commit, ScanFileResult.dirty, ScanFileResult.payload)
+                .where(ScanFileResult.directory == directory)
+            ).all()
+        return (state.commit if state else None), {path: (commit, dirty, payload) for path, commit, dirty, payload in rows}
+
+    @staticmethod
+    def _save_git_scan(job: ScanJob) -> None:
+        """
+        Record the scanned commit. Still-valid rows move to it, stale ones are
+        dropped and this scan's analyses are stored.
+        """
+        directory, head = job.directory, job.head_commit
+        table = ScanFileResult
+        with SessionLocal() as db:
+            if job.state_commit:
+                db.execute(
+                    update(table)
+                    .where(table.directory == directory, table.commit == job.state_commit, table.dirty.is_(False))
+                    .values(commit=head)
+                )
+            stale = sorted(job.stale)
+            for start in range(0, len(stale), 500):
+                db.execute(delete(table).where(table.directory == directory, table.path.in_(stale[start:start + 500])))
+            db.execute(delete(table).where(table.directory == directory, table.commit != head))
+
+            for path, payload in job.analyzed.items():
+                db.merge(table(directory=directory, path=path, commit=head, dirty=path in job.dirty, payload=json.dumps(payload)))
+            db.merge(ScanState(directory=directory, commit=head))
+            db.commit()
+
+    async def _worker(self, job: ScanJob, queue: "asyncio.Queue[str]") -> None:
+        while not queue.empty():
+            file_path = queue.get_nowait()
+            job.in_flight += 1
+            try:
+                # Batch work yields provider quota to interactive chat requests
+                with llm_priority(PRIORITY_BULK):
+                    result = await self._analyze(job, file_path)
+            except Exception as e:
+                logger.exception(f"[Scanner] Unexpected error analyzing {file_path}")
+                result = f"Failed to analyze file {file_path} ({e})"
+            finally:
+                job.in_flight -= 1
+
+            if isinstance(result, dict):
+                job.results[file_path] = result
+                if job.mode == "git":
+                    job.analyzed[Path(file_path).relative_to(job.directory).as_posix()] = result
+            else:
+                job.results[file_path] = {"status": "error", "error": result}
+                job.failed += 1
+            job.done += 1
+
+            # Partial results reach session memory periodically; each write serializes
+            # every result so far, so writing per file would be quadratic in the scan size
+            if time.monotonic() - job.remembered_at >= self.memory_interval:
+                self._remember(job)
+
+    @staticmethod
+    def _remember(job: ScanJob) -> None:
+        job.remembered_at = time.monotonic()
+        history_manager.set_memory(job.session_id, "last_scan", {
+            "scan_id": job.scan_id,
+            "directory": job.directory,
+            "mode": job.mode,
+            "head_commit": job.head_commit,
+            "files": job.results,
+        })
+
+
+# Global Instance
+scanner_service = Scanner(
+    max_concurrency=settings.SCAN_MAX_CONCURRENCY,
+    max_files=settings.SCAN_MAX_FILES,
+    git_timeout=settings.SCAN_GIT_TIMEOUT_SECONDS,
+    memory_interval=settings.SCAN_MEMORY_INTERVAL_SECONDS,
+)
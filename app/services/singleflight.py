@@ -0,0 +1,50 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+import asyncio
+import copy
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Coalesces identical in-flight async calls.
+
+        The first caller for a key starts the work; callers that arrive while it is
+        still running wait on the same task and share its result (or its exception).
+        The work runs as its own task, so it is not cancelled when the caller that
+        started it goes away.
+        """
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+
+        # Every caller gets its own copy, so no one mutates a shared result
+        return copy.deepcopy(await asyncio.shield(task))
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved even if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
+
+
+# Global Instance
+singleflight = SingleFlight()
@@ -0,0 +1,275 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+import ast
+import re
+
+# Calls whose first argument ends up as SQL text
+SINK_METHODS = {
+    "execute", "executemany", "executescript", "mogrify", "exec_driver_sql",
+    "raw", "extra", "read_sql", "read_sql_query", "from_statement",
+}
+SINK_FUNCTIONS = {"text", "read_sql", "read_sql_query"}
+
+SQL_KEYWORDS = re.compile(r"\b(?:select|insert\s+into|update|delete\s+from|where|values|order\s+by|drop\s+table|create\s+table)\b", re.I)
+
+
+@dataclass
+class Candidate:
+    """
+    A location the worker model should look at.
+    """
+    line: int
+    end_line: int
+    kind: str
+    detail: str
+
+
+class PrescanUndecided(Exception):
+    """
+    Raised when the pre-scan meets a query it cannot trace (a parameter, a call
+    result, an attribute it never saw assigned). The file needs a full analysis.
+    """
+
+
+# Taint states of a name within a scope
+TAINTED, CLEAN, UNKNOWN = "tainted", "clean", "unknown"
+
+
+class _ScopeVisitor(ast.NodeVisitor):
+    def __init__(self):
+        self.candidates: List[Candidate] = []
+        # One dict per enclosing scope: name (or dotted attribute) -> taint state
+        self.scopes: List[Dict[str, str]] = [{}]
+        self.undecided: List[Tuple[int, str]] = []
+
+    # ----- scopes -----
+    def _visit_scope(self, node):
+        args = node.args
+        params = [*args.posonlyargs, *args.args, *args.kwonlyargs, args.vararg, args.kwarg]
+        # Parameters shadow outer names and carry whatever the caller passed
+        self.scopes.append({a.arg: UNKNOWN for a in params if a is not None})
+        self.generic_visit(node)
+        self.scopes.pop()
+
+    visit_FunctionDef = _visit_scope
+    visit_AsyncFunctionDef = _visit_scope
+    visit_Lambda = _visit_scope
+
+    @staticmethod
+    def _key(node: ast.AST) -> str | None:
+        """
+        Name or dotted attribute path (`self.query`) a value can be tracked under.
+        """
+        if isinstance(node, ast.Name):
+            return node.id
+        if isinstance(node, ast.Attribute) and _ScopeVisitor._key(node.value):
+            return f"{_ScopeVisitor._key(node.value)}.{node.attr}"
+        return None
+
+    def lookup(self, node: ast.AST) -> str:
+        key = self._key(node)
+        for scope in reversed(self.scopes):
+            if key in scope:
+                return scope[key]
+        return UNKNOWN
+
+    # ----- taint tracking -----
+    def is_dynamic(self, node: ast.AST) -> bool:
+        """
+        True if `node` builds a string from non-constant parts.
+        """
+        if isinstance(node, ast.JoinedStr):
+            return any(isinstance(v, ast.FormattedValue) for v in node.values)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+            return self.is_stringish(node.left) or self.is_stringish(node.right)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mod):
+            return self.is_stringish(node.left)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            if node.func.attr == "format":
+                return True
+            if node.func.attr == "join" and isinstance(node.func.value, ast.Constant):
+                return True
+        if self._key(node):
+            return self.lookup(node) == TAINTED
+        return False
+
+    def is_stringish(self, node: ast.AST) -> bool:
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return True
+        if isinstance(node, ast.JoinedStr):
+            return True
+        return self.is_dynamic(node)
+
+    def state(self, value: ast.AST) -> str:
+        if self.is_dynamic(value):
+            return TAINTED
+        if isinstance(value, (ast.Constant, ast.JoinedStr)):
+            return CLEAN
+        if self._key(value):
+            return self.lookup(value)
+        return UNKNOWN
+
+    @staticmethod
+    def constant_text(node: ast.AST) -> str:
+        return " ".join(
+            n.value for n in ast.walk(node)
+            if isinstance(n, ast.Constant) and isinstance(n.value, str)
+        )
+
+    def _bind(self, target: ast.AST, value: ast.AST | None) -> None:
+        """
+        Record the taint of `value` under `target`, element-wise for tuple unpacking.
+        A value of None (loop variables, `with ... as`, starred) is unknown.
+        """
+        if isinstance(target, (ast.Tuple, ast.List)):
+            pairs = (isinstance(value, (ast.Tuple, ast.List)) and len(value.elts) == len(target.elts)
+                     and not any(isinstance(e, ast.Starred) for e in (*target.elts, *value.elts)))
+            for i, element in enumerate(target.elts):
+                self._bind(element, value.elts[i] if pairs else None)
+            return
+        if isinstance(target, ast.Starred):
+            self._bind(target.value, None)
+            return
+
+        key = self._key(target)
+        if key:
+            self.scopes[-1][key] = self.state(value) if value is not None else UNKNOWN
+
+    def _check_assigned(self, value: ast.AST | None) -> None:
+        if isinstance(value, (ast.Tuple, ast.List)):
+            for element in value.elts:
+                self._check_assigned(element)
+        elif value is not None:
+            self._check_building(value)
+
+    def visit_Assign(self, node: ast.Assign):
+        for target in node.targets:
+            self._bind(target, node.value)
+        self._check_assigned(node.value)
+        self.generic_visit(node)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign):
+        if node.value is not None:
+            self._bind(node.target, node.value)
+            self._check_assigned(node.value)
+        self.generic_visit(node)
+
+    def visit_NamedExpr(self, node: ast.NamedExpr):
+        self._bind(node.target, node.value)
+        self._check_assigned(node.value)
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node: ast.AugAssign):
+        key = self._key(node.target)
+        if key and isinstance(node.op, (ast.Add, ast.Mod)):
+            if not isinstance(node.value, ast.Constant) or self.lookup(node.target) == TAINTED:
+                self.scopes[-1][key] = TAINTED
+        self._check_building(node.value)
+        self.generic_visit(node)
+
+    def visit_For(self, node):
+        self._bind(node.target, None)
+        self.generic_visit(node)
+
+    visit_AsyncFor = visit_For
+
+    def visit_withitem(self, node: ast.withitem):
+        if node.optional_vars is not None:
+            self._bind(node.optional_vars, None)
+        self.generic_visit(node)
+
+    def _check_building(self, value: ast.AST):
+        """
+        Dynamic strings that look like SQL are candidates even without a known sink.
+        """
+        if self.is_dynamic(value) and not self._key(value) and SQL_KEYWORDS.search(self.constant_text(value)):
+            self._add(value, "string_building", "SQL text built from dynamic parts")
+
+    # ----- sinks -----
+    def visit_Call(self, node: ast.Call):
+        name = None
+        if isinstance(node.func, ast.Attribute) and node.func.attr in SINK_METHODS:
+            name = node.func.attr
+        elif isinstance(node.func, ast.Name) and node.func.id in SINK_FUNCTIONS:
+            name = node.func.id
+
+        if name:
+            self._check_sink(node, name)
+        else:
+            for arg in node.args:
+                self._check_building(arg)
+
+        self.generic_visit(node)
+
+    def _check_sink(self, node: ast.Call, name: str) -> None:
+        query = node.args[0] if node.args else None
+        if query is None or isinstance(query, ast.Starred):
+            self.undecided.append((node.lineno, f"{name}() without a positional query"))
+        elif self.is_dynamic(query):
+            self._add(node, "sink", f"{name}() called with a dynamically built query")
+        elif self.state(query) == CLEAN:
+            return
+        elif self._key(query) and self.lookup(query) == UNKNOWN:
+            self.undecided.append((node.lineno, f"{name}() called with untraced `{self._key(query)}`"))
+        elif not self._key(query):
+            self.undecided.append((node.lineno, f"{name}() called with a computed query"))
+
+    def _add(self, node: ast.AST, kind: str, detail: str):
+        self.candidates.append(Candidate(
+            line=node.lineno,
+            end_line=getattr(node, "end_lineno", node.lineno) or node.lineno,
+            kind=kind,
+            detail=detail,
+        ))
+
+
+class SqlPrescanner:
+    def __init__(self):
+        """
+        Local static pre-pass over the Python AST that flags SQL sinks fed by
+        dynamically built strings. Files without candidates never reach the LLM;
+        files with a query it cannot trace are analyzed in full.
+        """
+        self.files_scanned = 0
+        self.files_skipped = 0
+        self.files_undecided = 0
+        self.lines_total = 0
+        self.lines_sent = 0
+
+    def scan(self, source: str) -> List[Candidate]:
+        """
+        Return candidate locations, sorted by line. Raises SyntaxError for non-Python
+        input and PrescanUndecided when a query reaching a sink cannot be traced.
+        """
+        tree = ast.parse(source)
+        visitor = _ScopeVisitor()
+        visitor.visit(tree)
+        if visitor.undecided:
+            line, reason = visitor.undecided[0]
+            self.files_undecided += 1
+            raise PrescanUndecided(f"line {line}: {reason}")
+
+        unique = {(c.line, c.end_line, c.kind): c for c in visitor.candidates}
+        return sorted(unique.values(), key=lambda c: (c.line, c.end_line))
+
+    def record(self, total_lines: int, sent_lines: int) -> None:
+        self.files_scanned += 1
+        self.lines_total += total_lines
+        self.lines_sent += sent_lines
+        if sent_lines == 0:
+            self.files_skipped += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "files_scanned": self.files_scanned,
+            "files_skipped": self.files_skipped,
+            "files_undecided": self.files_undecided,
+            "lines_total": self.lines_total,
+            "lines_sent": self.lines_sent,
+            "lines_sent_ratio": round(self.lines_sent / self.lines_total, 4) if self.lines_total else 0.0,
+        }
+
+
+# Global Instance
+sql_prescanner = SqlPrescanner()
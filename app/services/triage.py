@@ -0,0 +1,114 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+from app.config.settings import settings
+from app.services.chunker import SourceChunk
+from app.services.metrics import Counter, Histogram, metrics
+
+import json
+import re
+import threading
+
+RISK_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+DECISIONS = ("escalated", "cleared", "error", "cached")
+
+
+@dataclass
+class TriageVerdict:
+    """
+    The triage model's answer for one unit of code: a 0-1 risk that it holds
+    an issue worth the worker model, and the (start, end) line ranges to look at.
+    """
+    risk: float
+    regions: List[Tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def lines(self) -> set:
+        return {n for start, end in self.regions for n in range(start, end + 1)}
+
+
+def parse_verdict(text: str) -> TriageVerdict:
+    """
+    Read the triage JSON. Raises ValueError when there is no usable answer.
+    """
+    match = re.search(r"\{.*\}", text or "", re.DOTALL)
+    if not match:
+        raise ValueError("triage answer is not JSON")
+    data = json.loads(match.group(0))
+
+    risk = data.get("risk")
+    if not isinstance(risk, (int, float)):
+        verdict = str(data.get("verdict", "")).lower()
+        if verdict not in ("likely_vulnerable", "clean"):
+            raise ValueError(f"triage answer has no risk or verdict: {data}")
+        risk = 1.0 if verdict == "likely_vulnerable" else 0.0
+
+    regions = []
+    for region in data.get("regions") or []:
+        start, end = region.get("start_line"), region.get("end_line", region.get("start_line"))
+        if isinstance(start, int) and isinstance(end, int) and start > 0:
+            regions.append((start, max(start, end)))
+    return TriageVerdict(risk=min(1.0, max(0.0, float(risk))), regions=regions)
+
+
+def numbered(chunk: SourceChunk) -> str:
+    """
+    Chunk text with absolute line numbers, so regions refer to the real file.
+    """
+    lines = chunk.text.splitlines()
+    width = len(str(max((n for n in chunk.line_map if n is not None), default=len(lines))))
+    return "\n".join(
+        f"{'' if n is None else n:>{width}} | {line}"
+        for n, line in zip(chunk.line_map or range(1, len(lines) + 1), lines)
+    )
+
+
+class TriageCascade:
+    def __init__(self, enabled: bool = False, model: str | None = None, threshold: float = 0.3):
+        """
+        Two-tier analysis: a cheap triage model scores each unit of code and only
+        units at or above `threshold` go on to the worker model. Verdicts, the
+        risk distribution and per-tier latency are exported so the threshold can
+        be tuned against the escalation rate.
+        """
+        self.enabled = enabled
+        self.model = model
+        self.threshold = threshold
+        self.counts: Dict[str, int] = {decision: 0 for decision in DECISIONS}
+        self._lock = threading.Lock()
+
+        self.decisions = metrics.register(Counter(
+            "cybairo_triage_decisions_total", "Triage outcomes per analyzed unit.", ("decision",)))
+        self.risk = metrics.register(Histogram(
+            "cybairo_triage_risk", "Risk scores returned by the triage model.", buckets=RISK_BUCKETS))
+        self.tier_seconds = metrics.register(Histogram(
+            "cybairo_analysis_tier_seconds", "Model latency per analyzed unit, by cascade tier.", ("tier",)))
+
+    def escalate(self, verdict: TriageVerdict) -> bool:
+        return verdict.risk >= self.threshold
+
+    def record(self, decision: str, risk: float | None = None) -> None:
+        with self._lock:
+            self.counts[decision] += 1
+        self.decisions.inc(decision=decision)
+        if risk is not None:
+            self.risk.observe(risk)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self.counts)
+        triaged = counts["escalated"] + counts["cleared"]
+        return {
+            "enabled": self.enabled,
+            "model": self.model,
+            "threshold": self.threshold,
+            **counts,
+            "escalation_rate": round(counts["escalated"] / triaged, 3) if triaged else None,
+        }
+
+
+# Global Instance
+triage_cascade = TriageCascade(
+    enabled=settings.ANALYZE_CASCADE_ENABLED,
+    model=settings.TRIAGE_LLM_ID or settings.ROUTER_LLM_ID,
+    threshold=settings.TRIAGE_THRESHOLD,
+)
@@ -0,0 +1,35 @@
+"""
+Environment bootstrap shared by the in-process benchmarks.
+
+Call `bootstrap()` before importing anything else from `app`: it points the
+app at a throwaway SQLite database and sets the minimal settings needed to
+import it without a .env file, then imports `app.main` so the tables exist.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+
+def bootstrap(**overrides: str) -> str:
+    """
+    Set defaults (and `overrides`) for unset environment variables and return
+    the scratch directory that holds the database and generated sources.
+    """
+    tmp_dir = tempfile.mkdtemp(prefix="cybairo-bench-")
+    defaults = {
+        "APP_NAME": "cybairo-bench",
+        "DATABASE_URL": f"sqlite:///{tmp_dir}/bench.db",
+        "GROQ_API_KEY": "stub",
+        "ROUTER_LLM_ID": "stub-router",
+        "WORKER_LLM_ID": "stub-worker",
+        # The stub has no provider quota to protect
+        "LLM_SCHEDULER_ENABLED": "false",
+        "PROMPT_LIBRARY_PATH": str(Path(__file__).resolve().parents[1] / "app" / "prompts"),
+        **overrides,
+    }
+    for name, value in defaults.items():
+        os.environ.setdefault(name, value)
+
+    import app.main  # noqa: F401  (creates the tables)
+    return tmp_dir
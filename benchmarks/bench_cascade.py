@@ -0,0 +1,93 @@
+"""
+Cascade check: a triage model screens files before the worker model.
+
+Generates query modules, where only every `--vulnerable-every`-th one builds
+SQL from user input, and analyzes each of them twice with a stub model. The
+first run sends everything to the worker. The second enables the cascade, so
+triage clears the clean files and narrows the flagged ones to their regions.
+Worker and triage calls sleep for different simulated latencies.
+
+For each mode the script prints model calls, worker lines, wall time and the
+escalation rate. It exits non-zero if the cascade loses a finding.
+
+Usage:
+    python -m benchmarks.bench_cascade --files 60 --worker-latency 0.4 --triage-latency 0.05
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from benchmarks._env import bootstrap
+
+# Whole files reach the models; the SQL pre-scan would clear the clean ones first
+_TMP_DIR = bootstrap(ANALYSIS_CACHE_ENABLED="false", ANALYZE_PRESCAN_ENABLED="false")
+
+from app.services.groq_service import groq_service  # noqa: E402
+from app.services.triage import triage_cascade  # noqa: E402
+from benchmarks.stub_llm import StubCompletions  # noqa: E402
+
+
+def build_module(n: int, vulnerable: bool, helpers: int = 12) -> str:
+    parts = ["import sqlite3\n"]
+    for h in range(helpers):
+        if vulnerable and h == helpers // 2:
+            query = f'cursor.execute("SELECT * FROM t{h} WHERE id = " + user_id)'
+        else:
+            query = f'cursor.execute("SELECT * FROM t{h} WHERE id = ?", (user_id,))'
+        parts.append(
+            f"\ndef get_{n}_{h}(conn, user_id):\n"
+            f"    cursor = conn.cursor()\n"
+            f"    {query}\n"
+            f"    return cursor.fetchone()\n"
+        )
+    return "".join(parts)
+
+
+async def run(paths, enabled: bool, args) -> dict:
+    stub = StubCompletions({"analyze": args.worker_latency, "triage": args.triage_latency}).install(groq_service.transport)
+    triage_cascade.enabled = enabled
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(groq_service.analyze_file(str(p)) for p in paths))
+    seconds = time.perf_counter() - start
+
+    findings = {(str(p), f["line"]) for p, r in zip(paths, results) for f in r["result"]["findings"]}
+    return {"stub": stub, "seconds": seconds, "findings": findings}
+
+
+async def main(args) -> int:
+    paths = []
+    for n in range(args.files):
+        path = Path(_TMP_DIR) / f"queries_{n}.py"
+        path.write_text(build_module(n, vulnerable=n % args.vulnerable_every == 0), encoding="utf-8")
+        paths.append(path)
+
+    direct = await run(paths, False, args)
+    cascade = await run(paths, True, args)
+
+    print(f"{'mode':<8} {'triage':>7} {'worker':>7} {'worker_lines':>13} {'findings':>9} {'seconds':>8}")
+    for name, outcome in (("direct", direct), ("cascade", cascade)):
+        stub = outcome["stub"]
+        print(f"{name:<8} {stub.by_kind.get('triage', 0):>7} {stub.by_kind.get('analyze', 0):>7} {stub.analyzed_lines:>13} "
+              f"{len(outcome['findings']):>9} {outcome['seconds']:>8.2f}")
+    print(f"escalation rate: {triage_cascade.stats()['escalation_rate']} (threshold {triage_cascade.threshold})")
+
+    missed = direct["findings"] - cascade["findings"]
+    if missed:
+        print(f"FAIL ({len(missed)} finding(s) lost by the cascade)")
+        return 1
+    print("PASS")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=60)
+    parser.add_argument("--vulnerable-every", type=int, default=5)
+    parser.add_argument("--worker-latency", type=float, default=0.4)
+    parser.add_argument("--triage-latency", type=float, default=0.05)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,69 @@
+"""
+Single-flight check: N concurrent identical analyze requests make one upstream call.
+
+A stub LLM client counts completions and sleeps for a fixed latency so all
+requests overlap. Each round writes a fresh file (so the analysis cache cannot
+answer) and fires N concurrent `analyze_file` calls at it. The script exits
+non-zero if any round makes more than one upstream call.
+
+Usage:
+    python -m benchmarks.bench_coalescing --concurrency 32 --rounds 3
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from benchmarks._env import bootstrap
+
+_TMP_DIR = bootstrap()
+
+from app.services.groq_service import groq_service  # noqa: E402
+from app.services.singleflight import singleflight  # noqa: E402
+from benchmarks.stub_llm import StubCompletions  # noqa: E402
+
+
+SOURCE_TEMPLATE = '''import sqlite3
+
+def get_user_{n}(conn, user_id):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT * FROM users WHERE id = {{user_id}}")
+    return cursor.fetchone()
+'''
+
+
+async def main(concurrency: int, rounds: int, latency: float) -> int:
+    stub = StubCompletions(latency).install(groq_service.transport)
+
+    failed = 0
+    print(f"{'round':>6} {'requests':>9} {'upstream':>9} {'coalesced':>10} {'elapsed_s':>10}")
+    for n in range(rounds):
+        source = Path(_TMP_DIR) / f"vulnerable_{n}.py"
+        source.write_text(SOURCE_TEMPLATE.format(n=n), encoding="utf-8")
+
+        calls_before, coalesced_before = stub.calls, singleflight.coalesced
+        start = time.perf_counter()
+        results = await asyncio.gather(*(groq_service.analyze_file(str(source)) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+        upstream = stub.calls - calls_before
+        coalesced = singleflight.coalesced - coalesced_before
+        same = all(r == results[0] for r in results) and isinstance(results[0], dict)
+        print(f"{n:>6} {concurrency:>9} {upstream:>9} {coalesced:>10} {elapsed:>10.3f}")
+        if upstream != 1 or coalesced != concurrency - 1 or not same:
+            failed += 1
+
+    print("PASS" if not failed else f"FAIL ({failed} round(s) did not coalesce)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32, help="Identical requests per round")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds, each against a fresh file")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub completion latency in seconds")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.concurrency, args.rounds, args.latency)))
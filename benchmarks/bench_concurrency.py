@@ -0,0 +1,114 @@
+"""
+Concurrency benchmark for /agent/chat against an in-process stub LLM client.
+
+Every completion sleeps for a fixed latency, so a non-blocking pipeline should
+see throughput grow roughly linearly with the number of in-flight requests.
+
+Usage:
+    python -m benchmarks.bench_concurrency --latency 0.2 --levels 1 8 32 64
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from benchmarks._env import bootstrap
+
+_TMP_DIR = bootstrap()
+
+import httpx  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.services.groq_service import groq_service  # noqa: E402
+from benchmarks.stub_llm import StubCompletions  # noqa: E402
+
+
+VULNERABLE_SOURCE = '''import sqlite3
+
+def get_user(conn, user_id):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT * FROM users WHERE id = {user_id}")
+    return cursor.fetchone()
+'''
+
+ANALYSIS = {
+    "version": "1.0",
+    "task": "analyze",
+    "status": "success",
+    "result": {
+        "summary": {"total_findings": 1, "high": 1, "medium": 0, "low": 0},
+        "findings": [
+            {
+                "id": "F1",
+                "title": "f-string in cursor.execute",
+                "category": "sql_injection",
+                "severity": "HIGH",
+                "line": 5,
+                "end_line": 5,
+                "code_snippet": 'cursor.execute(f"SELECT ...")',
+                "description": "User input interpolated into SQL.",
+            }
+        ],
+    },
+}
+
+
+def respond_for(file_path: str):
+    """
+    Router calls classify every turn as an analysis of `file_path`; worker calls get ANALYSIS.
+    """
+    def respond(kind: str, content: str, messages: list) -> str:
+        if "classifier" in (messages[0]["content"] if messages else ""):
+            return json.dumps({"intent": "analyze", "file_path": file_path, "target": {}})
+        return json.dumps(ANALYSIS)
+    return respond
+
+
+async def run_level(client: httpx.AsyncClient, in_flight: int, requests: int) -> float:
+    """
+    Send `requests` chat turns with at most `in_flight` outstanding at once.
+    Returns throughput in requests per second.
+    """
+    semaphore = asyncio.Semaphore(in_flight)
+
+    async def one(i: int):
+        async with semaphore:
+            resp = await client.post(
+                "/agent/chat",
+                json={"session_id": f"bench-{in_flight}-{i}", "message": "analyze the file"},
+            )
+            resp.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+async def main(latency: float, levels: list[int], requests_per_level: int):
+    source = Path(_TMP_DIR) / "vulnerable.py"
+    source.write_text(VULNERABLE_SOURCE, encoding="utf-8")
+
+    stub = StubCompletions(latency, respond_for(str(source))).install(groq_service.transport)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        baseline = None
+        print(f"{'in_flight':>10} {'req/s':>10} {'speedup':>10}")
+        for level in levels:
+            rps = await run_level(client, level, max(requests_per_level, level))
+            baseline = baseline or rps
+            print(f"{level:>10} {rps:>10.2f} {rps / baseline:>9.1f}x")
+
+    print(f"Upstream calls: {stub.calls}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub completion latency in seconds")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 8, 32, 64], help="In-flight request levels")
+    parser.add_argument("--requests", type=int, default=64, help="Requests per level")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.latency, args.levels, args.requests))
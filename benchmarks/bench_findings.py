@@ -0,0 +1,118 @@
+"""
+Micro-benchmark: building and serializing /agent/chat responses with many findings.
+
+Compares the previous path (four severity passes over the raw dict, an untyped
+`Dict[str, Any]` response model, FastAPI's default JSONResponse) with the typed
+path (one AnalysisResult parse with precomputed severity counts, ChatResponse
+dumped straight into ORJSONResponse). Both start from the worker's dict.
+
+Usage:
+    python -m benchmarks.bench_findings --findings 100 300 1000 --repeat 200
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Any, Dict
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import BaseModel
+
+from app.db.schemas import AnalysisResult, ChatResponse
+
+CLASSIFICATION = {"intent": "analyze", "file_path": "/host/project/app.py", "target": None}
+
+
+class LegacyChatResponse(BaseModel):
+    message: str
+    response: Dict[str, Any]
+    intent: str
+    file_path: str | None = None
+    target: dict | None = None
+
+
+LEGACY_FIELD = create_model_field(name="Response_chat", type_=LegacyChatResponse, mode="serialization")
+
+
+def make_payload(count: int) -> Dict[str, Any]:
+    rng = random.Random(count)
+    findings = []
+    for i in range(count):
+        line = rng.randint(1, 5000)
+        findings.append({
+            "id": f"F{i + 1}",
+            "title": "SQL injection via string concatenation",
+            "category": "sql_injection",
+            "severity": rng.choice(["HIGH", "MEDIUM", "LOW"]),
+            "line": line,
+            "end_line": line + rng.randint(0, 3),
+            "code_snippet": f'cursor.execute("SELECT * FROM t WHERE id = " + user_{i})',
+            "description": "User input reaches a raw SQL string.",
+            "mappings": {"CIS": ["16.1 - secure coding practices"], "NIST": ["SI-10 - input validation"]},
+            "evidence": {"taint_sources": [f"user_{i}"], "sinks": ["cursor.execute"]},
+        })
+    return {
+        "version": "1.0",
+        "task": "analyze",
+        "status": "success",
+        "result": {"summary": {"total_findings": count}, "findings": findings},
+    }
+
+
+async def legacy(payload: Dict[str, Any]) -> bytes:
+    findings = payload["result"].get("findings", [])
+    message = (
+        f"Found {len(findings)} issues: "
+        f"high: {sum(1 for f in findings if f['severity'].lower() == 'high')}, "
+        f"medium: {sum(1 for f in findings if f['severity'].lower() == 'medium')}, "
+        f"low: {sum(1 for f in findings if f['severity'].lower() == 'low')}"
+    )
+    response = LegacyChatResponse(message="Response generated successfully.", response=payload, **CLASSIFICATION)
+    # What FastAPI does with a response_model: dump, re-validate, serialize, json.dumps
+    content = await serialize_response(field=LEGACY_FIELD, response_content=response)
+    body = JSONResponse(content).body
+    return body if message else b""
+
+
+async def typed(payload: Dict[str, Any]) -> bytes:
+    analysis = AnalysisResult.parse(payload)
+    counts = analysis.severity_counts
+    message = f"Found {counts['total']} issues: high: {counts['high']}, medium: {counts['medium']}, low: {counts['low']}"
+    response = ChatResponse.from_result(analysis, CLASSIFICATION)
+    body = ORJSONResponse(response.to_content()).body
+    return body if message else b""
+
+
+async def timed(fn, payload: Dict[str, Any], repeat: int) -> float:
+    """
+    Median milliseconds per call (robust to GC pauses).
+    """
+    await fn(payload)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn(payload)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+async def main(sizes, repeat: int) -> None:
+    print(f"{'findings':>9} {'legacy_ms':>10} {'typed_ms':>9} {'speedup':>8} {'bytes':>8}")
+    for count in sizes:
+        payload = make_payload(count)
+        legacy_ms = await timed(legacy, payload, repeat)
+        typed_ms = await timed(typed, payload, repeat)
+        size = len(await typed(payload))
+        print(f"{count:>9} {legacy_ms:>10.3f} {typed_ms:>9.3f} {legacy_ms / typed_ms:>7.2f}x {size:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--findings", type=int, nargs="+", default=[100, 300, 1000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.findings, args.repeat))
@@ -0,0 +1,116 @@
+"""
+Incremental scan check: git-aware rescans analyze only the changed files.
+
+Creates a throwaway git repository of query modules and runs five scans
+through the scanner with a stub worker model:
+
+1. the first incremental scan (no recorded base, so every file is analyzed);
+2. a rescan after a commit that edits, adds and deletes files;
+3. a rescan with an uncommitted edit in the working tree;
+4. a scan of the changes between two refs (`base_ref`..`head_ref`);
+5. a ref scan after a commit that changes a file outside `base_ref`..`head_ref`.
+
+Each rescan must analyze exactly the changed files and return merged results
+for every file present. Exits non-zero on a mismatch.
+
+Usage:
+    python -m benchmarks.bench_git_scan --files 200
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmarks._env import bootstrap
+
+# Every analyzed file must reach the stub so calls can be counted
+_TMP_DIR = bootstrap(ANALYSIS_CACHE_ENABLED="false")
+
+from app.services.groq_service import groq_service  # noqa: E402
+from app.services.scanner import scanner_service  # noqa: E402
+from benchmarks.stub_llm import StubCompletions  # noqa: E402
+
+
+def module(n: int, revision: int = 0) -> str:
+    return (
+        "import sqlite3\n\n"
+        f"def get_{n}(conn, user_id):\n"
+        f"    # revision {revision}\n"
+        "    cursor = conn.cursor()\n"
+        f'    cursor.execute("SELECT * FROM t{n} WHERE id = " + user_id)\n'
+        "    return cursor.fetchone()\n"
+    )
+
+
+def git(repo: Path, *args: str) -> str:
+    return subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True, text=True).stdout.strip()
+
+
+async def scan(stub: StubCompletions, repo: Path, **kwargs):
+    analyzed = stub.by_kind.get("analyze", 0)
+    start = time.perf_counter()
+    job = scanner_service.start("bench-git-scan", str(repo), ["**/*.py"], [], concurrency=8, **kwargs)
+    await job.task
+    return job, stub.by_kind.get("analyze", 0) - analyzed, time.perf_counter() - start
+
+
+async def main(files: int) -> int:
+    stub = StubCompletions().install(groq_service.transport)
+
+    repo = Path(_TMP_DIR) / "repo"
+    (repo / "pkg").mkdir(parents=True)
+    for n in range(files):
+        (repo / "pkg" / f"m{n}.py").write_text(module(n), encoding="utf-8")
+    git(repo, "init", "-q")
+    git(repo, "-c", "user.email=bench@example.com", "-c", "user.name=bench", "add", "-A")
+    git(repo, "-c", "user.email=bench@example.com", "-c", "user.name=bench", "commit", "-qm", "initial")
+    first_commit = git(repo, "rev-parse", "HEAD")
+
+    # Edit two files, add one, delete one
+    (repo / "pkg" / "m1.py").write_text(module(1, 1), encoding="utf-8")
+    (repo / "pkg" / "m2.py").write_text(module(2, 1), encoding="utf-8")
+    (repo / "pkg" / "new.py").write_text(module(files, 1), encoding="utf-8")
+    (repo / "pkg" / "m3.py").unlink()
+
+    # (name, scan, expected files analyzed, expected merged results)
+    cases = []
+    # Runs on the dirty tree: the edited and added files are stored as uncommitted
+    cases.append(("first scan", await scan(stub, repo, incremental=True), files, files))
+
+    git(repo, "-c", "user.email=bench@example.com", "-c", "user.name=bench", "add", "-A")
+    git(repo, "-c", "user.email=bench@example.com", "-c", "user.name=bench", "commit", "-qm", "change")
+    cases.append(("after commit", await scan(stub, repo, incremental=True), 3, files))
+
+    (repo / "pkg" / "m4.py").write_text(module(4, 2), encoding="utf-8")
+    cases.append(("uncommitted edit", await scan(stub, repo, incremental=True), 1, files))
+
+    # m4 was only scanned with uncommitted content, so HEAD's version has no stored result
+    cases.append(("base..head refs", await scan(stub, repo, base_ref=first_commit, head_ref="HEAD"), 3, files - 1))
+
+    # m4 is stale against the recorded scan though base..head is empty; its row must not be lost
+    git(repo, "-c", "user.email=bench@example.com", "-c", "user.name=bench", "commit", "-qam", "edit m4")
+    cases.append(("stale outside refs", await scan(stub, repo, base_ref="HEAD", head_ref="HEAD"), 1, files))
+
+    failures = 0
+    print(f"{'scan':<18} {'analyzed':>8} {'llm':>5} {'reused':>7} {'results':>8} {'seconds':>8}")
+    for name, (job, llm_calls, seconds), want_analyzed, want_results in cases:
+        ok = job.status == "completed" and job.total == want_analyzed and len(job.results) == want_results
+        failures += not ok
+        print(f"{name:<18} {job.total:>8} {llm_calls:>5} {job.reused:>7} {len(job.results):>8} {seconds:>8.3f}"
+              f"{'' if ok else f' MISMATCH ({job.status} {job.error})'}")
+
+    if failures:
+        print("FAIL")
+        return 1
+    print("PASS")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.files)))
@@ -0,0 +1,119 @@
+"""
+Accuracy and coverage of the fast-path intent classifier on a labeled corpus.
+
+The corpus (benchmarks/intent_corpus.json) starts with the examples from
+app/prompts/classify_intent.j2. For each case we report whether the fast path
+answered (confidence at or above the threshold) and whether it matched the label
+on intent, file_path, target.index and target.lines. Cases marked "defer"
+(negated or questioning fix requests, ambiguous finding numbers) must go to the
+router; answering one counts as a miss. With --llm the router LLM is scored on
+the same cases (needs a real GROQ_API_KEY).
+
+Usage:
+    python -m benchmarks.bench_intent_fastpath [--llm] [--verbose]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from benchmarks._env import bootstrap
+
+bootstrap()
+
+from app.config.settings import settings  # noqa: E402
+from app.services.intent_rules import fast_intent_classifier  # noqa: E402
+
+CORPUS = Path(__file__).with_name("intent_corpus.json")
+FIELDS = ("intent", "file_path", "index", "lines")
+
+
+def compare(expected: dict, actual: dict) -> list[str]:
+    """
+    Names of the scored fields that differ.
+    """
+    flat = lambda c: {
+        "intent": c.get("intent"),
+        "file_path": c.get("file_path"),
+        "index": (c.get("target") or {}).get("index"),
+        "lines": (c.get("target") or {}).get("lines"),
+    }
+    e, a = flat(expected), flat(actual)
+    return [f for f in FIELDS if e[f] != a[f]]
+
+
+async def score_llm(cases: list[dict]) -> None:
+    from app.services.groq_service import groq_service
+
+    settings.INTENT_FAST_PATH_ENABLED = False
+    correct = 0
+    start = time.perf_counter()
+    for case in cases:
+        actual = await groq_service.classify_intent(case["history"], case["memory"], case["query"])
+        correct += not compare(case["expected"], actual)
+    elapsed = time.perf_counter() - start
+    print(f"LLM accuracy: {correct}/{len(cases)} ({elapsed / len(cases) * 1000:.0f} ms/case)")
+
+
+def resolves(case: dict, actual: dict) -> bool:
+    """
+    A fast-path fix index must name one of the analysis' findings once the fix
+    resolves it, e.g. "the last one" (-1) against the session's finding count.
+    """
+    from app.services.groq_service import FixTargetError, groq_service
+
+    index = (actual.get("target") or {}).get("index")
+    if not actual["intent"].startswith("fix") or not isinstance(index, int):
+        return True
+    summary = ((case["memory"].get("last_analyze") or {}).get("result") or {}).get("summary")
+    if not summary:
+        # No stored analysis: the fix falls back to the model with the raw target
+        return True
+    findings = [{"id": f"F{n}", "line": n} for n in range(1, summary.get("total_findings", 0) + 1)]
+    try:
+        return groq_service._locate_target(actual["target"], {"last_analyze": {"result": {"findings": findings}}}, "") is not None
+    except FixTargetError:
+        return False
+
+
+def main(use_llm: bool, verbose: bool) -> None:
+    cases = json.loads(CORPUS.read_text(encoding="utf-8"))
+
+    covered = correct = leaked = 0
+    start = time.perf_counter()
+    for case in cases:
+        actual, confidence = fast_intent_classifier.classify(case["history"], case["memory"], case["query"])
+        answered = confidence >= fast_intent_classifier.threshold
+        mismatches = compare(case["expected"], actual)
+        if not resolves(case, actual):
+            mismatches.append("unresolved index")
+        if case.get("defer") and answered:
+            mismatches = ["defer"]
+            leaked += 1
+
+        covered += answered
+        correct += answered and not mismatches
+        if verbose or (answered and mismatches):
+            status = "MISS" if answered and mismatches else ("ok" if answered else "defer")
+            print(f"[{status:>5}] {confidence:.2f} {case['query']!r} -> {actual['intent']} {mismatches or ''}")
+    elapsed = time.perf_counter() - start
+
+    print(f"Cases:             {len(cases)}")
+    print(f"Fast-path answers: {covered} ({covered / len(cases):.0%} coverage)")
+    print(f"Fast-path correct: {correct}/{covered} ({(correct / covered if covered else 0):.0%} precision)")
+    print(f"Must-defer leaks:  {leaked}/{sum(1 for c in cases if c.get('defer'))}")
+    print(f"Fast-path cost:    {elapsed / len(cases) * 1e6:.1f} us/case")
+
+    if use_llm:
+        asyncio.run(score_llm(cases))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm", action="store_true", help="Also score the router LLM on the corpus")
+    parser.add_argument("--verbose", action="store_true", help="Print every case")
+    args = parser.parse_args()
+
+    main(args.llm, args.verbose)
@@ -0,0 +1,100 @@
+"""
+Fix-then-verify check: incremental re-analysis after a targeted fix.
+
+Generates a module with many query helpers, some of them injectable, runs a
+full `analyze_file`, then fixes one finding with a hunk that shifts the rest
+of the file down and leaves a new injectable query in the changed block. The
+fix must re-analyze that block only: some lines, but fewer than the full run.
+The script also checks that every surviving finding was remapped onto its
+vulnerable line and that the new query was found. Exits non-zero on a mismatch.
+
+Usage:
+    python -m benchmarks.bench_reanalyze --functions 60
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from benchmarks._env import bootstrap
+
+_TMP_DIR = bootstrap(ANALYSIS_CACHE_ENABLED="false")
+
+from app.services.groq_service import groq_service  # noqa: E402
+from benchmarks.stub_llm import StubCompletions  # noqa: E402
+
+
+def build_module(functions: int) -> str:
+    parts = ["import sqlite3\n"]
+    for n in range(functions):
+        if n % 4 == 0:
+            query = f'cursor.execute("SELECT * FROM t{n} WHERE id = " + user_id)'
+        else:
+            query = f'cursor.execute("SELECT * FROM t{n} WHERE id = ?", (user_id,))'
+        parts.append(
+            f"\ndef get_{n}(conn, user_id):\n"
+            f"    cursor = conn.cursor()\n"
+            f"    {query}\n"
+            f"    return cursor.fetchone()\n"
+        )
+    return "".join(parts)
+
+
+def parameterize(kind: str, content: str, messages: list) -> str:
+    """
+    Targeted fixes parameterize the query, add a comment line above it and an
+    injectable audit query below.
+    """
+    if kind != "fix_hunk":
+        return content
+    hunks = json.loads(content)["hunks"]
+    for hunk in hunks:
+        fixed = hunk["original"].replace('id = " + user_id)', 'id = ?", (user_id,))')
+        hunk["replacement"] = ("    # parameterized\n" + fixed
+                               + '\n    cursor.execute("INSERT INTO audit VALUES (" + user_id + ")")')
+    return json.dumps({"hunks": hunks})
+
+
+async def main(functions: int) -> int:
+    stub = StubCompletions(respond=parameterize).install(groq_service.transport)
+
+    path = Path(_TMP_DIR) / "queries.py"
+    path.write_text(build_module(functions), encoding="utf-8")
+
+    analysis = await groq_service.analyze_file(str(path))
+    full_lines, stub.analyzed_lines = stub.analyzed_lines, 0
+    findings = analysis["result"]["findings"]
+    memory = {"last_analyze": {**analysis, "file_path": str(path)}}
+
+    target = findings[len(findings) // 2]
+    message = await groq_service.fix_file(str(path), target={"raw": "fix it", "lines": [target["line"]]}, memory=memory)
+    incremental_lines = stub.analyzed_lines
+
+    refreshed = memory["last_analyze"]["result"]["findings"]
+    lines = path.read_text(encoding="utf-8").splitlines()
+    misplaced = [f for f in refreshed if "+ user_id" not in lines[f["line"] - 1]]
+    introduced = [f for f in refreshed if "INSERT INTO audit" in lines[f["line"] - 1]]
+
+    print(message)
+    print(f"{'findings before':>18}: {len(findings)}")
+    print(f"{'findings after':>18}: {len(refreshed)}")
+    print(f"{'full lines sent':>18}: {full_lines}")
+    print(f"{'re-analyzed lines':>18}: {incremental_lines} ({incremental_lines / max(1, full_lines):.1%} of full)")
+
+    if len(refreshed) != len(findings) or misplaced or len(introduced) != 1:
+        print(f"FAIL ({len(misplaced)} misplaced finding(s), {len(introduced)} finding(s) for the new query)")
+        return 1
+    if not 0 < incremental_lines < full_lines:
+        print("FAIL (the fix must re-analyze the changed block, and less than the whole file)")
+        return 1
+    print("PASS")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--functions", type=int, default=60)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.functions)))
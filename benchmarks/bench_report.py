@@ -0,0 +1,109 @@
+"""
+Report-request check: structured filters answered from the session's findings index.
+
+Stores a generated analysis as the session's last_analyze, then sends report
+requests through the executor with a stub worker model. Filters (severity,
+finding number, line range, issue type) must be answered without a model call
+and match a brute-force filter of the payload; a prose request must call the
+model once with only the matching findings. Exits non-zero on a mismatch.
+
+Usage:
+    python -m benchmarks.bench_report --findings 300 --repeat 200
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from benchmarks._env import bootstrap
+
+bootstrap()
+
+from app.config.history import history_manager  # noqa: E402
+from app.services.executor import executor_service  # noqa: E402
+from app.services.groq_service import groq_service  # noqa: E402
+from benchmarks.bench_findings import make_payload  # noqa: E402
+from benchmarks.stub_llm import StubCompletions  # noqa: E402
+
+SESSION = "bench-report"
+
+
+def expected(findings, severity=None, number=None, lines=None, contains=None):
+    selected = list(enumerate(findings, start=1))
+    if severity:
+        selected = [(n, f) for n, f in selected if f["severity"] == severity]
+    if number:
+        selected = [(n, f) for n, f in selected if n == number]
+    if lines:
+        selected = [(n, f) for n, f in selected if f["line"] <= lines[1] and f["end_line"] >= lines[0]]
+    if contains:
+        selected = [(n, f) for n, f in selected if contains in json.dumps(f).lower()]
+    return [f["id"] for _, f in selected]
+
+
+async def main(count: int, repeat: int) -> int:
+    sent = []
+
+    def summarize(kind: str, content: str, messages: list) -> str:
+        sent.append(messages[-1]["content"].count('"id":'))
+        return "Canned summary."
+
+    stub = StubCompletions(respond=summarize).install(groq_service.transport)
+
+    payload = make_payload(count)
+    payload["result"]["findings"][7]["description"] = "Query built with an f-string."
+    history_manager.set_last_analyze(SESSION, payload, file_path="/host/project/app.py")
+    memory = history_manager.get_memory(SESSION)
+    findings = memory["last_analyze"]["result"]["findings"]
+
+    cases = [
+        ("show me the high severity ones", {}, expected(findings, severity="HIGH")),
+        ("issue 3", {"index": 3}, expected(findings, number=3)),
+        ("list findings on lines 100-400", {}, expected(findings, lines=(100, 400))),
+        ("only the medium ones between lines 1000 and 1200", {}, expected(findings, severity="MEDIUM", lines=(1000, 1200))),
+        ("which ones use f-strings?", {}, expected(findings, contains="f-string")),
+        ("show all findings", {}, expected(findings)),
+    ]
+
+    failures = 0
+    print(f"{'query':<52} {'selected':>8} {'median_us':>10}")
+    for query, target, ids in cases:
+        async def run():
+            return await executor_service.dispatch("report", None, target, query, [], memory, session_id=SESSION)
+
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = await run()
+            samples.append(time.perf_counter() - start)
+        got = [f["id"] for f in result.findings]
+        ok = got == ids
+        failures += not ok
+        print(f"{query:<52} {len(got):>8} {statistics.median(samples) * 1e6:>10.1f} {'' if ok else 'MISMATCH'}")
+
+    if stub.calls:
+        print(f"FAIL ({stub.calls} model call(s) for structured filters)")
+        return 1
+
+    result = await executor_service.dispatch("report", None, {}, "summarize the high severity issues", [], memory,
+                                             session_id=SESSION)
+    high = len(expected(findings, severity="HIGH"))
+    print(f"prose summary: {stub.calls} model call, {sum(sent)}/{count} findings sent, "
+          f"narrative={result.payload['result'].get('narrative')!r}")
+
+    if failures or stub.calls != 1 or sum(sent) != high:
+        print("FAIL")
+        return 1
+    print("PASS")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--findings", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.findings, args.repeat)))
@@ -0,0 +1,21 @@
+import sqlite3
+
+import pandas as pd
+
+
+def load_events(db_path, event_type, since):
+    conn = sqlite3.connect(db_path)
+    try:
+        query = "SELECT * FROM events WHERE type = '%s' AND ts >= '%s'" % (event_type, since)
+        return pd.read_sql_query(query, conn)
+    finally:
+        conn.close()
+
+
+def load_sessions(db_path, user_ids):
+    conn = sqlite3.connect(db_path)
+    try:
+        ids = ",".join(str(u) for u in user_ids)
+        return pd.read_sql(f"SELECT * FROM sessions WHERE user_id IN ({ids})", conn)
+    finally:
+        conn.close()
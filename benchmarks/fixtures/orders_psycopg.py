@@ -0,0 +1,27 @@
+import psycopg2
+
+
+class OrderRepository:
+    def __init__(self, dsn):
+        self.conn = psycopg2.connect(dsn)
+
+    def orders_for_customer(self, customer_id, status=None):
+        sql = f"SELECT * FROM orders WHERE customer_id = {customer_id}"
+        if status:
+            sql += f" AND status = '{status}'"
+        with self.conn.cursor() as cur:
+            cur.execute(sql)
+            return cur.fetchall()
+
+    def order_total(self, order_id):
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT SUM(price * qty) FROM order_items WHERE order_id = %s", (order_id,))
+            return cur.fetchone()[0]
+
+    def sort_orders(self, column, direction="ASC"):
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT * FROM orders ORDER BY {} {}".format(column, direction))
+            return cur.fetchall()
+
+    def close(self):
+        self.conn.close()
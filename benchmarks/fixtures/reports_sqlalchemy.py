@@ -0,0 +1,22 @@
+from sqlalchemy import create_engine, text
+
+engine = create_engine("sqlite:///reports.db")
+
+
+def monthly_revenue(year, month):
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT SUM(amount) FROM payments "
+            f"WHERE strftime('%Y', created_at) = '{year}' AND strftime('%m', created_at) = '{month:02d}'"
+        )).scalar()
+
+
+def top_products(limit):
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT name, sold FROM products ORDER BY sold DESC LIMIT :limit"), {"limit": limit})
+        return rows.fetchall()
+
+
+def search_products(term):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("SELECT * FROM products WHERE name = '" + term + "'").fetchall()
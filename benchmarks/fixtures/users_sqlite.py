@@ -0,0 +1,29 @@
+import sqlite3
+
+
+def get_connection(path="app.db"):
+    return sqlite3.connect(path)
+
+
+def get_user(conn, user_id):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT * FROM users WHERE id = {user_id}")
+    return cursor.fetchone()
+
+
+def find_users_by_name(conn, name):
+    cursor = conn.cursor()
+    query = "SELECT id, name, email FROM users WHERE name LIKE '%" + name + "%'"
+    cursor.execute(query)
+    return cursor.fetchall()
+
+
+def delete_user(conn, user_id):
+    conn.execute("DELETE FROM users WHERE id = %s" % user_id)
+    conn.commit()
+
+
+def count_users(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM users")
+    return cursor.fetchone()[0]
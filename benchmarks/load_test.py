@@ -0,0 +1,368 @@
+"""
+Load test for /agent/chat against the local stub LLM server.
+
+`run` starts the stub (benchmarks/stub_llm.py) and the real app under uvicorn,
+each in its own process, on a scratch copy of benchmarks/fixtures. It then drives
+/agent/chat with a weighted mix of analyze / report / fix / general turns spread
+over many sessions. It reports p50/p95/p99 latency, requests per second and
+server memory per session, and saves the results as JSON. `compare` diffs two
+result files and exits non-zero on a regression.
+
+Runs are saved under benchmarks/results/, which git ignores except for
+baseline.json: the reference run with the default settings, committed so
+`--compare` has something to diff against. Regenerate it with
+`run --label baseline --out benchmarks/results/baseline.json` when a change
+is meant to move the numbers (or the hardware changes), and commit it.
+
+Usage:
+    python -m benchmarks.load_test run --compare            # against the committed baseline
+    python -m benchmarks.load_test run --concurrency 32 --requests 500 --sessions 50 --label v1.2
+    python -m benchmarks.load_test run --app-url http://127.0.0.1:8000   # against a running app
+    python -m benchmarks.load_test compare benchmarks/results/baseline.json benchmarks/results/new.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+FIXTURES = Path(__file__).with_name("fixtures")
+RESULTS = Path(__file__).with_name("results")
+BASELINE = RESULTS / "baseline.json"
+
+MESSAGES = {
+    "analyze": "analyze {file}",
+    "report": "show me the high severity findings",
+    "fix": "fix issue 1 in {file}",
+    "general": "what is SQL injection and how do I prevent it?",
+}
+
+# Lower is better for latencies, higher is better for throughput
+COMPARED = {"p50_ms": -1, "p95_ms": -1, "p99_ms": -1, "rps": 1}
+
+
+# -------------------------
+# PROCESSES
+# -------------------------
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_kb(pid: int | None) -> int | None:
+    """
+    Resident set size of a process from /proc (Linux only).
+    """
+    if pid is None:
+        return None
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def wait_until_up(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def start_servers(workdir: Path, args) -> tuple[str, str, list[subprocess.Popen]]:
+    """
+    Start the stub LLM and the app; returns (app_url, stub_url, processes).
+    """
+    stub_port, app_port = free_port(), free_port()
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(ROOT),
+        "APP_NAME": "cybairo-load",
+        "DATABASE_URL": f"sqlite:///{workdir}/load.db",
+        "GROQ_API_KEY": "stub",
+        "GROQ_BASE_URL": f"http://127.0.0.1:{stub_port}",
+        "ROUTER_LLM_ID": "stub-router",
+        "WORKER_LLM_ID": "stub-worker",
+        "PROMPT_LIBRARY_PATH": str(ROOT / "app" / "prompts"),
+        "LLM_SCHEDULER_ENABLED": "true" if args.scheduler else "false",
+    }
+
+    stub = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.stub_llm", "--port", str(stub_port),
+         "--latency", str(args.stub_latency), "--jitter", str(args.stub_jitter),
+         "--error-rate", str(args.stub_error_rate)],
+        cwd=workdir, env=env,
+    )
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(app_port), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    processes = [stub, app]
+    try:
+        wait_until_up(f"http://127.0.0.1:{stub_port}/stats")
+        wait_until_up(f"http://127.0.0.1:{app_port}/health/check")
+    except Exception:
+        stop_servers(processes)
+        raise
+    return f"http://127.0.0.1:{app_port}", f"http://127.0.0.1:{stub_port}", processes
+
+
+def stop_servers(processes: list[subprocess.Popen]) -> None:
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+# -------------------------
+# LOAD
+# -------------------------
+def parse_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in MESSAGES:
+            raise ValueError(f"Unknown turn type in mix: {name!r} (expected one of {sorted(MESSAGES)})")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def plan(requests: int, sessions: int, mix: dict[str, float], files: list[str], seed: int) -> list[tuple[str, str, str]]:
+    """
+    (session_id, kind, message) per request. Each session analyzes its file first
+    so report and fix turns have something in memory.
+    """
+    rng = random.Random(seed)
+    kinds, weights = list(mix), list(mix.values())
+    analyzed: set[str] = set()
+    turns = []
+    for i in range(requests):
+        session = f"load-{i % sessions}"
+        file = files[(i % sessions) % len(files)]
+        kind = rng.choices(kinds, weights)[0] if session in analyzed else "analyze"
+        analyzed.add(session)
+        turns.append((session, kind, MESSAGES[kind].format(file=file)))
+    return turns
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def summarize(samples: list[tuple[str, float, bool]], elapsed: float) -> dict:
+    latencies = [s[1] for s in samples]
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for s in samples if not s[2]),
+        "rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+async def drive(app_url: str, turns: list[tuple[str, str, str]], concurrency: int, timeout: float):
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: list[tuple[str, float, bool]] = []
+    # A session's turns run in order; different sessions run concurrently
+    locks: dict[str, asyncio.Lock] = {}
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=app_url, timeout=timeout, limits=limits) as client:
+        async def one(session: str, kind: str, message: str):
+            async with locks.setdefault(session, asyncio.Lock()), semaphore:
+                start = time.perf_counter()
+                try:
+                    resp = await client.post("/agent/chat", json={"session_id": session, "message": message})
+                    ok = resp.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                samples.append((kind, time.perf_counter() - start, ok))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(*turn) for turn in turns))
+        elapsed = time.perf_counter() - start
+    return samples, elapsed
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> int:
+    workdir = Path(tempfile.mkdtemp(prefix="cybairo-load-"))
+    shutil.copytree(FIXTURES, workdir / "fixtures")
+    files = sorted(str(p) for p in (workdir / "fixtures").glob("*.py"))
+
+    processes: list[subprocess.Popen] = []
+    app_pid, app_url, stub_url = args.app_pid, args.app_url, None
+    if not app_url:
+        app_url, stub_url, processes = start_servers(workdir, args)
+        app_pid = processes[1].pid
+
+    try:
+        mix = parse_mix(args.mix)
+        turns = plan(args.requests, args.sessions, mix, files, args.seed)
+
+        # Warm up imports, prompt compilation and the connection pools
+        asyncio.run(drive(app_url, plan(min(10, args.requests), 2, mix, files, args.seed + 1), 2, args.timeout))
+        rss_before = rss_kb(app_pid)
+
+        samples, elapsed = asyncio.run(drive(app_url, turns, args.concurrency, args.timeout))
+        rss_after = rss_kb(app_pid)
+        stub_stats = httpx.get(f"{stub_url}/stats").json() if stub_url else None
+    finally:
+        stop_servers(processes)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result = {
+        "label": args.label,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "config": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "sessions": args.sessions,
+            "mix": mix,
+            "stub_latency": args.stub_latency,
+            "stub_jitter": args.stub_jitter,
+            "stub_error_rate": args.stub_error_rate,
+            "scheduler": args.scheduler,
+            "external_app": bool(args.app_url),
+        },
+        "overall": summarize(samples, elapsed),
+        "by_intent": {
+            kind: summarize([s for s in samples if s[0] == kind], elapsed)
+            for kind in mix if any(s[0] == kind for s in samples)
+        },
+        "memory": {
+            "rss_before_kb": rss_before,
+            "rss_after_kb": rss_after,
+            "per_session_kb": round((rss_after - rss_before) / args.sessions, 2)
+            if rss_before is not None and rss_after is not None else None,
+        },
+        "stub": stub_stats,
+    }
+
+    print_result(result)
+    RESULTS.mkdir(exist_ok=True)
+    out = Path(args.out) if args.out else RESULTS / f"{args.label}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(f"\nSaved {out}")
+
+    if args.compare:
+        return compare_files(Path(args.compare), out, args.threshold)
+    return 0
+
+
+# -------------------------
+# REPORTING
+# -------------------------
+def print_result(result: dict) -> None:
+    print(f"{'':>10} {'requests':>9} {'errors':>7} {'rps':>8} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9}")
+    rows = [("overall", result["overall"])] + list(result["by_intent"].items())
+    for name, row in rows:
+        print(f"{name:>10} {row['requests']:>9} {row['errors']:>7} {row['rps']:>8.2f} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}")
+    memory = result["memory"]
+    if memory["per_session_kb"] is not None:
+        print(f"RSS {memory['rss_before_kb'] / 1024:.1f} MB -> {memory['rss_after_kb'] / 1024:.1f} MB "
+              f"({memory['per_session_kb']:.1f} KB per session)")
+
+
+def compare_files(baseline_path: Path, candidate_path: Path, threshold: float) -> int:
+    """
+    Print metric deltas; returns 1 if any metric is worse than `threshold` (fraction).
+    """
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    candidate = json.loads(candidate_path.read_text(encoding="utf-8"))
+    if baseline.get("config") != candidate.get("config"):
+        print("Warning: runs used different configurations; deltas may not be comparable.")
+
+    regressions = 0
+    print(f"\n{baseline.get('label')} ({baseline.get('commit')}) -> {candidate.get('label')} ({candidate.get('commit')})")
+    print(f"{'':>10} {'metric':>8} {'before':>10} {'after':>10} {'delta':>8}")
+    sections = [("overall", baseline["overall"], candidate["overall"])] + [
+        (kind, row, candidate["by_intent"][kind])
+        for kind, row in baseline.get("by_intent", {}).items() if kind in candidate.get("by_intent", {})
+    ]
+    for name, before, after in sections:
+        for metric, direction in COMPARED.items():
+            old, new = before.get(metric), after.get(metric)
+            if not old or new is None:
+                continue
+            delta = (new - old) / old
+            worse = delta * direction < -threshold
+            regressions += worse
+            print(f"{name:>10} {metric:>8} {old:>10.2f} {new:>10.2f} {delta:>+7.1%}{'  REGRESSION' if worse else ''}")
+
+    print(f"\n{regressions} regression(s) beyond {threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run a load test and save the results")
+    run_parser.add_argument("--label", default="local", help="Name for this run (e.g. a release)")
+    run_parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight")
+    run_parser.add_argument("--requests", type=int, default=300, help="Total chat turns")
+    run_parser.add_argument("--sessions", type=int, default=30, help="Distinct chat sessions")
+    run_parser.add_argument("--mix", default="analyze=4,report=2,fix=1,general=2", help="Weighted turn mix")
+    run_parser.add_argument("--seed", type=int, default=7, help="Seed for the turn mix")
+    run_parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    run_parser.add_argument("--stub-latency", type=float, default=0.3, help="Mean stub completion latency")
+    run_parser.add_argument("--stub-jitter", type=float, default=0.1, help="Stub latency standard deviation")
+    run_parser.add_argument("--stub-error-rate", type=float, default=0.0, help="Fraction of stub calls failing")
+    run_parser.add_argument("--scheduler", action="store_true", help="Keep the outbound rate-limit scheduler on")
+    run_parser.add_argument("--app-url", help="Target an already running app instead of starting one")
+    run_parser.add_argument("--app-pid", type=int, help="PID of --app-url's server, for memory readings")
+    run_parser.add_argument("--out", help="Result file (default: benchmarks/results/<label>-<time>.json)")
+    run_parser.add_argument("--compare", nargs="?", const=str(BASELINE),
+                            help="Baseline result file to compare against (default: the committed baseline)")
+    run_parser.add_argument("--threshold", type=float, default=0.10, help="Allowed regression (fraction)")
+
+    compare_parser = commands.add_parser("compare", help="Compare two saved result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Allowed regression (fraction)")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        sys.exit(run(args))
+    sys.exit(compare_files(Path(args.baseline), Path(args.candidate), args.threshold))
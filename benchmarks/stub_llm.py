@@ -0,0 +1,299 @@
+"""
+Local OpenAI/Groq-compatible chat completions server for benchmarks.
+
+Serves POST /openai/v1/chat/completions (the path AsyncGroq uses) and
+/v1/chat/completions with canned answers picked from the system prompt:
+classify, triage, analyze, report, targeted (hunk) fixes, whole-file fixes
+and general answers. Latency, jitter, injected errors and streaming are
+configurable, so the real app can be load-tested without API quota.
+
+Usage:
+    python -m benchmarks.stub_llm --port 8900 --latency 0.3 --jitter 0.1
+    GROQ_BASE_URL=http://127.0.0.1:8900 uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Callable, Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+PATH_PATTERN = re.compile(r"(/[\w.\-/]+\.py)\b")
+EXCERPT_LINE = re.compile(r"^\s*(\d+) \| (.*)$")
+DYNAMIC_SQL = re.compile(r"""(execute|exec_driver_sql|read_sql(_query)?|text)\(.*(f["']|%|\+|\.format\()""")
+
+
+class StubConfig:
+    def __init__(self, latency: float = 0.3, jitter: float = 0.1, error_rate: float = 0.0, chunk_delay: float = 0.01):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.chunk_delay = chunk_delay
+        self.calls = 0
+        self.by_kind: dict[str, int] = {}
+
+
+# -------------------------
+# CANNED ANSWERS
+# -------------------------
+def section(text: str, start: str, end: str | None = None) -> str:
+    """
+    Text after the last `start` marker, up to `end` if given.
+    """
+    if start not in text:
+        return ""
+    body = text.rsplit(start, 1)[1]
+    return body.split(end, 1)[0] if end and end in body else body
+
+
+def classify(user: str) -> dict:
+    query = section(user, "Latest query:", "Memory:").strip()
+    match = PATH_PATTERN.search(query)
+    # Keywords are matched outside the path ("fixtures/" is not a fix request)
+    lowered = PATH_PATTERN.sub(" ", query).lower()
+    index = re.search(r"(?:issue|finding|vuln\w*)\s*#?(\d+)", lowered)
+
+    if re.search(r"\bfix", lowered) and index:
+        intent, target = "fix_partial", {"raw": query, "index": int(index.group(1)), "description": None, "lines": None}
+    elif re.search(r"\bfix", lowered):
+        intent, target = "fix_all", {}
+    elif any(word in lowered for word in ("report", "show", "list", "which", "summar")):
+        intent, target = "report", {"raw": query, "index": None, "description": None, "lines": None}
+    elif any(word in lowered for word in ("analy", "scan", "check", "audit", "review")):
+        intent, target = "analyze", {}
+    else:
+        intent, target = "general", {}
+    return {"intent": intent, "file_path": match.group(1) if match else None, "target": target}
+
+
+def analyze(user: str) -> dict:
+    code = section(user, "Input code:\n", "\n\nReply with JSON only")
+    findings = []
+    for number, line in enumerate(code.splitlines(), start=1):
+        if DYNAMIC_SQL.search(line):
+            findings.append({
+                "id": f"F{len(findings) + 1}",
+                "title": "SQL injection via dynamically built query",
+                "severity": "high",
+                "line": number,
+                "end_line": number,
+                "evidence": line.strip(),
+                "recommendation": "Use a parameterized query.",
+            })
+    high = len(findings)
+    return {
+        "version": "1.0",
+        "task": "analyze",
+        "status": "success",
+        "result": {
+            "summary": {"total_findings": high, "high": high, "medium": 0, "low": 0},
+            "findings": findings,
+        },
+    }
+
+
+def triage(user: str) -> dict:
+    lines = [match for match in map(EXCERPT_LINE.match, section(user, "Code:\n").splitlines()) if match]
+    flagged = [int(m.group(1)) for m in lines if DYNAMIC_SQL.search(m.group(2))]
+    return {
+        "verdict": "likely_vulnerable" if flagged else "clean",
+        "risk": 0.9 if flagged else 0.05,
+        "regions": [{"start_line": n, "end_line": n} for n in flagged],
+    }
+
+
+def report(user: str) -> dict:
+    try:
+        analysis = json.loads(section(user, "Analysis input (verbatim JSON from memory):\n").strip())
+    except json.JSONDecodeError:
+        analysis = {}
+    findings = ((analysis or {}).get("result") or {}).get("findings", []) or []
+    return {
+        "version": "1.0",
+        "task": "report",
+        "status": "success",
+        "result": {
+            "summary": {"total_selected": len(findings)},
+            "findings": findings,
+        },
+    }
+
+
+def fix_hunk(user: str) -> dict:
+    for line in user.splitlines():
+        match = EXCERPT_LINE.match(line)
+        if match and DYNAMIC_SQL.search(match.group(2)):
+            original = match.group(2)
+            return {"hunks": [{
+                "start_line": int(match.group(1)),
+                "end_line": int(match.group(1)),
+                "original": original,
+                "replacement": original + "  # reviewed",
+            }]}
+    return {"hunks": []}
+
+
+def fix_file(user: str) -> str:
+    return section(user, "```python\n", "\n```").rstrip() + "\n"
+
+
+def answer(messages: list[dict]) -> tuple[str, str]:
+    """
+    (kind, content) for a request, chosen from the system prompt.
+    """
+    system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+    user = messages[-1]["content"] if messages else ""
+
+    if "command interpreter" in system:
+        return "classify", json.dumps(classify(user))
+    if "triage filter" in system:
+        return "triage", json.dumps(triage(user))
+    if "security analyzer" in system:
+        return "analyze", json.dumps(analyze(user))
+    if "matching findings" in system:
+        return "report", json.dumps(report(user))
+    if "replacement hunks" in system:
+        return "fix_hunk", json.dumps(fix_hunk(user))
+    if "code fixer" in system:
+        return "fix_file", fix_file(user)
+    return "general", "This is a canned answer from the benchmark stub. Use parameterized queries."
+
+
+# -------------------------
+# IN-PROCESS STUB
+# -------------------------
+class StubCompletions:
+    """
+    Stand-in for `AsyncGroq().chat.completions` for benchmarks that run the app
+    in-process. Answers come from `answer()`; `respond(kind, content, messages)`
+    can replace them. `latency` is one delay for every call or a delay per
+    answer kind. Counts calls per kind and the code lines sent for analysis.
+    """
+
+    def __init__(self, latency: float | Dict[str, float] = 0.0,
+                 respond: Callable[[str, str, list], str] | None = None):
+        self.latency = latency
+        self.respond = respond
+        self.calls = 0
+        self.by_kind: Dict[str, int] = {}
+        self.analyzed_lines = 0
+
+    def install(self, transport) -> "StubCompletions":
+        """
+        Route the transport's completions (e.g. `groq_service.transport`) to this stub.
+        """
+        transport.client = SimpleNamespace(chat=SimpleNamespace(completions=self))
+        return self
+
+    async def create(self, **kwargs):
+        messages = kwargs["messages"]
+        kind, content = answer(messages)
+        if self.respond is not None:
+            content = self.respond(kind, content, messages)
+
+        self.calls += 1
+        self.by_kind[kind] = self.by_kind.get(kind, 0) + 1
+        if kind == "analyze":
+            code = messages[-1]["content"].split("Input code:\n", 1)[-1]
+            self.analyzed_lines += code.count("\n") + 1
+
+        delay = self.latency.get(kind, 0.0) if isinstance(self.latency, dict) else self.latency
+        if delay:
+            await asyncio.sleep(delay)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(finish_reason="stop", message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=0, completion_tokens=0, total_tokens=0),
+        )
+
+
+# -------------------------
+# SERVER
+# -------------------------
+def create_app(config: StubConfig) -> FastAPI:
+    app = FastAPI(title="stub-llm")
+
+    async def completions(request: Request):
+        body = await request.json()
+        config.calls += 1
+        kind, content = answer(body.get("messages", []))
+        config.by_kind[kind] = config.by_kind.get(kind, 0) + 1
+
+        await asyncio.sleep(max(0.0, random.gauss(config.latency, config.jitter)))
+        if config.error_rate and random.random() < config.error_rate:
+            status = random.choice((429, 503))
+            return JSONResponse({"error": {"message": "injected by stub", "type": "stub_error"}},
+                                status_code=status, headers={"retry-after": "0.5"} if status == 429 else {})
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = body.get("model", "stub")
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": prompt_tokens + len(content) // 4,
+        }
+
+        if body.get("stream"):
+            async def events():
+                for i in range(0, len(content), 64):
+                    chunk = {
+                        "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                        "choices": [{"index": 0, "delta": {"content": content[i:i + 64]}, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    await asyncio.sleep(config.chunk_delay)
+                final = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                    "x_groq": {"usage": usage},
+                }
+                yield f"data: {json.dumps(final)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        }
+
+    app.add_api_route("/openai/v1/chat/completions", completions, methods=["POST"])
+    app.add_api_route("/v1/chat/completions", completions, methods=["POST"])
+
+    @app.get("/stats")
+    def stats():
+        return {"calls": config.calls, "by_kind": config.by_kind}
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.3, help="Mean completion latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Standard deviation of the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with 429/503")
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="Delay between streamed chunks")
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency, args.jitter, args.error_rate, args.chunk_delay)
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")